@@ -0,0 +1,290 @@
+"""
+Idempotent Schema Migrations
+
+Base.metadata.create_all은 이미 존재하는 테이블에 인덱스나 컬럼을 추가하지 않으므로,
+기존 Neon DB에도 적용되어야 하는 DDL을 여기에 모아 init_db에서 실행합니다.
+모든 마이그레이션은 여러 번 실행해도 안전해야 합니다.
+"""
+
+from datetime import datetime, timezone
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateIndex
+
+from app.config import get_settings
+from app.models.db_models import GuruPost, QueryAnalytics, QueryCache, RagDocument
+
+settings = get_settings()
+
+# generate_query_hash와 같은 정규화 (lower → 공백 정리 → sha256 앞 32자)
+QUERY_FINGERPRINT_SQL = (
+    "left(encode(sha256(convert_to("
+    "trim(regexp_replace(lower({column}), '\\s+', ' ', 'g')), 'UTF8')), 'hex'), 32)"
+)
+
+QUERY_ANALYTICS_PARTITION_PREFIX = "query_analytics_y"
+
+# 미리 만든 월 범위를 벗어난 행(시계 오차, 오래된 재처리 등)을 받는 파티션
+QUERY_ANALYTICS_DEFAULT_PARTITION = "query_analytics_default"
+
+# 레플리카가 동시에 init_db를 실행해도 파티션 전환(rename → copy → drop)은 한 번만
+QUERY_ANALYTICS_PARTITIONING_LOCK_KEY = 0x616E7074  # "anpt"
+
+QUERY_CACHE_VECTOR_INDEX_PREFIX = "ix_query_cache_embedding_"
+
+RAG_DOCUMENTS_VECTOR_INDEX_PREFIX = "ix_rag_documents_embedding_"
+
+
+def query_cache_vector_index_name() -> str:
+    """
+    설정값이 반영된 인덱스 이름
+
+    파라미터가 바뀌면 이름이 달라지므로 새 인덱스를 만들고 이전 인덱스를 제거합니다.
+    """
+    if settings.vector_index_type == "hnsw":
+        return f"{QUERY_CACHE_VECTOR_INDEX_PREFIX}hnsw_m{settings.hnsw_m}_ef{settings.hnsw_ef_construction}"
+    if settings.vector_index_type == "ivfflat":
+        return f"{QUERY_CACHE_VECTOR_INDEX_PREFIX}ivfflat_l{settings.ivfflat_lists}"
+    return ""
+
+
+def query_cache_vector_index_ddl(index_name: str, table: str = "query_cache") -> str:
+    """query_embedding 코사인 거리 ANN 인덱스 DDL"""
+    if settings.vector_index_type == "hnsw":
+        return (
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} "
+            f"USING hnsw (query_embedding vector_cosine_ops) "
+            f"WITH (m = {int(settings.hnsw_m)}, ef_construction = {int(settings.hnsw_ef_construction)})"
+        )
+    if settings.vector_index_type == "ivfflat":
+        return (
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} "
+            f"USING ivfflat (query_embedding vector_cosine_ops) "
+            f"WITH (lists = {int(settings.ivfflat_lists)})"
+        )
+    raise ValueError(f"Unsupported vector_index_type: {settings.vector_index_type}")
+
+
+async def ensure_query_cache_vector_index(conn: AsyncConnection) -> None:
+    """설정과 일치하는 벡터 인덱스만 남기도록 생성/정리"""
+    desired = query_cache_vector_index_name()
+
+    result = await conn.execute(
+        text("""
+            SELECT indexname FROM pg_indexes
+            WHERE tablename = 'query_cache' AND indexname LIKE :prefix
+        """),
+        {"prefix": f"{QUERY_CACHE_VECTOR_INDEX_PREFIX}%"},
+    )
+    for (index_name,) in result.fetchall():
+        if index_name != desired:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+            print(f"[Migrations] Dropped vector index {index_name}")
+
+    if desired:
+        await conn.execute(text(query_cache_vector_index_ddl(desired)))
+
+
+async def ensure_rag_documents_vector_index(conn: AsyncConnection) -> None:
+    """rag_documents HNSW 인덱스 (파라미터가 바뀌면 새로 만들고 이전 인덱스 제거)"""
+    desired = f"{RAG_DOCUMENTS_VECTOR_INDEX_PREFIX}hnsw_m{settings.hnsw_m}_ef{settings.hnsw_ef_construction}"
+
+    result = await conn.execute(
+        text("""
+            SELECT indexname FROM pg_indexes
+            WHERE tablename = 'rag_documents' AND indexname LIKE :prefix
+        """),
+        {"prefix": f"{RAG_DOCUMENTS_VECTOR_INDEX_PREFIX}%"},
+    )
+    for (index_name,) in result.fetchall():
+        if index_name != desired:
+            await conn.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+            print(f"[Migrations] Dropped vector index {index_name}")
+
+    await conn.execute(text(
+        f"CREATE INDEX IF NOT EXISTS {desired} ON rag_documents "
+        f"USING hnsw (embedding vector_cosine_ops) "
+        f"WITH (m = {int(settings.hnsw_m)}, ef_construction = {int(settings.hnsw_ef_construction)})"
+    ))
+
+
+async def ensure_model_indexes(conn: AsyncConnection, table) -> None:
+    """모델에 선언된 인덱스 중 기존 테이블에 없는 것 생성"""
+    for index in table.indexes:
+        # 파티션 테이블에도 동작하도록 inspector 대신 IF NOT EXISTS 사용
+        await conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def month_start(ts: datetime) -> datetime:
+    return ts.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def query_analytics_partition_name(month: datetime) -> str:
+    return f"{QUERY_ANALYTICS_PARTITION_PREFIX}{month.year:04d}m{month.month:02d}"
+
+
+async def is_partitioned(conn: AsyncConnection, table: str) -> bool:
+    result = await conn.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"),
+        {"table": table},
+    )
+    return bool(result.scalar())
+
+
+async def lock_query_analytics_partitioning(conn: AsyncConnection) -> None:
+    """파티션 DDL을 트랜잭션 끝까지 직렬화 (같은 트랜잭션에서 다시 잡아도 됨)"""
+    await conn.execute(
+        text("SELECT pg_advisory_xact_lock(:key)"), {"key": QUERY_ANALYTICS_PARTITIONING_LOCK_KEY}
+    )
+
+
+async def ensure_query_analytics_partitions(conn: AsyncConnection, start: datetime, end: datetime) -> List[str]:
+    """
+    [start, end]가 포함된 월 파티션 생성 (DEFAULT 파티션 포함)
+
+    DEFAULT 파티션에 이미 그 달의 행이 있으면 PARTITION OF가 실패하므로
+    빈 테이블을 만들어 행을 옮긴 뒤 ATTACH합니다.
+    """
+    await lock_query_analytics_partitioning(conn)
+    await conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {QUERY_ANALYTICS_DEFAULT_PARTITION} PARTITION OF query_analytics DEFAULT"
+    ))
+
+    created = []
+    month = month_start(start)
+    while month <= end:
+        name = query_analytics_partition_name(month)
+        next_month = add_months(month, 1)
+        bounds = f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        exists = (await conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name})).scalar()
+        if not exists:
+            in_default = (await conn.execute(
+                text(
+                    f"SELECT EXISTS (SELECT 1 FROM {QUERY_ANALYTICS_DEFAULT_PARTITION} "
+                    "WHERE created_at >= :start AND created_at < :end)"
+                ),
+                {"start": month, "end": next_month},
+            )).scalar()
+            if in_default:
+                await conn.execute(text(f"CREATE TABLE {name} (LIKE query_analytics INCLUDING DEFAULTS)"))
+                await conn.execute(
+                    text(
+                        f"WITH moved AS (DELETE FROM {QUERY_ANALYTICS_DEFAULT_PARTITION} "
+                        "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+                        f"INSERT INTO {name} SELECT * FROM moved"
+                    ),
+                    {"start": month, "end": next_month},
+                )
+                await conn.execute(text(f"ALTER TABLE query_analytics ATTACH PARTITION {name} {bounds}"))
+            else:
+                await conn.execute(text(f"CREATE TABLE {name} PARTITION OF query_analytics {bounds}"))
+        created.append(name)
+        month = next_month
+    return created
+
+
+async def drop_expired_query_analytics_partitions(conn: AsyncConnection, retention_months: int) -> List[str]:
+    """보관 기간이 지난 월 파티션을 DROP (대량 DELETE 없이 삭제)"""
+    if retention_months <= 0 or not await is_partitioned(conn, "query_analytics"):
+        return []
+
+    cutoff = add_months(month_start(datetime.now(timezone.utc)), -retention_months)
+    result = await conn.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass('query_analytics')
+    """))
+
+    dropped = []
+    for (name,) in result.fetchall():
+        suffix = name[len(QUERY_ANALYTICS_PARTITION_PREFIX):]
+        try:
+            month = datetime.strptime(suffix, "%Ym%m").replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+        # 파티션 상한(다음 달 1일)이 cutoff 이전이면 전체가 만료됨
+        if add_months(month, 1) <= cutoff:
+            await conn.execute(text(f"DROP TABLE IF EXISTS {name}"))
+            dropped.append(name)
+
+    # DEFAULT 파티션은 DROP할 수 없으므로 만료된 행만 삭제
+    await conn.execute(
+        text(f"DELETE FROM {QUERY_ANALYTICS_DEFAULT_PARTITION} WHERE created_at < :cutoff"),
+        {"cutoff": cutoff},
+    )
+    return dropped
+
+
+async def ensure_query_analytics_partitioning(conn: AsyncConnection) -> None:
+    """
+    query_analytics를 created_at 월 단위 RANGE 파티션 테이블로 전환 (옵트인)
+
+    기존 행을 새 파티션 테이블로 복사하므로 대용량 테이블은 점검 시간에 실행해야 합니다.
+    PK는 파티션 키를 포함해야 하므로 (id, created_at)이 됩니다.
+    init_db 트랜잭션이 끝날 때까지 advisory lock을 잡으므로 동시에 시작한 레플리카는
+    전환이 끝난 뒤 이미 파티션된 테이블을 보게 됩니다 (pgbouncer transaction 모드에서도 안전).
+    """
+    await lock_query_analytics_partitioning(conn)
+    if await is_partitioned(conn, "query_analytics"):
+        now = datetime.now(timezone.utc)
+        await ensure_query_analytics_partitions(
+            conn, now, add_months(month_start(now), settings.analytics_partition_months_ahead)
+        )
+        return
+
+    oldest = (await conn.execute(text("SELECT min(created_at) FROM query_analytics"))).scalar()
+    now = datetime.now(timezone.utc)
+
+    await conn.execute(text(
+        "CREATE TABLE query_analytics_partitioned (LIKE query_analytics INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (created_at)"
+    ))
+    await conn.execute(text("ALTER TABLE query_analytics_partitioned ALTER COLUMN created_at SET NOT NULL"))
+    await conn.execute(text("ALTER TABLE query_analytics RENAME TO query_analytics_unpartitioned"))
+    await conn.execute(text("ALTER TABLE query_analytics_partitioned RENAME TO query_analytics"))
+
+    await ensure_query_analytics_partitions(
+        conn, oldest or now, add_months(month_start(now), settings.analytics_partition_months_ahead)
+    )
+    await conn.execute(text("INSERT INTO query_analytics SELECT * FROM query_analytics_unpartitioned"))
+    await conn.execute(text("DROP TABLE query_analytics_unpartitioned"))
+
+    await conn.execute(text(
+        "ALTER TABLE query_analytics ADD CONSTRAINT query_analytics_pkey PRIMARY KEY (id, created_at)"
+    ))
+    await conn.execute(text(
+        "ALTER TABLE query_analytics ADD CONSTRAINT query_analytics_user_id_fkey "
+        "FOREIGN KEY (user_id) REFERENCES users (id)"
+    ))
+    print("[Migrations] Converted query_analytics to monthly range partitions")
+
+
+async def run_migrations(conn: AsyncConnection) -> None:
+    """init_db에서 create_all 이후 실행"""
+    if settings.analytics_partitioning_enabled:
+        # 다른 레플리카의 파티션 전환(rename)과 아래 ALTER TABLE이 서로의 테이블 잠금을 기다리지 않도록 먼저 직렬화
+        await lock_query_analytics_partitioning(conn)
+    await ensure_query_cache_vector_index(conn)
+    # 캐시 sweeper 배치 삭제 인덱스
+    await ensure_model_indexes(conn, QueryCache.__table__)
+    # 피드 keyset 페이지네이션 복합 인덱스
+    await ensure_model_indexes(conn, GuruPost.__table__)
+    # RAG pgvector 백엔드: HNSW + 메타데이터 필터 인덱스
+    await ensure_rag_documents_vector_index(conn)
+    await ensure_model_indexes(conn, RagDocument.__table__)
+
+    # query_analytics: fingerprint 컬럼 (기존 행은 AnalyticsMaintenance가 배치로 채움)
+    await conn.execute(text(
+        "ALTER TABLE query_analytics ADD COLUMN IF NOT EXISTS query_fingerprint VARCHAR(32)"
+    ))
+    if settings.analytics_partitioning_enabled:
+        await ensure_query_analytics_partitioning(conn)
+    await ensure_model_indexes(conn, QueryAnalytics.__table__)
@@ -1,10 +1,14 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.pool import NullPool
-from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine, async_sessionmaker
+from sqlalchemy.pool import NullPool, AsyncAdaptedQueuePool
+from sqlalchemy import event, exc, text
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from typing import Optional, Dict, Any
 import ssl
+import time
+import uuid
 from app.config import get_settings
 from app.models.db_models import Base
+from app.db.migrations import run_migrations
 
 settings = get_settings()
 
@@ -45,13 +49,137 @@ def _prepare_database_url(url: str) -> tuple[str, dict]:
 # DATABASE_URL 변환
 clean_database_url, connect_args = _prepare_database_url(settings.database_url)
 
-# Neon은 서버리스이므로 connection pooling 비활성화
-engine = create_async_engine(
-    clean_database_url,
-    echo=False,
-    poolclass=NullPool,
-    connect_args=connect_args,
-)
+
+class PoolMetrics:
+    """커넥션 체크아웃 / 대기 시간 메트릭"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.connects = 0
+        self.timeouts = 0
+        self.acquire_ms_total = 0.0
+        self.acquire_ms_max = 0.0
+
+    def record_acquire(self, elapsed_ms: float) -> None:
+        self.checkouts += 1
+        self.acquire_ms_total += elapsed_ms
+        self.acquire_ms_max = max(self.acquire_ms_max, elapsed_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "timeouts": self.timeouts,
+            # 풀 대기 + (필요 시) 새 연결 수립 시간
+            "acquire_ms_avg": round(self.acquire_ms_total / self.checkouts, 2) if self.checkouts else 0.0,
+            "acquire_ms_max": round(self.acquire_ms_max, 2),
+            # 체크아웃 대비 새 연결 비율 (NullPool이면 1.0)
+            "connect_ratio": round(self.connects / self.checkouts, 4) if self.checkouts else 0.0,
+        }
+
+
+class _InstrumentedPoolMixin:
+    """Pool.connect()를 감싸 체크아웃 대기 시간 측정"""
+
+    metrics: PoolMetrics
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.metrics.timeouts += 1
+            raise
+        self.metrics.record_acquire((time.perf_counter() - started) * 1000)
+        return connection
+
+
+def _instrumented_pool_class(base, metrics: PoolMetrics):
+    # dispose()/recreate() 시에도 같은 메트릭 객체를 유지하도록 클래스 속성으로 보관
+    return type(f"Instrumented{base.__name__}", (_InstrumentedPoolMixin, base), {"metrics": metrics})
+
+
+def engine_connect_args() -> dict:
+    """Settings가 반영된 asyncpg connect_args"""
+    args = dict(connect_args)
+    if settings.db_pgbouncer_mode:
+        # transaction pooling(pgbouncer / Neon -pooler 엔드포인트)에서는 서버 커넥션이
+        # 트랜잭션마다 바뀌므로 prepared statement 캐시를 끄고 이름 충돌을 피함
+        # 같은 이유로 세션 수준 상태(pg_try_advisory_lock 등)는 이 엔진에서 쓰면 안 됨:
+        # - 트랜잭션 안에서 끝나는 lock은 pg_try_advisory_xact_lock (sweeper, rollup, maintenance)
+        # - 여러 트랜잭션에 걸친 lock은 get_lock_engine()의 직접 연결 (JobWorker lock_group)
+        args["statement_cache_size"] = 0
+        args["prepared_statement_cache_size"] = 0
+        args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid.uuid4()}__"
+    return args
+
+
+def create_db_engine(
+    pool_mode: Optional[str] = None,
+    metrics: Optional[PoolMetrics] = None,
+    **engine_kwargs,
+) -> AsyncEngine:
+    """
+    Settings 기반 엔진 생성
+
+    - pool_mode="null": 요청마다 새 연결 (TCP + TLS + 인증)
+    - pool_mode="queue": 프로세스 내 커넥션 풀 재사용
+    """
+    pool_mode = pool_mode or settings.db_pool_mode
+    metrics = metrics or PoolMetrics()
+
+    kwargs: Dict[str, Any] = {
+        "echo": False,
+        "connect_args": engine_connect_args(),
+    }
+    if pool_mode == "null":
+        kwargs["poolclass"] = _instrumented_pool_class(NullPool, metrics)
+    elif pool_mode == "queue":
+        kwargs.update(
+            poolclass=_instrumented_pool_class(AsyncAdaptedQueuePool, metrics),
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+            # Neon compute가 유휴 상태에서 중단되면 끊긴 연결이 남으므로 재활용 + pre-ping
+            pool_recycle=settings.db_pool_recycle_seconds,
+            pool_pre_ping=settings.db_pool_pre_ping,
+        )
+    else:
+        raise ValueError(f"Unsupported db_pool_mode: {pool_mode}")
+    kwargs.update(engine_kwargs)
+
+    db_engine = create_async_engine(clean_database_url, **kwargs)
+
+    @event.listens_for(db_engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.connects += 1
+
+    return db_engine
+
+
+def get_pool_stats(db_engine: Optional[AsyncEngine] = None) -> Dict[str, Any]:
+    """풀 상태 + 체크아웃 메트릭"""
+    db_engine = db_engine or engine
+    pool = db_engine.pool
+    stats: Dict[str, Any] = {
+        "mode": "queue" if isinstance(pool, AsyncAdaptedQueuePool) else "null",
+        "pgbouncer_mode": settings.db_pgbouncer_mode,
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=settings.db_max_overflow,
+        )
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.stats())
+    return stats
+
+
+engine = create_db_engine()
 
 async_session_maker = async_sessionmaker(
     engine,
@@ -60,12 +188,47 @@ async_session_maker = async_sessionmaker(
 )
 
 
+def direct_database_url() -> str:
+    """pooler를 거치지 않는 연결 URL (세션 수준 상태가 유지되어야 하는 연결용)"""
+    if settings.database_direct_url:
+        return settings.database_direct_url
+    parsed = urlparse(settings.database_url)
+    if "-pooler." in parsed.netloc:
+        # Neon: ep-xxx-pooler.region.aws.neon.tech → ep-xxx.region.aws.neon.tech
+        return urlunparse(parsed._replace(netloc=parsed.netloc.replace("-pooler.", ".", 1)))
+    raise RuntimeError(
+        "db_pgbouncer_mode=True에서 세션 수준 advisory lock을 쓰려면 DATABASE_DIRECT_URL이 필요합니다"
+    )
+
+
+_lock_engine: Optional[AsyncEngine] = None
+
+
+def get_lock_engine() -> AsyncEngine:
+    """
+    세션 수준 advisory lock 전용 엔진
+
+    pgbouncer 모드가 아니면 기본 엔진을 그대로 사용합니다.
+    pgbouncer 모드에서는 lock이 다른 클라이언트의 서버 연결로 넘어가거나
+    unlock이 다른 backend에서 실행되지 않도록 직접 연결(NullPool)을 사용합니다.
+    """
+    global _lock_engine
+    if not settings.db_pgbouncer_mode:
+        return engine
+    if _lock_engine is None:
+        url, lock_connect_args = _prepare_database_url(direct_database_url())
+        _lock_engine = create_async_engine(url, poolclass=NullPool, connect_args=lock_connect_args)
+    return _lock_engine
+
+
 async def init_db():
-    """데이터베이스 테이블 생성 및 pgvector 익스텐션 활성화"""
+    """데이터베이스 테이블 생성, pgvector 익스텐션 활성화 및 마이그레이션"""
     async with engine.begin() as conn:
         # pgvector 익스텐션 활성화 (Neon은 기본 지원)
         await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
         await conn.run_sync(Base.metadata.create_all)
+        # 기존 테이블 인덱스 등 멱등 DDL
+        await run_migrations(conn)
 
 
 async def get_db() -> AsyncSession:
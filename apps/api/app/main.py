@@ -3,17 +3,50 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import get_settings
-from app.routers import health, users, feed, chat, analytics, learning
+from app.routers import health, users, feed, chat, analytics, learning, jobs
 from app.db.neon import init_db
+from app.services.analytics.writer import get_analytics_writer
+from app.services.analytics.maintenance import get_analytics_maintenance
+from app.services.analytics.rollup import get_rollup_compactor, reset_rollup_coverage
+from app.services.cache.hit_counter import get_cache_hit_counter
+from app.services.cache.sweeper import get_cache_sweeper
+from app.services.cache.write_behind import get_cache_write_behind
+from app.services.jobs import get_job_worker
+from app.services.rag.snapshot import get_rag_index_loader
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await init_db()
+    # RAG 스냅샷은 백그라운드로 적재 (/health/ready로 완료 확인)
+    get_rag_index_loader().start()
+    if settings.analytics_async_enabled:
+        get_analytics_writer().start()
+    if settings.l1_cache_enabled:
+        get_cache_hit_counter().start()
+    if settings.cache_write_behind_enabled:
+        get_cache_write_behind().start()
+    if settings.cache_sweeper_enabled:
+        get_cache_sweeper().start()
+    if settings.analytics_rollup_enabled:
+        get_rollup_compactor().start()
+    else:
+        # 비활성화 중 누락된 증분이 있으므로 재활성화 시 처음부터 backfill
+        await reset_rollup_coverage()
+    get_analytics_maintenance().start()
+    if settings.jobs_enabled:
+        get_job_worker().start()
     yield
-    # Shutdown
-    pass
+    # Shutdown (실행 중인 작업 반환, 큐에 남은 캐시 쓰기 / analytics 레코드 기록)
+    await get_job_worker().stop()
+    await get_rag_index_loader().stop()
+    await get_cache_sweeper().stop()
+    await get_analytics_maintenance().stop()
+    await get_rollup_compactor().stop()
+    await get_cache_write_behind().stop()
+    await get_cache_hit_counter().stop()
+    await get_analytics_writer().stop()
 
 
 app = FastAPI(
@@ -42,6 +75,7 @@ app.include_router(feed.router, prefix="/api/feed", tags=["Feed"])
 app.include_router(chat.router, prefix="/api/chat", tags=["Chat"])
 app.include_router(analytics.router, tags=["Analytics"])
 app.include_router(learning.router, tags=["Learning"])
+app.include_router(jobs.router, tags=["Jobs"])
 
 
 @app.get("/")
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Table, Integer, Float
+from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Table, Integer, BigInteger, Boolean, Float, Index, text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import relationship, declarative_base
 from sqlalchemy.sql import func
 from pgvector.sqlalchemy import Vector
@@ -67,6 +68,36 @@ class GuruPost(Base):
     # 관계
     guru = relationship("Guru", back_populates="posts")
 
+    # 피드 keyset 페이지네이션용 (posted_at, id) 정렬 인덱스
+    __table_args__ = (
+        Index("ix_guru_posts_guru_posted_at_id", "guru_id", posted_at.desc(), id.desc()),
+        Index("ix_guru_posts_posted_at_id", posted_at.desc(), id.desc()),
+    )
+
+
+class UserTimeline(Base):
+    """사용자별로 미리 계산된 피드 (팔로우 Guru의 최근 포스트, 최대 timeline_max_entries개)"""
+    __tablename__ = "user_timelines"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    post_id = Column(String, ForeignKey("guru_posts.id", ondelete="CASCADE"), primary_key=True)
+    guru_id = Column(String, nullable=False)
+    posted_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("ix_user_timelines_user_posted_at", "user_id", posted_at.desc(), post_id.desc()),
+    )
+
+
+class UserTimelineState(Base):
+    """타임라인 빌드 상태 (행이 없으면 cold → 쿼리 경로로 폴백)"""
+    __tablename__ = "user_timeline_state"
+
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    post_count = Column(Integer, nullable=False, default=0)  # 팔로우 Guru의 전체 포스트 수 (피드 total)
+    max_entries = Column(Integer, nullable=False)  # 빌드 당시 보관 한도
+    built_at = Column(DateTime(timezone=True), server_default=func.now())
+
 
 class QueryCache(Base):
     __tablename__ = "query_cache"
@@ -81,6 +112,12 @@ class QueryCache(Base):
     expires_at = Column(DateTime(timezone=True), nullable=False)
     hit_count = Column(Integer, default=0)
 
+    __table_args__ = (
+        # CacheSweeper 배치 삭제 (만료 / 오래되고 조회 적은 항목)
+        Index("ix_query_cache_expires_at", "expires_at"),
+        Index("ix_query_cache_created_at_hit_count", "created_at", "hit_count"),
+    )
+
 
 class QueryAnalytics(Base):
     """Phase 3에서 사용할 분석 테이블"""
@@ -94,3 +131,124 @@ class QueryAnalytics(Base):
     feedback = Column(Integer, nullable=True)  # 1: positive, -1: negative
     latency_ms = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    query_fingerprint = Column(String(32), nullable=True)  # generate_query_hash(query_text)
+
+    # logger 조회 패턴용 인덱스
+    __table_args__ = (
+        # 기간 집계 (summary / popular / negative): index-only scan
+        Index(
+            "ix_query_analytics_created_at",
+            "created_at",
+            postgresql_include=["query_fingerprint", "source_type", "feedback", "latency_ms"],
+        ),
+        # 사용자별 최근 쿼리
+        Index("ix_query_analytics_user_created_at", "user_id", created_at.desc()),
+        # fingerprint별 집계 / 조회
+        Index("ix_query_analytics_fingerprint_created_at", "query_fingerprint", "created_at"),
+        # fingerprint backfill 대상만 담는 partial 인덱스 (backfill이 끝나면 비어 있어 매 주기 조회가 즉시 끝남)
+        Index(
+            "ix_query_analytics_fingerprint_missing",
+            "id",
+            postgresql_where=text("query_fingerprint IS NULL"),
+        ),
+    )
+
+
+class QueryAnalyticsHourly(Base):
+    """query_analytics 시간별 롤업 (쿼리 fingerprint × source_type)"""
+    __tablename__ = "query_analytics_hourly"
+
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)  # UTC 정시
+    fingerprint = Column(String, primary_key=True)  # generate_query_hash와 같은 정규화
+    source_type = Column(String, primary_key=True)  # NULL은 'unknown'
+    query_text = Column(Text, nullable=False)  # 대표 쿼리 문자열
+    query_count = Column(Integer, nullable=False, default=0)
+    positive = Column(Integer, nullable=False, default=0)
+    negative = Column(Integer, nullable=False, default=0)
+    latency_sum = Column(BigInteger, nullable=False, default=0)
+    latency_count = Column(Integer, nullable=False, default=0)
+    latency_hist = Column(ARRAY(Integer), nullable=False)  # rollup.LATENCY_BUCKETS_MS 경계 기준 히스토그램
+
+
+class AnalyticsRollupState(Base):
+    """롤업 커버리지 워터마크 (단일 행)"""
+    __tablename__ = "analytics_rollup_state"
+
+    id = Column(Integer, primary_key=True, default=1)
+    covered_since = Column(DateTime(timezone=True), nullable=True)  # 이 시각 이후 버킷은 완전함
+    backfill_complete = Column(Boolean, nullable=False, default=False)  # 원본 전체가 롤업에 반영됨
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class BackgroundJob(Base):
+    """백그라운드 작업 큐 (JobWorker가 FOR UPDATE SKIP LOCKED로 가져감)"""
+    __tablename__ = "background_jobs"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    kind = Column(String, nullable=False)  # jobs.handlers.JOB_KINDS 키
+    payload = Column(Text, nullable=True)  # JSON string
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed
+    dedupe_key = Column(String, nullable=True)  # 같은 키의 queued/running 작업은 하나만
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_by = Column(String, nullable=True)  # 실행 중인 워커 id
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)  # heartbeat로 연장, 지나면 다른 워커가 회수
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    result = Column(Text, nullable=True)  # JSON string
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # 실행 대기 작업 claim
+        Index("ix_background_jobs_status_run_after", "status", "run_after"),
+        # 종류별 최근 작업 (상태 조회)
+        Index("ix_background_jobs_kind_created_at", "kind", created_at.desc()),
+        Index(
+            "uq_background_jobs_active_dedupe",
+            "dedupe_key",
+            unique=True,
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+    )
+
+
+class RagSnapshotChunk(Base):
+    """RAG 인덱스 스냅샷 (배포/재시작 후 임베딩 재계산 없이 복원)"""
+    __tablename__ = "rag_snapshot_chunks"
+
+    id = Column(String, primary_key=True)  # 벡터 저장소 문서 id
+    document = Column(Text, nullable=False)
+    doc_metadata = Column("metadata", Text, nullable=True)  # JSON string
+    embedding = Column(Vector(EMBEDDING_DIMENSION), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class RagDocument(Base):
+    """RAG 문서 청크 (rag_backend=pgvector, 모든 레플리카가 같은 인덱스 공유)"""
+    __tablename__ = "rag_documents"
+
+    id = Column(String, primary_key=True)  # 벡터 저장소 문서 id
+    content = Column(Text, nullable=False)
+    # 필터 pushdown 대상 메타데이터는 컬럼으로, 나머지는 JSONB로 보관
+    title = Column(Text, nullable=True)
+    url = Column(Text, nullable=True)
+    doc_type = Column(String(50), nullable=True)
+    extra_metadata = Column("metadata", JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    embedding = Column(Vector(EMBEDDING_DIMENSION), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # 필터 pushdown: type은 btree, 나머지 메타데이터는 @> (jsonb_path_ops)
+        # HNSW 벡터 인덱스는 설정값이 반영되도록 migrations에서 생성
+        Index("ix_rag_documents_doc_type", "doc_type"),
+        Index(
+            "ix_rag_documents_metadata",
+            "metadata",
+            postgresql_using="gin",
+            postgresql_ops={"metadata": "jsonb_path_ops"},
+        ),
+    )
@@ -47,6 +47,13 @@ class GuruResponse(BaseModel):
 
 
 # Post Schemas
+class PostCreate(BaseModel):
+    guru_id: str
+    content: str
+    threads_url: Optional[str] = None
+    posted_at: datetime
+
+
 class PostResponse(BaseModel):
     id: str
     guru_id: str
@@ -64,6 +71,8 @@ class FeedResponse(BaseModel):
     posts: List[PostResponse]
     total: int
     has_more: bool
+    next_cursor: Optional[str] = None  # 다음 페이지 요청 시 cursor로 전달
+    total_is_estimate: bool = False  # 대용량 전체 피드는 pg_class 통계 기반 추정치
 
 
 # Chat Schemas
@@ -91,6 +100,7 @@ class ChatResponse(BaseModel):
     message: ChatMessageResponse
     cached: bool
     analytics_id: Optional[str] = None  # Phase 3: 피드백용 ID
+    dropped_sources: List[str] = []  # 타임아웃/오류로 제외된 소스 (예: 'arxiv', 'rag')
 
 
 # Analytics Schemas (Phase 3)
@@ -16,7 +16,11 @@ from app.services.analytics.logger import (
     get_popular_queries,
     get_recent_queries,
     get_negative_feedback_queries,
+    get_dashboard_data,
 )
+from app.services.analytics.writer import get_analytics_writer
+from app.services.analytics.maintenance import get_analytics_maintenance
+from app.services.analytics.rollup import get_rollup_compactor
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
@@ -38,6 +42,7 @@ class AnalyticsSummary(BaseModel):
     source_distribution: Dict[str, int]
     feedback: Dict[str, int]
     avg_latency_ms: Optional[int]
+    p95_latency_ms: Optional[int] = None  # 히스토그램 버킷 기반 추정치
 
 
 class PopularQuery(BaseModel):
@@ -152,19 +157,31 @@ async def get_negative_feedback(
 
 
 @router.get("/dashboard", response_model=DashboardData)
-async def get_dashboard(
-    days: int = 7,
-    db: AsyncSession = Depends(get_db),
-):
-    """대시보드용 통합 데이터"""
-    summary = await get_analytics_summary(db, days)
-    popular = await get_popular_queries(db, days, 10)
-    recent = await get_recent_queries(db, 20)
-    negative = await get_negative_feedback_queries(db, days)
+async def get_dashboard(days: int = 7):
+    """대시보드용 통합 데이터 (조회별 별도 커넥션에서 동시 실행)"""
+    data = await get_dashboard_data(days)
 
     return DashboardData(
-        summary=AnalyticsSummary(**summary),
-        popular_queries=[PopularQuery(**q) for q in popular],
-        recent_queries=[RecentQuery(**q) for q in recent],
-        negative_feedback_queries=[NegativeFeedbackQuery(**q) for q in negative],
+        summary=AnalyticsSummary(**data["summary"]),
+        popular_queries=[PopularQuery(**q) for q in data["popular_queries"]],
+        recent_queries=[RecentQuery(**q) for q in data["recent_queries"]],
+        negative_feedback_queries=[NegativeFeedbackQuery(**q) for q in data["negative_feedback_queries"]],
     )
+
+
+@router.get("/writer")
+async def get_writer_stats():
+    """Analytics 배치 writer 상태 (큐 사용량, drop 수 등)"""
+    return get_analytics_writer().stats()
+
+
+@router.get("/rollup")
+async def get_rollup_stats():
+    """시간별 롤업 compactor 상태 (backfill 진행, 커버리지)"""
+    return get_rollup_compactor().stats()
+
+
+@router.get("/maintenance")
+async def get_maintenance_stats():
+    """query_analytics 유지보수 상태 (fingerprint backfill, 파티션 정리)"""
+    return get_analytics_maintenance().stats()
@@ -1,70 +1,96 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
+import asyncio
+import json
 import uuid
 import time
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Awaitable, AsyncIterator
 
-from app.db.neon import get_db
+from app.config import get_settings
+from app.db.neon import get_db, async_session_maker
 from app.models.schemas import ChatRequest, ChatResponse, ChatMessageResponse, ChatSource
-from app.services.cache.semantic_cache import get_cached_response, save_to_cache
+from app.services.cache.semantic_cache import get_cached_response, generate_query_hash
+from app.services.cache.hit_counter import get_cache_hit_counter
+from app.services.cache.memory_cache import get_memory_cache
+from app.services.cache.single_flight import get_chat_single_flight
+from app.services.cache.sweeper import get_cache_sweeper
+from app.services.cache.write_behind import save_to_cache_deferred, get_cache_write_behind
 from app.services.rag.retriever import retrieve_documents, format_context
-from app.services.llm.openai_client import generate_response
+from app.services.llm.openai_client import (
+    generate_response,
+    generate_response_stream,
+    get_embedding_cache_stats,
+)
 from app.services.rag.embedder import get_document_count
-from app.services.router.llm_router import classify_query, QueryType
+from app.services.router.llm_router import classify_query, QueryType, RouterResult
 from app.services.mcp.arxiv_client import get_arxiv_client
 from app.services.mcp.huggingface_client import get_huggingface_client
 from app.services.analytics.logger import log_query
 
+settings = get_settings()
 router = APIRouter()
 
 
-async def _get_mcp_context(query: str, targets: List[str]) -> tuple[str, List[Dict[str, Any]]]:
-    """MCP 서버에서 실시간 데이터 가져오기"""
-    contexts = []
-    sources = []
+async def _get_arxiv_context(query: str) -> tuple[str, List[Dict[str, Any]]]:
+    """arXiv MCP에서 최신 논문 가져오기"""
+    arxiv_client = get_arxiv_client()
+    papers = await arxiv_client.search_papers(query, max_results=5)
+    if not papers:
+        return "", []
+
+    context = "## arXiv 최신 논문\n" + arxiv_client.format_papers_as_context(papers)
+    sources = [
+        {
+            "title": paper.title,
+            "url": paper.arxiv_url,
+            "type": "arxiv",
+            "relevance_score": 0.9,
+        }
+        for paper in papers
+    ]
+    return context, sources
 
-    if "arxiv" in targets:
-        arxiv_client = get_arxiv_client()
-        papers = await arxiv_client.search_papers(query, max_results=5)
-        if papers:
-            contexts.append("## arXiv 최신 논문\n" + arxiv_client.format_papers_as_context(papers))
-            for paper in papers:
-                sources.append({
-                    "title": paper.title,
-                    "url": paper.arxiv_url,
-                    "type": "arxiv",
-                    "relevance_score": 0.9,
-                })
 
-    if "huggingface" in targets:
-        hf_client = get_huggingface_client()
-
-        # Space 검색
-        spaces = await hf_client.search_spaces(query, limit=3)
-        if spaces:
-            contexts.append("## HuggingFace Spaces\n" + hf_client.format_spaces_as_context(spaces))
-            for space in spaces:
-                sources.append({
-                    "title": f"Space: {space.title}",
-                    "url": space.url,
-                    "type": "huggingface",
-                    "relevance_score": 0.85,
-                })
+async def _get_hf_spaces_context(query: str) -> tuple[str, List[Dict[str, Any]]]:
+    """HuggingFace Space 검색"""
+    hf_client = get_huggingface_client()
+    spaces = await hf_client.search_spaces(query, limit=3)
+    if not spaces:
+        return "", []
+
+    context = "## HuggingFace Spaces\n" + hf_client.format_spaces_as_context(spaces)
+    sources = [
+        {
+            "title": f"Space: {space.title}",
+            "url": space.url,
+            "type": "huggingface",
+            "relevance_score": 0.85,
+        }
+        for space in spaces
+    ]
+    return context, sources
 
-        # 모델 검색
-        models = await hf_client.search_models(query, limit=3)
-        if models:
-            contexts.append("## HuggingFace Models\n" + hf_client.format_models_as_context(models))
-            for model in models:
-                sources.append({
-                    "title": f"Model: {model.id}",
-                    "url": model.url,
-                    "type": "huggingface",
-                    "relevance_score": 0.85,
-                })
 
-    return "\n\n".join(contexts), sources
+async def _get_hf_models_context(query: str) -> tuple[str, List[Dict[str, Any]]]:
+    """HuggingFace 모델 검색"""
+    hf_client = get_huggingface_client()
+    models = await hf_client.search_models(query, limit=3)
+    if not models:
+        return "", []
+
+    context = "## HuggingFace Models\n" + hf_client.format_models_as_context(models)
+    sources = [
+        {
+            "title": f"Model: {model.id}",
+            "url": model.url,
+            "type": "huggingface",
+            "relevance_score": 0.85,
+        }
+        for model in models
+    ]
+    return context, sources
 
 
 async def _get_rag_context(query: str) -> tuple[str, List[Dict[str, Any]]]:
@@ -85,6 +111,79 @@ async def _get_rag_context(query: str) -> tuple[str, List[Dict[str, Any]]]:
     return context, sources
 
 
+async def _with_deadline(
+    name: str,
+    coro: Awaitable[tuple[str, List[Dict[str, Any]]]],
+    timeout: float,
+) -> Optional[tuple[str, List[Dict[str, Any]]]]:
+    """소스별 타임아웃 적용. 시간 초과/오류 시 None (해당 소스만 제외)"""
+    try:
+        return await asyncio.wait_for(coro, timeout=timeout)
+    except asyncio.TimeoutError:
+        print(f"[FanOut] {name} timed out after {timeout}s")
+    except Exception as e:
+        print(f"[FanOut] {name} failed: {e}")
+    return None
+
+
+async def _gather_contexts(
+    query: str,
+    router_result: RouterResult,
+    speculation: Optional["_Speculation"] = None,
+) -> tuple[str, List[Dict], str, List[Dict], List[str]]:
+    """
+    라우팅 결과에 필요한 모든 소스를 동시에 조회
+
+    HYBRID 쿼리의 지연 시간은 소스들의 합이 아니라 가장 느린 소스(최대 타임아웃)로 제한됩니다.
+
+    Returns:
+        (rag_context, rag_sources, mcp_context, mcp_sources, dropped_sources)
+    """
+    use_rag = router_result.query_type in (QueryType.RAG, QueryType.HYBRID)
+    use_mcp = router_result.query_type in (QueryType.MCP, QueryType.HYBRID)
+
+    # (소스 이름, 코루틴, 타임아웃) - MCP 컨텍스트는 이 순서대로 병합
+    fetchers = []
+    if use_mcp and "arxiv" in router_result.mcp_targets:
+        fetchers.append(("arxiv", _get_arxiv_context(query), settings.arxiv_source_timeout_seconds))
+    if use_mcp and "huggingface" in router_result.mcp_targets:
+        fetchers.append(("huggingface_spaces", _get_hf_spaces_context(query), settings.huggingface_source_timeout_seconds))
+        fetchers.append(("huggingface_models", _get_hf_models_context(query), settings.huggingface_source_timeout_seconds))
+
+    # 캐시 조회와 겹쳐서 미리 시작한 RAG 검색이 있으면 재사용
+    speculative_rag = speculation.take_rag() if speculation and use_rag else None
+    if use_rag and speculative_rag is None:
+        fetchers.append(("rag", _get_rag_context(query), settings.rag_source_timeout_seconds))
+
+    awaitables = [_with_deadline(name, coro, timeout) for name, coro, timeout in fetchers]
+    if use_rag and speculative_rag is not None:
+        fetchers.append(("rag", None, None))
+        awaitables.append(speculative_rag)
+
+    results = await asyncio.gather(*awaitables)
+
+    rag_context = ""
+    rag_sources: List[Dict] = []
+    mcp_contexts = []
+    mcp_sources: List[Dict] = []
+    dropped_sources = []
+
+    for (name, _, _), result in zip(fetchers, results):
+        if result is None:
+            dropped_sources.append(name)
+            continue
+
+        context, sources = result
+        if name == "rag":
+            rag_context, rag_sources = context, sources
+        else:
+            if context:
+                mcp_contexts.append(context)
+            mcp_sources.extend(sources)
+
+    return rag_context, rag_sources, "\n\n".join(mcp_contexts), mcp_sources, dropped_sources
+
+
 def _merge_and_rank_sources(
     rag_sources: List[Dict],
     mcp_sources: List[Dict],
@@ -116,6 +215,161 @@ def _merge_and_rank_sources(
     return all_sources[:10]
 
 
+MCP_SYSTEM_PROMPT = """당신은 AI 분야 전문가입니다. 제공된 실시간 검색 결과를 기반으로 답변하세요.
+
+규칙:
+1. 검색 결과에 있는 정보를 중심으로 답변하세요.
+2. 논문이나 모델의 제목과 링크를 인용하세요.
+3. 최신 정보임을 강조하세요.
+4. 답변은 한국어로 작성하세요."""
+
+NO_CONTEXT_RESPONSE = (
+    "죄송합니다. 질문과 관련된 정보를 찾을 수 없습니다. "
+    "다른 방식으로 질문해 주시거나, 더 구체적인 키워드를 사용해 보세요."
+)
+
+
+# 추측 실행 통계 (프로세스 단위)
+_speculation_stats: Dict[str, int] = {
+    "launched": 0,  # 시작된 추측 작업 수
+    "used": 0,  # 결과가 실제로 사용된 작업 수
+    "wasted": 0,  # 버려진 작업 수 (캐시 히트, 라우팅 불일치, 병합된 요청)
+    "wasted_completed": 0,  # 버려진 작업 중 이미 끝까지 실행된 작업 수 (비용 전부 지불)
+}
+
+
+class _Speculation:
+    """
+    캐시 조회와 동시에 미리 시작하는 분류/검색 작업
+
+    speculative_policy:
+    - "off": 사용 안 함
+    - "classify": classify_query만 미리 실행
+    - "retrieve": classify_query + RAG 검색 미리 실행
+
+    쿼리 임베딩은 openai_client의 임베딩 캐시(in-flight 공유)를 통해
+    캐시 조회와 RAG 검색이 한 번의 API 호출을 함께 사용합니다.
+    """
+
+    def __init__(self, query: str, policy: str):
+        self._classify_task: Optional[asyncio.Task] = None
+        self._rag_task: Optional[asyncio.Task] = None
+
+        if policy in ("classify", "retrieve"):
+            self._classify_task = asyncio.create_task(classify_query(query))
+            _speculation_stats["launched"] += 1
+        if policy == "retrieve":
+            self._rag_task = asyncio.create_task(
+                _with_deadline("rag", _get_rag_context(query), settings.rag_source_timeout_seconds)
+            )
+            _speculation_stats["launched"] += 1
+
+    def take_classify(self) -> Optional[asyncio.Task]:
+        task, self._classify_task = self._classify_task, None
+        if task is not None:
+            _speculation_stats["used"] += 1
+        return task
+
+    def take_rag(self) -> Optional[asyncio.Task]:
+        task, self._rag_task = self._rag_task, None
+        if task is not None:
+            _speculation_stats["used"] += 1
+        return task
+
+    def discard(self) -> None:
+        """사용되지 않은 추측 작업 취소"""
+        for task in (self._classify_task, self._rag_task):
+            if task is None:
+                continue
+            _speculation_stats["wasted"] += 1
+            if task.done():
+                _speculation_stats["wasted_completed"] += 1
+            else:
+                task.cancel()
+        self._classify_task = None
+        self._rag_task = None
+
+
+def _start_speculation(query: str) -> Optional[_Speculation]:
+    if settings.speculative_policy == "off":
+        return None
+    return _Speculation(query, settings.speculative_policy)
+
+
+async def _prepare_generation(
+    query: str,
+    speculation: Optional[_Speculation] = None,
+) -> tuple[RouterResult, str, Optional[str], List[Dict[str, Any]], List[str]]:
+    """
+    쿼리 분류 → 소스 조회 → 컨텍스트/소스 병합
+
+    Returns:
+        (router_result, combined_context, system_prompt, all_sources, dropped_sources)
+    """
+    # LLM Router로 쿼리 분류 (미리 시작된 분류가 있으면 그 결과 사용)
+    speculative_classify = speculation.take_classify() if speculation else None
+    if speculative_classify is not None:
+        router_result = await speculative_classify
+    else:
+        router_result = await classify_query(query)
+    print(f"[Router] {query[:50]}... → {router_result.query_type} (confidence: {router_result.confidence})")
+
+    # 분류에 따른 처리 (RAG / MCP 소스 동시 조회)
+    rag_context, rag_sources, mcp_context, mcp_sources, dropped_sources = await _gather_contexts(
+        query, router_result, speculation
+    )
+
+    # 사용되지 않은 추측 작업 정리 (예: MCP 전용 쿼리의 RAG 검색)
+    if speculation:
+        speculation.discard()
+
+    # 컨텍스트 병합
+    contexts = []
+    if mcp_context:
+        contexts.append(f"## 실시간 검색 결과\n{mcp_context}")
+    if rag_context:
+        contexts.append(f"## 지식 베이스\n{rag_context}")
+
+    combined_context = "\n\n---\n\n".join(contexts) if contexts else ""
+
+    # 소스 병합 및 정렬
+    all_sources = _merge_and_rank_sources(rag_sources, mcp_sources, router_result.query_type)
+
+    # 쿼리 타입에 따른 시스템 프롬프트 조정 (None이면 기본 프롬프트 사용)
+    system_prompt = MCP_SYSTEM_PROMPT if router_result.query_type == QueryType.MCP else None
+
+    return router_result, combined_context, system_prompt, all_sources, dropped_sources
+
+
+async def _answer_and_cache(
+    db: AsyncSession,
+    query: str,
+    speculation: Optional[_Speculation] = None,
+) -> tuple[QueryType, str, List[Dict[str, Any]], List[str]]:
+    """
+    캐시 미스 경로: 응답 생성 후 캐시 저장
+
+    single-flight로 공유되는 결과이므로 호출자는 반환값을 변경하지 않아야 합니다.
+
+    Returns:
+        (query_type, response_text, all_sources, dropped_sources)
+    """
+    router_result, combined_context, system_prompt, all_sources, dropped_sources = (
+        await _prepare_generation(query, speculation)
+    )
+
+    # 응답 생성 (컨텍스트가 없으면 안내 메시지)
+    if combined_context:
+        response_text = await generate_response(query, combined_context, system_prompt)
+    else:
+        response_text = NO_CONTEXT_RESPONSE
+
+    # 캐시 저장 (write-behind 모드면 응답 반환 후 백그라운드에서 기록)
+    await save_to_cache_deferred(db, query, response_text, all_sources)
+
+    return router_result.query_type, response_text, all_sources, dropped_sources
+
+
 @router.post("", response_model=ChatResponse)
 async def chat(
     request: ChatRequest,
@@ -136,10 +390,21 @@ async def chat(
     if not query:
         raise HTTPException(status_code=400, detail="Query cannot be empty")
 
+    # (선택) 캐시 조회와 겹쳐서 분류/검색을 미리 시작
+    speculation = _start_speculation(query)
+
     # 1. 캐시 확인
-    cached = await get_cached_response(db, query)
+    try:
+        cached = await get_cached_response(db, query)
+    except BaseException:
+        if speculation:
+            speculation.discard()
+        raise
 
     if cached:
+        if speculation:
+            speculation.discard()
+
         response_text, sources = cached
         latency_ms = int((time.time() - start_time) * 1000)
 
@@ -166,65 +431,22 @@ async def chat(
             analytics_id=analytics_id,
         )
 
-    # 2. LLM Router로 쿼리 분류
-    router_result = await classify_query(query)
-    print(f"[Router] {query[:50]}... → {router_result.query_type} (confidence: {router_result.confidence})")
-
-    # 3. 분류에 따른 처리
-    rag_context = ""
-    mcp_context = ""
-    rag_sources: List[Dict] = []
-    mcp_sources: List[Dict] = []
-
-    if router_result.query_type == QueryType.RAG:
-        # RAG만 사용
-        rag_context, rag_sources = await _get_rag_context(query)
-
-    elif router_result.query_type == QueryType.MCP:
-        # MCP만 사용
-        mcp_context, mcp_sources = await _get_mcp_context(query, router_result.mcp_targets)
-
-    elif router_result.query_type == QueryType.HYBRID:
-        # RAG + MCP 둘 다 사용
-        rag_context, rag_sources = await _get_rag_context(query)
-        mcp_context, mcp_sources = await _get_mcp_context(query, router_result.mcp_targets)
-
-    # 컨텍스트 병합
-    contexts = []
-    if mcp_context:
-        contexts.append(f"## 실시간 검색 결과\n{mcp_context}")
-    if rag_context:
-        contexts.append(f"## 지식 베이스\n{rag_context}")
-
-    combined_context = "\n\n---\n\n".join(contexts) if contexts else ""
-
-    # 소스 병합 및 정렬
-    all_sources = _merge_and_rank_sources(rag_sources, mcp_sources, router_result.query_type)
-
-    # 4. 응답 생성
-    if combined_context:
-        # 쿼리 타입에 따른 시스템 프롬프트 조정
-        if router_result.query_type == QueryType.MCP:
-            system_prompt = """당신은 AI 분야 전문가입니다. 제공된 실시간 검색 결과를 기반으로 답변하세요.
-
-규칙:
-1. 검색 결과에 있는 정보를 중심으로 답변하세요.
-2. 논문이나 모델의 제목과 링크를 인용하세요.
-3. 최신 정보임을 강조하세요.
-4. 답변은 한국어로 작성하세요."""
+    # 2-5. 분류 → 컨텍스트 수집 → 응답 생성 → 캐시 저장
+    # 동일 쿼리가 동시에 들어오면 첫 요청만 처리하고 나머지는 결과를 공유
+    try:
+        if settings.single_flight_enabled:
+            query_type, response_text, all_sources, dropped_sources = await get_chat_single_flight().do(
+                generate_query_hash(query),
+                lambda: _answer_and_cache(db, query, speculation),
+            )
         else:
-            system_prompt = None  # 기본 프롬프트 사용
-
-        response_text = await generate_response(query, combined_context, system_prompt)
-    else:
-        # 컨텍스트가 없는 경우
-        response_text = (
-            "죄송합니다. 질문과 관련된 정보를 찾을 수 없습니다. "
-            "다른 방식으로 질문해 주시거나, 더 구체적인 키워드를 사용해 보세요."
-        )
-
-    # 5. 캐시 저장
-    await save_to_cache(db, query, response_text, all_sources)
+            query_type, response_text, all_sources, dropped_sources = await _answer_and_cache(
+                db, query, speculation
+            )
+    finally:
+        # 다른 요청의 결과를 공유받은 경우 등 사용되지 않은 추측 작업 정리
+        if speculation:
+            speculation.discard()
 
     # 6. Analytics 로깅
     latency_ms = int((time.time() - start_time) * 1000)
@@ -232,7 +454,7 @@ async def chat(
         db=db,
         query_text=query,
         response_text=response_text,
-        source_type=router_result.query_type.value,
+        source_type=query_type.value,
         user_id=request.user_id,
         latency_ms=latency_ms,
     )
@@ -248,18 +470,153 @@ async def chat(
         ),
         cached=False,
         analytics_id=analytics_id,
+        dropped_sources=list(dropped_sources),
+    )
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    """Server-Sent Events 프레임 생성"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def _stream_chat(query: str, user_id: Optional[str]) -> AsyncIterator[str]:
+    """
+    스트리밍 응답 이벤트 생성기
+
+    이벤트 순서: sources → token (여러 번) → done
+    오류 시 error 이벤트로 종료합니다.
+
+    요청 스코프의 get_db 세션은 스트리밍 도중 닫히므로 자체 세션을 사용합니다.
+    """
+    start_time = time.time()
+    message_id = str(uuid.uuid4())
+    speculation = _start_speculation(query)
+
+    async with async_session_maker() as db:
+        try:
+            # 1. 캐시 확인 → 캐시 히트도 같은 포맷으로 재생
+            cached = await get_cached_response(db, query)
+
+            if cached:
+                if speculation:
+                    speculation.discard()
+
+                response_text, sources = cached
+                yield _sse("sources", {"id": message_id, "sources": sources, "cached": True})
+                yield _sse("token", {"content": response_text})
+
+                latency_ms = int((time.time() - start_time) * 1000)
+                analytics_id = await log_query(
+                    db=db,
+                    query_text=query,
+                    response_text=response_text,
+                    source_type="cache",
+                    user_id=user_id,
+                    latency_ms=latency_ms,
+                )
+                await db.commit()
+
+                yield _sse("done", {
+                    "id": message_id,
+                    "cached": True,
+                    "analytics_id": analytics_id,
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                })
+                return
+
+            # 2-3. 쿼리 분류 및 컨텍스트 수집 → 소스 먼저 전송
+            router_result, combined_context, system_prompt, all_sources, dropped_sources = (
+                await _prepare_generation(query, speculation)
+            )
+            yield _sse("sources", {
+                "id": message_id,
+                "sources": all_sources,
+                "cached": False,
+                "dropped_sources": dropped_sources,
+            })
+
+            # 4. 토큰 단위 스트리밍
+            parts: List[str] = []
+            if combined_context:
+                async for token in generate_response_stream(query, combined_context, system_prompt):
+                    parts.append(token)
+                    yield _sse("token", {"content": token})
+            else:
+                parts.append(NO_CONTEXT_RESPONSE)
+                yield _sse("token", {"content": NO_CONTEXT_RESPONSE})
+
+            response_text = "".join(parts)
+
+            # 5. 스트림이 끝까지 완료된 경우에만 캐시 저장 및 로깅
+            await save_to_cache_deferred(db, query, response_text, all_sources)
+
+            latency_ms = int((time.time() - start_time) * 1000)
+            analytics_id = await log_query(
+                db=db,
+                query_text=query,
+                response_text=response_text,
+                source_type=router_result.query_type.value,
+                user_id=user_id,
+                latency_ms=latency_ms,
+            )
+            await db.commit()
+
+            yield _sse("done", {
+                "id": message_id,
+                "cached": False,
+                "analytics_id": analytics_id,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            })
+
+        except Exception as e:
+            await db.rollback()
+            print(f"[ChatStream] Error: {e}")
+            yield _sse("error", {"detail": "응답 생성 중 오류가 발생했습니다."})
+        finally:
+            if speculation:
+                speculation.discard()
+
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    스트리밍 챗봇 질의 처리 (SSE)
+
+    - sources: 참고 소스 (생성 시작 전에 전송)
+    - token: 생성된 텍스트 조각
+    - done: analytics_id 등 메타데이터 (완료 후 캐시 저장/로깅)
+    """
+    query = request.query.strip()
+
+    if not query:
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+
+    return StreamingResponse(
+        _stream_chat(query, request.user_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # 프록시 버퍼링 비활성화
+        },
     )
 
 
 @router.get("/stats")
 async def get_chat_stats(db: AsyncSession = Depends(get_db)):
     """챗봇 통계 조회"""
-    doc_count = get_document_count()
+    doc_count = await get_document_count()
 
     return {
         "document_count": doc_count,
         "status": "ready" if doc_count > 0 else "no_documents",
         "features": ["rag", "mcp_arxiv", "mcp_huggingface", "llm_router"],
+        "l1_cache": get_memory_cache().stats(),
+        "l1_hit_counter": get_cache_hit_counter().stats(),
+        "embedding_cache": get_embedding_cache_stats(),
+        "single_flight": get_chat_single_flight().stats(),
+        "speculation": {"policy": settings.speculative_policy, **_speculation_stats},
+        "cache_write_behind": get_cache_write_behind().stats(),
+        "cache_sweeper": get_cache_sweeper().stats(),
     }
 
 
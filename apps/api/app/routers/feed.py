@@ -1,14 +1,62 @@
-from fastapi import APIRouter, Depends, Query
+import base64
+import binascii
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, func, text, tuple_
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+from app.config import get_settings
 from app.db.neon import get_db
 from app.models.db_models import User, Guru, GuruPost
-from app.models.schemas import GuruResponse, PostResponse, FeedResponse
+from app.models.schemas import GuruResponse, PostCreate, PostResponse, FeedResponse
+from app.services.feed.posts import add_posts, delete_posts
+from app.services.feed.timeline import get_timeline_state, read_timeline, rebuild_user_timeline
 
 router = APIRouter()
+settings = get_settings()
+
+
+def _encode_cursor(post: GuruPost) -> str:
+    """마지막 포스트의 (posted_at, id)를 불투명 커서로 인코딩"""
+    raw = f"{post.posted_at.isoformat()}|{post.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        posted_at, post_id = raw.split("|", 1)
+        return datetime.fromisoformat(posted_at), post_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _count_posts(db: AsyncSession, filter_guru_ids: List[str]) -> Tuple[int, bool]:
+    """
+    피드 총 개수
+
+    필터가 있으면 (guru_id, ...) 인덱스로 COUNT,
+    전체 피드가 크면 pg_class.reltuples 추정치 사용 (ANALYZE 전이면 COUNT)
+
+    Returns:
+        (total, 추정치 여부)
+    """
+    if not filter_guru_ids:
+        result = await db.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'guru_posts'::regclass")
+        )
+        estimate = result.scalar() or 0
+        if estimate >= settings.feed_count_estimate_threshold:
+            return estimate, True
+
+    count_query = select(func.count()).select_from(GuruPost)
+    if filter_guru_ids:
+        count_query = count_query.where(GuruPost.guru_id.in_(filter_guru_ids))
+    result = await db.execute(count_query)
+    return result.scalar_one(), False
 
 
 @router.get("/gurus", response_model=List[GuruResponse])
@@ -25,6 +73,7 @@ async def get_feed(
     guru_ids: Optional[str] = Query(None, description="콤마로 구분된 guru_id 목록"),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="이전 응답의 next_cursor (지정 시 offset 무시)"),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -32,7 +81,28 @@ async def get_feed(
     - user_id가 있으면 해당 사용자가 팔로우하는 Guru의 포스트
     - guru_ids가 있으면 해당 Guru들의 포스트
     - 둘 다 없으면 전체 포스트
+
+    cursor를 사용하면 (posted_at, id) keyset 페이지네이션으로
+    페이지 깊이와 관계없이 일정한 지연 시간을 유지합니다.
+    user_id 피드는 미리 계산된 타임라인이 있으면 그것을 사용합니다.
     """
+    cursor_key = _decode_cursor(cursor) if cursor else None
+
+    # 타임라인 경로 (팔로우 Guru 조회 + IN 쿼리 없이 인덱스 한 번)
+    timeline_state = None
+    if user_id and settings.timeline_enabled:
+        timeline_state = await get_timeline_state(db, user_id)
+        if timeline_state is not None:
+            page = await read_timeline(db, timeline_state, limit, offset=offset, cursor=cursor_key)
+            if page is not None:
+                posts, has_more = page
+                return FeedResponse(
+                    posts=posts,
+                    total=timeline_state.post_count,
+                    has_more=has_more,
+                    next_cursor=_encode_cursor(posts[-1]) if has_more else None,
+                )
+
     # 필터링할 Guru ID 결정
     filter_guru_ids = []
 
@@ -46,6 +116,9 @@ async def get_feed(
         user = result.scalar_one_or_none()
         if user:
             filter_guru_ids = [g.id for g in user.followed_gurus]
+            if filter_guru_ids and settings.timeline_enabled and timeline_state is None:
+                # cold → 다음 조회부터 타임라인 사용
+                await rebuild_user_timeline(db, user.id, filter_guru_ids)
     elif guru_ids:
         filter_guru_ids = [gid.strip() for gid in guru_ids.split(",")]
 
@@ -56,21 +129,26 @@ async def get_feed(
         query = query.where(GuruPost.guru_id.in_(filter_guru_ids))
 
     # 총 개수 조회
-    count_query = select(GuruPost)
-    if filter_guru_ids:
-        count_query = count_query.where(GuruPost.guru_id.in_(filter_guru_ids))
-    count_result = await db.execute(count_query)
-    total = len(count_result.scalars().all())
+    total, total_is_estimate = await _count_posts(db, filter_guru_ids)
 
-    # 페이지네이션 적용
-    query = query.order_by(desc(GuruPost.posted_at)).offset(offset).limit(limit)
+    # 페이지네이션 적용 (id로 동률 정렬 고정, has_more 판단용으로 1개 더 조회)
+    if cursor_key:
+        query = query.where(tuple_(GuruPost.posted_at, GuruPost.id) < tuple_(*cursor_key))
+    else:
+        query = query.offset(offset)
+    query = query.order_by(desc(GuruPost.posted_at), desc(GuruPost.id)).limit(limit + 1)
     result = await db.execute(query)
     posts = result.scalars().all()
 
+    has_more = len(posts) > limit
+    posts = posts[:limit]
+
     return FeedResponse(
         posts=posts,
         total=total,
-        has_more=(offset + len(posts)) < total,
+        has_more=has_more,
+        next_cursor=_encode_cursor(posts[-1]) if has_more else None,
+        total_is_estimate=total_is_estimate,
     )
 
 
@@ -86,9 +164,35 @@ async def get_guru_posts(
         select(GuruPost)
         .options(selectinload(GuruPost.guru))
         .where(GuruPost.guru_id == guru_id)
-        .order_by(desc(GuruPost.posted_at))
+        .order_by(desc(GuruPost.posted_at), desc(GuruPost.id))
         .offset(offset)
         .limit(limit)
     )
     posts = result.scalars().all()
     return posts
+
+
+@router.post("/posts", response_model=List[PostResponse], status_code=201)
+async def create_posts(posts: List[PostCreate], db: AsyncSession = Depends(get_db)):
+    """포스트 추가 (팔로워 타임라인에 바로 반영)"""
+    guru_ids = {post.guru_id for post in posts}
+    result = await db.execute(select(Guru.id).where(Guru.id.in_(guru_ids)))
+    unknown = guru_ids - set(result.scalars())
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Guru not found: {', '.join(sorted(unknown))}")
+
+    created = await add_posts(db, [post.model_dump() for post in posts])
+    result = await db.execute(
+        select(GuruPost)
+        .options(selectinload(GuruPost.guru))
+        .where(GuruPost.id.in_([post.id for post in created]))
+        .order_by(desc(GuruPost.posted_at), desc(GuruPost.id))
+    )
+    return result.scalars().all()
+
+
+@router.delete("/posts/{post_id}", status_code=204)
+async def delete_post(post_id: str, db: AsyncSession = Depends(get_db)):
+    """포스트 삭제 (팔로워 타임라인과 피드 total에서도 제거)"""
+    if not await delete_posts(db, [post_id]):
+        raise HTTPException(status_code=404, detail="Post not found")
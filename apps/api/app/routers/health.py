@@ -1,4 +1,8 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.db.neon import get_pool_stats
+from app.services.rag.snapshot import get_rag_index_loader
 
 router = APIRouter()
 
@@ -7,3 +11,16 @@ router = APIRouter()
 async def health_check():
     """헬스체크 엔드포인트 (Render 슬립 방지용)"""
     return {"status": "healthy", "service": "ai-learning-tracker-api"}
+
+
+@router.get("/health/pool")
+async def pool_health():
+    """DB 커넥션 풀 상태 및 체크아웃 대기 메트릭"""
+    return get_pool_stats()
+
+
+@router.get("/health/ready")
+async def readiness():
+    """RAG 인덱스 적재 완료 여부 (스냅샷 적재 중이면 503)"""
+    stats = get_rag_index_loader().stats()
+    return JSONResponse(stats, status_code=200 if stats["ready"] else 503)
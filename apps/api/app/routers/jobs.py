@@ -0,0 +1,85 @@
+"""
+Background Jobs API Router
+
+Postgres 작업 큐(background_jobs) 등록 및 상태 조회 API
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+
+from app.db.neon import get_db
+from app.services.jobs import enqueue_job, get_job, get_job_worker, job_to_dict, list_jobs
+from app.services.jobs.handlers import validate_payload
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+class EnqueueJobRequest(BaseModel):
+    kind: str
+    payload: Dict[str, Any] = {}
+    dedupe_key: Optional[str] = None
+    max_attempts: Optional[int] = None
+
+
+@router.post("")
+async def create_job(
+    request: EnqueueJobRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    작업 등록
+
+    - kind: learning_cycle, pre_warm, improve_responses, cleanup, extend_ttl,
+      ingest_documents (rag_backend=pgvector에서만)
+    - 알 수 없는 종류 / payload 키는 400
+    - dedupe_key가 같은 작업이 대기/실행 중이면 409
+    """
+    try:
+        payload = validate_payload(request.kind, request.payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job_id = await enqueue_job(
+        db,
+        request.kind,
+        payload,
+        dedupe_key=request.dedupe_key,
+        max_attempts=request.max_attempts,
+    )
+    if job_id is None:
+        raise HTTPException(status_code=409, detail="A job with this dedupe_key is already queued or running")
+    get_job_worker().notify()
+
+    return {"id": job_id, "kind": request.kind, "status": "queued"}
+
+
+@router.get("")
+async def get_jobs(
+    kind: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_db),
+):
+    """최근 작업 목록"""
+    jobs = await list_jobs(db, kind=kind, status=status, limit=min(limit, 100))
+    return {"jobs": [job_to_dict(job) for job in jobs]}
+
+
+@router.get("/worker")
+async def get_worker_stats():
+    """이 레플리카의 작업 워커 상태"""
+    return get_job_worker().stats()
+
+
+@router.get("/{job_id}")
+async def get_job_detail(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+):
+    """작업 상태/결과 조회"""
+    job = await get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_to_dict(job)
@@ -4,14 +4,16 @@ Self-Learning API Router (Phase 4)
 셀프러닝 시스템 관리 및 실행 API
 """
 
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
 from datetime import datetime, timezone
 
 from app.db.neon import get_db
-from app.services.learning.self_learner import SelfLearner, run_self_learning
+from app.services.learning.worker_pool import get_openai_budget
+from app.services.jobs import enqueue_job, get_job_worker, get_kind_status
+from app.services.jobs.handlers import validate_payload
 
 router = APIRouter(prefix="/api/learning", tags=["learning"])
 
@@ -42,142 +44,130 @@ class CleanupRequest(BaseModel):
     min_hit_count: int = 0
 
 
-# 상태 저장 (실제 서비스에서는 Redis 등 사용)
-_learning_status: Dict[str, Any] = {
-    "is_running": False,
-    "last_run": None,
-    "last_result": None,
-}
+LEARNING_CYCLE_JOB = "learning_cycle"
+
+
+async def _enqueue_learning_job(
+    db: AsyncSession,
+    kind: str,
+    payload: Optional[Dict[str, Any]],
+    message: str,
+) -> LearningTaskResponse:
+    """
+    학습 작업을 작업 큐에 등록
+
+    - 종류별 dedupe_key: 대기/실행 중인 같은 작업이 있으면 409 (모든 레플리카 공통)
+    - 실행은 JobWorker가 lock_group="learning" advisory lock을 잡고 수행
+    """
+    try:
+        payload = validate_payload(kind, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    job_id = await enqueue_job(db, kind, payload, dedupe_key=kind)
+    if job_id is None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"{kind} job is already queued or running"
+        )
+    get_job_worker().notify()
+
+    return LearningTaskResponse(task_id=job_id, status="started", message=message)
 
 
 @router.post("/run", response_model=LearningTaskResponse)
 async def trigger_learning_cycle(
-    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """
-    셀프러닝 사이클 실행 (백그라운드)
+    셀프러닝 사이클 실행 (백그라운드 작업 큐)
 
     전체 학습 사이클:
     1. 인기 쿼리 Pre-warming
     2. 부정 피드백 응답 개선
     3. 오래된 캐시 정리
     """
-    if _learning_status["is_running"]:
-        raise HTTPException(
-            status_code=409,
-            detail="Learning cycle is already running"
-        )
-
-    task_id = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
-
-    async def run_learning_task():
-        global _learning_status
-        _learning_status["is_running"] = True
-        try:
-            result = await run_self_learning(db)
-            _learning_status["last_result"] = result
-            _learning_status["last_run"] = datetime.now(timezone.utc).isoformat()
-        except Exception as e:
-            _learning_status["last_result"] = {"error": str(e)}
-        finally:
-            _learning_status["is_running"] = False
-
-    background_tasks.add_task(run_learning_task)
-
-    return LearningTaskResponse(
-        task_id=task_id,
-        status="started",
-        message="Learning cycle started in background",
+    return await _enqueue_learning_job(
+        db, LEARNING_CYCLE_JOB, None, "Learning cycle queued as background job"
     )
 
 
 @router.get("/status")
-async def get_learning_status():
-    """셀프러닝 상태 조회"""
-    return {
-        "is_running": _learning_status["is_running"],
-        "last_run": _learning_status["last_run"],
-        "last_result": _learning_status["last_result"],
-    }
+async def get_learning_status(db: AsyncSession = Depends(get_db)):
+    """셀프러닝 상태 조회 (background_jobs 기준)"""
+    return await get_kind_status(db, LEARNING_CYCLE_JOB)
 
 
-@router.post("/pre-warm")
+@router.post("/pre-warm", response_model=LearningTaskResponse)
 async def pre_warm_cache(
     request: PreWarmRequest,
     db: AsyncSession = Depends(get_db),
 ):
     """
-    인기 쿼리 Pre-warming 실행
+    인기 쿼리 Pre-warming 실행 (백그라운드 작업 큐)
 
     - 자주 묻는 질문을 미리 캐싱
     - 사용자 응답 속도 향상
+    - 결과는 GET /api/jobs/{task_id}
     """
-    learner = SelfLearner(db)
-    result = await learner.pre_warm_popular_queries(
-        days=request.days,
-        min_count=request.min_count,
-        limit=request.limit,
+    return await _enqueue_learning_job(
+        db, "pre_warm", request.model_dump(), "Pre-warming queued as background job"
     )
-    return result
 
 
-@router.post("/improve-responses")
+@router.post("/improve-responses", response_model=LearningTaskResponse)
 async def improve_negative_responses(
     days: int = 7,
     min_negative: int = 2,
     db: AsyncSession = Depends(get_db),
 ):
     """
-    부정 피드백 응답 개선
+    부정 피드백 응답 개선 (백그라운드 작업 큐)
 
     - 부정 피드백이 많은 쿼리를 재처리
     - 개선된 응답으로 캐시 업데이트
     """
-    learner = SelfLearner(db)
-    result = await learner.improve_negative_responses(
-        days=days,
-        min_negative=min_negative,
+    return await _enqueue_learning_job(
+        db,
+        "improve_responses",
+        {"days": days, "min_negative": min_negative},
+        "Response improvement queued as background job"
     )
-    return result
 
 
-@router.post("/cleanup")
+@router.post("/cleanup", response_model=LearningTaskResponse)
 async def cleanup_cache(
     request: CleanupRequest,
     db: AsyncSession = Depends(get_db),
 ):
     """
-    오래된 캐시 정리
+    오래된 캐시 정리 (백그라운드 작업 큐)
 
     - 지정된 기간 이상 된 캐시 삭제
     - 조회수가 낮은 캐시 정리
     """
-    learner = SelfLearner(db)
-    result = await learner.cleanup_stale_cache(
-        max_age_days=request.max_age_days,
-        min_hit_count=request.min_hit_count,
+    return await _enqueue_learning_job(
+        db, "cleanup", request.model_dump(), "Cache cleanup queued as background job"
     )
-    return result
 
 
-@router.post("/extend-ttl")
+@router.post("/extend-ttl", response_model=LearningTaskResponse)
 async def extend_high_quality_cache(
     positive_threshold: int = 3,
     extension_days: int = 7,
     db: AsyncSession = Depends(get_db),
 ):
     """
-    좋은 응답의 캐시 TTL 연장
+    좋은 응답의 캐시 TTL 연장 (백그라운드 작업 큐)
 
     - 긍정 피드백이 많은 캐시는 더 오래 유지
     """
-    learner = SelfLearner(db)
-    result = await learner.extend_high_quality_cache(
-        positive_threshold=positive_threshold,
-        extension_days=extension_days,
+    return await _enqueue_learning_job(
+        db,
+        "extend_ttl",
+        {"positive_threshold": positive_threshold, "extension_days": extension_days},
+        "TTL extension queued as background job"
     )
-    return result
 
 
 @router.get("/stats")
@@ -216,6 +206,7 @@ async def get_learning_stats(
     # 개선 가능한 쿼리 수 (부정 피드백 2개 이상)
     from app.services.analytics.logger import get_negative_feedback_queries
     negative_queries = await get_negative_feedback_queries(db, days=7, min_negative=2)
+    learning_status = await get_kind_status(db, LEARNING_CYCLE_JOB)
 
     return {
         "cache": {
@@ -224,6 +215,7 @@ async def get_learning_stats(
             "expired_entries": expired_count,
         },
         "improvement_candidates": len(negative_queries),
-        "last_learning_run": _learning_status["last_run"],
-        "is_running": _learning_status["is_running"],
+        "last_learning_run": learning_status["last_run"],
+        "is_running": learning_status["is_running"],
+        "openai_budget": get_openai_budget().stats(),
     }
@@ -7,8 +7,11 @@ from typing import List
 from app.db.neon import get_db
 from app.models.db_models import User, Guru, user_gurus
 from app.models.schemas import UserCreate, UserResponse, UserGuruUpdate, GuruResponse
+from app.config import get_settings
+from app.services.feed.timeline import rebuild_user_timeline
 
 router = APIRouter()
+settings = get_settings()
 
 
 @router.post("/sync", response_model=UserResponse)
@@ -96,6 +99,10 @@ async def update_user_gurus(
     user.followed_gurus = list(gurus)
     await db.flush()
 
+    # 팔로우 변경 → 타임라인 재생성
+    if settings.timeline_enabled:
+        await rebuild_user_timeline(db, user.id, [g.id for g in gurus])
+
     return user.followed_gurus
 
 
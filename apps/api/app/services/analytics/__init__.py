@@ -5,6 +5,7 @@ from .logger import (
     get_popular_queries,
     get_recent_queries,
     get_negative_feedback_queries,
+    get_dashboard_data,
 )
 
 __all__ = [
@@ -14,4 +15,5 @@ __all__ = [
     "get_popular_queries",
     "get_recent_queries",
     "get_negative_feedback_queries",
+    "get_dashboard_data",
 ]
@@ -4,12 +4,35 @@ Analytics Logger Service
 쿼리/응답을 기록하고 통계를 제공합니다.
 """
 
+import asyncio
 from datetime import datetime, timezone, timedelta
 from typing import Optional, List, Dict, Any
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, desc, case
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import select, func, desc, case, literal_column
 
-from app.models.db_models import QueryAnalytics
+from app.config import get_settings
+from app.db.migrations import QUERY_FINGERPRINT_SQL
+from app.db.neon import async_session_maker
+from app.models.db_models import QueryAnalytics, QueryAnalyticsHourly
+from app.services.analytics.rollup import (
+    HISTOGRAM_SIZE,
+    bucket_start,
+    histogram_percentile,
+    latency_bucket_conditions,
+    record_feedback_change,
+    record_rows,
+    rollup_covers,
+)
+from app.services.analytics.writer import get_analytics_writer
+from app.services.cache.semantic_cache import generate_query_hash
+
+settings = get_settings()
+
+# fingerprint backfill 이전 행도 같은 그룹으로 묶이도록 SQL로 계산
+query_fingerprint_expr = func.coalesce(
+    QueryAnalytics.query_fingerprint,
+    literal_column(QUERY_FINGERPRINT_SQL.format(column="query_analytics.query_text")),
+)
 
 
 async def log_query(
@@ -19,16 +42,30 @@ async def log_query(
     source_type: str,
     user_id: Optional[str] = None,
     latency_ms: Optional[int] = None,
-) -> str:
+) -> Optional[str]:
     """
     쿼리/응답 로깅
 
+    analytics_async_enabled이고 writer가 실행 중이면 백그라운드 배치 writer에 넘기고
+    DB I/O 없이 바로 반환합니다.
+
     Returns:
-        생성된 analytics 레코드 ID
+        생성된 analytics 레코드 ID (큐가 가득 차서 버려진 경우 None)
     """
+    writer = get_analytics_writer()
+    if settings.analytics_async_enabled and writer.running:
+        return writer.submit(
+            query_text=query_text,
+            response_text=response_text,
+            source_type=source_type,
+            user_id=user_id,
+            latency_ms=latency_ms,
+        )
+
     analytics = QueryAnalytics(
         user_id=user_id,
         query_text=query_text,
+        query_fingerprint=generate_query_hash(query_text),
         response_text=response_text,
         source_type=source_type,
         latency_ms=latency_ms,
@@ -36,6 +73,13 @@ async def log_query(
     db.add(analytics)
     await db.flush()
     await db.refresh(analytics)
+    await record_rows(db, [{
+        "created_at": analytics.created_at,
+        "query_text": query_text,
+        "source_type": source_type,
+        "feedback": None,
+        "latency_ms": latency_ms,
+    }])
     return analytics.id
 
 
@@ -45,14 +89,22 @@ async def record_feedback(
     feedback: int,  # 1: positive, -1: negative
 ) -> bool:
     """사용자 피드백 기록"""
+    # 아직 배치 writer 큐에 있는 레코드
+    if get_analytics_writer().apply_feedback(analytics_id, feedback):
+        return True
+
     result = await db.execute(
         select(QueryAnalytics).where(QueryAnalytics.id == analytics_id)
     )
     record = result.scalar_one_or_none()
 
     if record:
+        previous = record.feedback
         record.feedback = feedback
         await db.flush()
+        await record_feedback_change(
+            db, record.created_at, record.query_text, record.source_type, previous, feedback
+        )
         return True
     return False
 
@@ -61,59 +113,66 @@ async def get_analytics_summary(
     db: AsyncSession,
     days: int = 7,
 ) -> Dict[str, Any]:
-    """분석 요약 통계"""
-    since = datetime.now(timezone.utc) - timedelta(days=days)
-
-    # 전체 쿼리 수
-    total_result = await db.execute(
-        select(func.count(QueryAnalytics.id)).where(
-            QueryAnalytics.created_at >= since
-        )
-    )
-    total_queries = total_result.scalar() or 0
+    """
+    분석 요약 통계
 
-    # 소스 타입별 분포
-    source_result = await db.execute(
-        select(
-            QueryAnalytics.source_type,
-            func.count(QueryAnalytics.id).label("count")
-        )
-        .where(QueryAnalytics.created_at >= since)
-        .group_by(QueryAnalytics.source_type)
-    )
-    source_distribution = {row[0] or "unknown": row[1] for row in source_result}
-
-    # 피드백 통계
-    positive_result = await db.execute(
-        select(func.count(QueryAnalytics.id)).where(
-            and_(
-                QueryAnalytics.created_at >= since,
-                QueryAnalytics.feedback == 1
-            )
-        )
-    )
-    positive_count = positive_result.scalar() or 0
+    기간이 롤업 커버리지 안이면 시간별 롤업(시간 단위 정렬)에서,
+    아니면 원본을 한 번만 스캔하여 source_type별로 집계한 뒤
+    (FILTER 절로 피드백/지연 시간 동시 집계) 전체 값은 Python에서 합산합니다.
+    """
+    since = datetime.now(timezone.utc) - timedelta(days=days)
 
-    negative_result = await db.execute(
-        select(func.count(QueryAnalytics.id)).where(
-            and_(
-                QueryAnalytics.created_at >= since,
-                QueryAnalytics.feedback == -1
+    if await rollup_covers(db, since):
+        hourly = QueryAnalyticsHourly
+        result = await db.execute(
+            select(
+                hourly.source_type,
+                func.sum(hourly.query_count).label("total"),
+                func.sum(hourly.positive).label("positive"),
+                func.sum(hourly.negative).label("negative"),
+                func.sum(hourly.latency_sum).label("latency_sum"),
+                func.sum(hourly.latency_count).label("latency_count"),
+                *[
+                    func.sum(hourly.latency_hist[i + 1]).label(f"h{i}")
+                    for i in range(HISTOGRAM_SIZE)
+                ],
             )
+            .where(hourly.bucket_start >= bucket_start(since))
+            .group_by(hourly.source_type)
         )
-    )
-    negative_count = negative_result.scalar() or 0
-
-    # 평균 응답 시간
-    latency_result = await db.execute(
-        select(func.avg(QueryAnalytics.latency_ms)).where(
-            and_(
-                QueryAnalytics.created_at >= since,
-                QueryAnalytics.latency_ms.isnot(None)
+    else:
+        result = await db.execute(
+            select(
+                QueryAnalytics.source_type,
+                func.count().label("total"),
+                func.count().filter(QueryAnalytics.feedback == 1).label("positive"),
+                func.count().filter(QueryAnalytics.feedback == -1).label("negative"),
+                func.sum(QueryAnalytics.latency_ms).label("latency_sum"),
+                func.count(QueryAnalytics.latency_ms).label("latency_count"),
+                *[
+                    func.count().filter(condition).label(f"h{i}")
+                    for i, condition in enumerate(latency_bucket_conditions(QueryAnalytics.latency_ms))
+                ],
             )
+            .where(QueryAnalytics.created_at >= since)
+            .group_by(QueryAnalytics.source_type)
         )
-    )
-    avg_latency = latency_result.scalar()
+    rows = [row._mapping for row in result]
+
+    source_distribution: Dict[str, int] = {}
+    for row in rows:
+        key = row["source_type"] or "unknown"
+        if row["total"]:
+            source_distribution[key] = source_distribution.get(key, 0) + int(row["total"])
+
+    total_queries = sum(int(row["total"] or 0) for row in rows)
+    positive_count = sum(int(row["positive"] or 0) for row in rows)
+    negative_count = sum(int(row["negative"] or 0) for row in rows)
+    latency_sum = sum(int(row["latency_sum"] or 0) for row in rows)
+    latency_count = sum(int(row["latency_count"] or 0) for row in rows)
+    avg_latency = latency_sum / latency_count if latency_count else None
+
+    histogram = [sum(int(row[f"h{i}"] or 0) for row in rows) for i in range(HISTOGRAM_SIZE)]
 
     return {
         "period_days": days,
@@ -125,6 +184,7 @@ async def get_analytics_summary(
             "total": positive_count + negative_count,
         },
         "avg_latency_ms": round(avg_latency) if avg_latency else None,
+        "p95_latency_ms": histogram_percentile(histogram, 0.95),
     }
 
 
@@ -136,9 +196,35 @@ async def get_popular_queries(
     """인기 쿼리 목록 (Phase 4 셀프러닝용)"""
     since = datetime.now(timezone.utc) - timedelta(days=days)
 
+    if await rollup_covers(db, since):
+        hourly = QueryAnalyticsHourly
+        count = func.sum(hourly.query_count)
+        result = await db.execute(
+            select(
+                func.min(hourly.query_text),
+                count.label("count"),
+                func.sum(hourly.positive),
+                func.sum(hourly.negative),
+            )
+            .where(hourly.bucket_start >= bucket_start(since))
+            .group_by(hourly.fingerprint)
+            .having(count > 0)
+            .order_by(desc("count"))
+            .limit(limit)
+        )
+        return [
+            {
+                "query": row[0],
+                "count": int(row[1]),
+                "positive_feedback": int(row[2] or 0),
+                "negative_feedback": int(row[3] or 0),
+            }
+            for row in result
+        ]
+
     result = await db.execute(
         select(
-            QueryAnalytics.query_text,
+            func.min(QueryAnalytics.query_text),
             func.count(QueryAnalytics.id).label("count"),
             func.sum(
                 case(
@@ -154,7 +240,7 @@ async def get_popular_queries(
             ).label("negative"),
         )
         .where(QueryAnalytics.created_at >= since)
-        .group_by(QueryAnalytics.query_text)
+        .group_by(query_fingerprint_expr)
         .order_by(desc("count"))
         .limit(limit)
     )
@@ -205,9 +291,32 @@ async def get_negative_feedback_queries(
     """부정 피드백이 많은 쿼리 (Phase 4 개선용)"""
     since = datetime.now(timezone.utc) - timedelta(days=days)
 
+    if await rollup_covers(db, since):
+        hourly = QueryAnalyticsHourly
+        negative = func.sum(hourly.negative)
+        result = await db.execute(
+            select(
+                func.min(hourly.query_text),
+                func.sum(hourly.query_count).label("total"),
+                negative.label("negative"),
+            )
+            .where(hourly.bucket_start >= bucket_start(since))
+            .group_by(hourly.fingerprint)
+            .having(negative >= min_negative)
+            .order_by(desc("negative"))
+        )
+        return [
+            {
+                "query": row[0],
+                "total_count": int(row[1]),
+                "negative_count": int(row[2]),
+            }
+            for row in result
+        ]
+
     result = await db.execute(
         select(
-            QueryAnalytics.query_text,
+            func.min(QueryAnalytics.query_text),
             func.count(QueryAnalytics.id).label("total"),
             func.sum(
                 case(
@@ -217,7 +326,7 @@ async def get_negative_feedback_queries(
             ).label("negative"),
         )
         .where(QueryAnalytics.created_at >= since)
-        .group_by(QueryAnalytics.query_text)
+        .group_by(query_fingerprint_expr)
         .having(
             func.sum(
                 case(
@@ -237,3 +346,31 @@ async def get_negative_feedback_queries(
         }
         for row in result
     ]
+
+
+async def get_dashboard_data(
+    days: int = 7,
+    session_factory: async_sessionmaker = async_session_maker,
+) -> Dict[str, Any]:
+    """
+    대시보드용 통합 데이터
+
+    서로 독립적인 조회를 각자의 세션(커넥션)에서 동시에 실행하므로
+    전체 지연 시간이 각 조회의 합이 아니라 가장 느린 조회에 가까워집니다.
+    """
+    async def run(fn, *args):
+        async with session_factory() as session:
+            return await fn(session, *args)
+
+    summary, popular, recent, negative = await asyncio.gather(
+        run(get_analytics_summary, days),
+        run(get_popular_queries, days, 10),
+        run(get_recent_queries, 20),
+        run(get_negative_feedback_queries, days),
+    )
+    return {
+        "summary": summary,
+        "popular_queries": popular,
+        "recent_queries": recent,
+        "negative_feedback_queries": negative,
+    }
@@ -0,0 +1,173 @@
+"""
+query_analytics 유지보수 작업
+
+- query_fingerprint가 비어 있는 기존 행을 id keyset 배치로 채움 (한 번에 긴 UPDATE 없이,
+  ix_query_analytics_fingerprint_missing partial 인덱스로 남은 행만 조회)
+- 파티션 모드: 앞으로 쓸 월 파티션을 미리 만들고, 보관 기간이 지난 월 파티션을 DROP
+
+모든 레플리카에서 실행되므로 트랜잭션마다 xact advisory lock을 시도하고,
+다른 레플리카가 잡고 있으면 이번 주기는 건너뜁니다 (pgbouncer transaction 모드에서도 안전).
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.db.migrations import (
+    QUERY_FINGERPRINT_SQL,
+    add_months,
+    drop_expired_query_analytics_partitions,
+    ensure_query_analytics_partitions,
+    is_partitioned,
+    month_start,
+)
+from app.db.neon import async_session_maker
+
+settings = get_settings()
+
+MAINTENANCE_LOCK_KEY = 0x616E6D74  # "anmt"
+
+BACKFILL_SQL = text(f"""
+    WITH batch AS (
+        SELECT id
+        FROM query_analytics
+        WHERE id > :last_id AND query_fingerprint IS NULL
+        ORDER BY id
+        LIMIT :batch_size
+    )
+    UPDATE query_analytics q
+    SET query_fingerprint = {QUERY_FINGERPRINT_SQL.format(column="q.query_text")}
+    FROM batch
+    WHERE q.id = batch.id
+    RETURNING q.id
+""")
+
+
+async def _try_lock(session) -> bool:
+    """현재 트랜잭션이 끝나면 자동 해제되는 advisory lock"""
+    result = await session.execute(
+        text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY}
+    )
+    return bool(result.scalar())
+
+
+class AnalyticsMaintenance:
+    """fingerprint backfill + 파티션 관리 (단일 이벤트 루프 전용)"""
+
+    def __init__(self, interval_seconds: float, batch_size: int):
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+        self.fingerprints_backfilled = 0
+        self.partitions_dropped: List[str] = []
+        self.runs = 0
+        self.failures = 0
+        self.last_run_ms: Optional[int] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.failures += 1
+                print(f"[AnalyticsMaintenance] Run failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self) -> None:
+        started = time.monotonic()
+        await self.backfill_fingerprints()
+        await self.maintain_partitions()
+        self.runs += 1
+        self.last_run_ms = int((time.monotonic() - started) * 1000)
+
+    async def backfill_fingerprints(self) -> int:
+        """배치마다 커밋하여 잠금과 WAL을 작게 유지"""
+        total = 0
+        last_id = ""
+        while True:
+            async with async_session_maker() as session:
+                if not await _try_lock(session):
+                    print("[AnalyticsMaintenance] Backfill running on another replica, skipping")
+                    break
+                result = await session.execute(
+                    BACKFILL_SQL, {"last_id": last_id, "batch_size": self.batch_size}
+                )
+                ids = [row.id for row in result]
+                await session.commit()
+            if not ids:
+                break
+            total += len(ids)
+            last_id = max(ids)
+            await asyncio.sleep(0)  # 다른 요청에 양보
+
+        if total:
+            self.fingerprints_backfilled += total
+            print(f"[AnalyticsMaintenance] Backfilled {total} query fingerprints")
+        return total
+
+    async def maintain_partitions(self) -> None:
+        async with async_session_maker() as session:
+            conn = await session.connection()
+            if not await is_partitioned(conn, "query_analytics"):
+                return
+            # CREATE TABLE ... PARTITION OF / DROP이 레플리카 간에 겹치지 않도록
+            if not await _try_lock(session):
+                print("[AnalyticsMaintenance] Partition maintenance running on another replica, skipping")
+                return
+            now = datetime.now(timezone.utc)
+            await ensure_query_analytics_partitions(
+                conn, now, add_months(month_start(now), settings.analytics_partition_months_ahead)
+            )
+            dropped = await drop_expired_query_analytics_partitions(conn, settings.analytics_retention_months)
+            await session.commit()
+
+        if dropped:
+            self.partitions_dropped.extend(dropped)
+            print(f"[AnalyticsMaintenance] Dropped expired partitions: {', '.join(dropped)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run_ms": self.last_run_ms,
+            "fingerprints_backfilled": self.fingerprints_backfilled,
+            "partitions_dropped": self.partitions_dropped,
+        }
+
+
+# 싱글톤 인스턴스
+_analytics_maintenance: Optional[AnalyticsMaintenance] = None
+
+
+def get_analytics_maintenance() -> AnalyticsMaintenance:
+    global _analytics_maintenance
+    if _analytics_maintenance is None:
+        _analytics_maintenance = AnalyticsMaintenance(
+            interval_seconds=settings.analytics_maintenance_interval_seconds,
+            batch_size=settings.analytics_fingerprint_backfill_batch_size,
+        )
+    return _analytics_maintenance
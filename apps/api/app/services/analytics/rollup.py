@@ -0,0 +1,355 @@
+"""
+Analytics Hourly Rollup
+
+대시보드/셀프러닝 조회가 매번 query_analytics 원본을 다시 집계하지 않도록
+(시간 버킷, 쿼리 fingerprint, source_type)별 집계를 증분으로 유지합니다.
+
+- 로그 기록(배치 writer / 인라인)과 피드백 변경 시 같은 트랜잭션에서 델타 upsert
+- 백그라운드 compactor가 과거 구간을 원본에서 재계산(backfill)하며 커버리지 워터마크를 넓힘
+- 조회 함수는 요청 기간이 커버리지 안에 있으면 롤업을, 아니면 원본을 사용
+
+증분 upsert는 공유 advisory lock, backfill은 배타 advisory lock을 잡으므로
+같은 버킷을 동시에 재계산하며 델타가 사라지거나 중복되지 않습니다.
+"""
+
+import asyncio
+import bisect
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+
+from sqlalchemy import and_, literal_column, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.db.migrations import QUERY_FINGERPRINT_SQL
+from app.db.neon import async_session_maker
+from app.models.db_models import AnalyticsRollupState, QueryAnalyticsHourly
+from app.services.cache.semantic_cache import generate_query_hash
+
+settings = get_settings()
+
+# 지연 시간 히스토그램 경계 (ms). 버킷 i = 경계 중 값 이하인 것의 개수 (마지막 버킷은 16초 이상)
+LATENCY_BUCKETS_MS = [100, 250, 500, 1000, 2000, 4000, 8000, 16000]
+HISTOGRAM_SIZE = len(LATENCY_BUCKETS_MS) + 1
+
+ROLLUP_LOCK_KEY = 0x616E6C74  # "anlt"
+STATE_ID = 1
+
+RollupKey = Tuple[datetime, str, str]
+
+
+def bucket_start(ts: datetime) -> datetime:
+    return ts.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def latency_bucket(latency_ms: int) -> int:
+    return bisect.bisect_right(LATENCY_BUCKETS_MS, latency_ms)
+
+
+def empty_histogram() -> List[int]:
+    return [0] * HISTOGRAM_SIZE
+
+
+def histogram_percentile(histogram: List[int], q: float) -> Optional[int]:
+    """히스토그램 기반 분위수 추정 (해당 버킷의 상한, 마지막 버킷은 하한)"""
+    total = sum(histogram)
+    if not total:
+        return None
+    threshold = total * q
+    cumulative = 0
+    for i, count in enumerate(histogram):
+        cumulative += count
+        if cumulative >= threshold:
+            return LATENCY_BUCKETS_MS[min(i, len(LATENCY_BUCKETS_MS) - 1)]
+    return LATENCY_BUCKETS_MS[-1]
+
+
+def latency_bucket_conditions(column) -> list:
+    """히스토그램 버킷별 조건 (원본 집계에서 FILTER 절로 사용)"""
+    edges = LATENCY_BUCKETS_MS
+    return (
+        [column < edges[0]]
+        + [and_(column >= lo, column < hi) for lo, hi in zip(edges, edges[1:])]
+        + [column >= edges[-1]]
+    )
+
+
+def _new_delta(query_text: str) -> Dict[str, Any]:
+    return {
+        "query_text": query_text,
+        "query_count": 0,
+        "positive": 0,
+        "negative": 0,
+        "latency_sum": 0,
+        "latency_count": 0,
+        "latency_hist": empty_histogram(),
+    }
+
+
+def _delta_for(deltas: Dict[RollupKey, Dict[str, Any]], created_at: datetime, query_text: str, source_type: Optional[str]):
+    key = (bucket_start(created_at), generate_query_hash(query_text), source_type or "unknown")
+    if key not in deltas:
+        deltas[key] = _new_delta(query_text)
+    return deltas[key]
+
+
+def rows_to_deltas(rows: Iterable[Dict[str, Any]]) -> Dict[RollupKey, Dict[str, Any]]:
+    """query_analytics 행(dict) 목록 → 롤업 키별 델타"""
+    deltas: Dict[RollupKey, Dict[str, Any]] = {}
+    for row in rows:
+        delta = _delta_for(deltas, row["created_at"], row["query_text"], row["source_type"])
+        delta["query_count"] += 1
+        if row.get("feedback") == 1:
+            delta["positive"] += 1
+        elif row.get("feedback") == -1:
+            delta["negative"] += 1
+        latency_ms = row.get("latency_ms")
+        if latency_ms is not None:
+            delta["latency_sum"] += latency_ms
+            delta["latency_count"] += 1
+            delta["latency_hist"][latency_bucket(latency_ms)] += 1
+    return deltas
+
+
+async def apply_deltas(db: AsyncSession, deltas: Dict[RollupKey, Dict[str, Any]]) -> None:
+    """델타 upsert (호출 측 트랜잭션에서 실행, 커밋은 호출 측 책임)"""
+    if not deltas:
+        return
+
+    await db.execute(text("SELECT pg_advisory_xact_lock_shared(:key)"), {"key": ROLLUP_LOCK_KEY})
+
+    # 키 순서를 고정해 동시 upsert 간 교착 방지
+    values = [
+        {"bucket_start": key[0], "fingerprint": key[1], "source_type": key[2], **deltas[key]}
+        for key in sorted(deltas)
+    ]
+    stmt = pg_insert(QueryAnalyticsHourly).values(values)
+    table = QueryAnalyticsHourly
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[table.bucket_start, table.fingerprint, table.source_type],
+            set_={
+                "query_count": table.query_count + stmt.excluded.query_count,
+                "positive": table.positive + stmt.excluded.positive,
+                "negative": table.negative + stmt.excluded.negative,
+                "latency_sum": table.latency_sum + stmt.excluded.latency_sum,
+                "latency_count": table.latency_count + stmt.excluded.latency_count,
+                "latency_hist": literal_column(
+                    "(SELECT array_agg(a + b ORDER BY i) "
+                    "FROM unnest(query_analytics_hourly.latency_hist, excluded.latency_hist) "
+                    "WITH ORDINALITY AS u(a, b, i))"
+                ),
+            },
+        )
+    )
+
+
+async def record_rows(db: AsyncSession, rows: Iterable[Dict[str, Any]]) -> None:
+    """새로 기록된 analytics 행을 롤업에 반영"""
+    if settings.analytics_rollup_enabled:
+        await apply_deltas(db, rows_to_deltas(rows))
+
+
+async def record_feedback_change(
+    db: AsyncSession,
+    created_at: datetime,
+    query_text: str,
+    source_type: Optional[str],
+    old_feedback: Optional[int],
+    new_feedback: Optional[int],
+) -> None:
+    """기존 행의 피드백 변경분을 롤업에 반영"""
+    if not settings.analytics_rollup_enabled or old_feedback == new_feedback:
+        return
+
+    deltas: Dict[RollupKey, Dict[str, Any]] = {}
+    delta = _delta_for(deltas, created_at, query_text, source_type)
+    delta["positive"] = (new_feedback == 1) - (old_feedback == 1)
+    delta["negative"] = (new_feedback == -1) - (old_feedback == -1)
+    await apply_deltas(db, deltas)
+
+
+# ============================================================
+# 커버리지 / Backfill
+# ============================================================
+
+_coverage_cache: Dict[str, Any] = {"value": None, "fetched_at": 0.0}
+COVERAGE_CACHE_SECONDS = 30
+
+
+async def rollup_covers(db: AsyncSession, since: datetime) -> bool:
+    """since 이후 구간을 롤업만으로 계산할 수 있는지"""
+    if not settings.analytics_rollup_enabled:
+        return False
+
+    # 커버리지는 넓어지기만 하므로 잠시 캐시해도 안전 (오래된 값은 더 보수적)
+    if time.monotonic() - _coverage_cache["fetched_at"] > COVERAGE_CACHE_SECONDS:
+        state = await db.get(AnalyticsRollupState, STATE_ID)
+        _coverage_cache["value"] = (state.covered_since, state.backfill_complete) if state else None
+        _coverage_cache["fetched_at"] = time.monotonic()
+
+    coverage = _coverage_cache["value"]
+    if coverage is None or coverage[0] is None:
+        return False
+    covered_since, backfill_complete = coverage
+    return backfill_complete or bucket_start(since) >= covered_since
+
+
+def _backfill_sql() -> str:
+    hist = ", ".join(
+        [f"count(*) FILTER (WHERE latency_ms < {LATENCY_BUCKETS_MS[0]})"]
+        + [
+            f"count(*) FILTER (WHERE latency_ms >= {lo} AND latency_ms < {hi})"
+            for lo, hi in zip(LATENCY_BUCKETS_MS, LATENCY_BUCKETS_MS[1:])
+        ]
+        + [f"count(*) FILTER (WHERE latency_ms >= {LATENCY_BUCKETS_MS[-1]})"]
+    )
+    return f"""
+        INSERT INTO query_analytics_hourly (
+            bucket_start, fingerprint, source_type, query_text,
+            query_count, positive, negative, latency_sum, latency_count, latency_hist
+        )
+        SELECT
+            date_trunc('hour', created_at AT TIME ZONE 'UTC') AT TIME ZONE 'UTC',
+            coalesce(query_fingerprint, {QUERY_FINGERPRINT_SQL.format(column="query_text")}),
+            coalesce(source_type, 'unknown'),
+            min(query_text),
+            count(*),
+            count(*) FILTER (WHERE feedback = 1),
+            count(*) FILTER (WHERE feedback = -1),
+            coalesce(sum(latency_ms), 0),
+            count(latency_ms),
+            ARRAY[{hist}]::integer[]
+        FROM query_analytics
+        WHERE created_at >= :start AND created_at < :end
+        GROUP BY 1, 2, 3
+    """
+
+
+async def backfill_range(db: AsyncSession, start: datetime, end: datetime) -> None:
+    """[start, end) 버킷을 원본에서 재계산 (배타 lock, 커밋은 호출 측 책임)"""
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": ROLLUP_LOCK_KEY})
+    await db.execute(
+        text("DELETE FROM query_analytics_hourly WHERE bucket_start >= :start AND bucket_start < :end"),
+        {"start": start, "end": end},
+    )
+    await db.execute(text(_backfill_sql()), {"start": start, "end": end})
+
+
+async def reset_rollup_coverage() -> None:
+    """롤업 비활성화 중에는 증분이 누락되므로 커버리지를 초기화 (재활성화 시 다시 backfill)"""
+    async with async_session_maker() as session:
+        await session.execute(
+            text("DELETE FROM analytics_rollup_state WHERE id = :id"), {"id": STATE_ID}
+        )
+        await session.commit()
+
+
+class AnalyticsRollupCompactor:
+    """
+    커버리지 워터마크를 과거 방향으로 넓히는 백그라운드 작업
+
+    1. 첫 실행: 현재 시간 버킷을 재계산 (프로세스 시작 전 기록분 포함) → covered_since = 현재 정시
+    2. 이후: [covered_since - chunk, covered_since) 구간을 재계산하며 워터마크를 이동
+    3. 원본의 가장 오래된 행까지 도달하면 backfill_complete
+    """
+
+    def __init__(self, interval_seconds: float, chunk_hours: int):
+        self.interval_seconds = interval_seconds
+        self.chunk_hours = chunk_hours
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.failures = 0
+        self.last_run_ms: Optional[int] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                done = await self.step()
+            except Exception as e:
+                self.failures += 1
+                done = False
+                print(f"[AnalyticsRollup] Compaction failed: {e}")
+            await asyncio.sleep(self.interval_seconds if done else 1.0)
+
+    async def step(self) -> bool:
+        """한 구간 backfill. 더 할 작업이 없으면 True"""
+        started = time.monotonic()
+        async with async_session_maker() as session:
+            state = await session.get(AnalyticsRollupState, STATE_ID, with_for_update=True)
+            if state is None:
+                state = AnalyticsRollupState(id=STATE_ID)
+                session.add(state)
+                await session.flush()
+
+            if state.backfill_complete:
+                return True
+
+            oldest = (await session.execute(text("SELECT min(created_at) FROM query_analytics"))).scalar()
+
+            if state.covered_since is None:
+                end = bucket_start(datetime.now(timezone.utc)) + timedelta(hours=1)
+                start = end - timedelta(hours=1)
+            else:
+                end = state.covered_since
+                start = end - timedelta(hours=self.chunk_hours)
+                if oldest is not None:
+                    # 가장 오래된 행보다 과거 구간은 계산할 필요 없음
+                    start = min(end, max(start, bucket_start(oldest)))
+
+            if start < end:
+                await backfill_range(session, start, end)
+
+            state.covered_since = start
+            state.backfill_complete = oldest is None or oldest >= start
+            await session.commit()
+
+        self.runs += 1
+        self.last_run_ms = int((time.monotonic() - started) * 1000)
+        _coverage_cache["fetched_at"] = 0.0
+        print(f"[AnalyticsRollup] Backfilled {start.isoformat()} ~ {end.isoformat()}")
+        return state.backfill_complete
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_run_ms": self.last_run_ms,
+            "coverage": _coverage_cache["value"],
+        }
+
+
+# 싱글톤 인스턴스
+_rollup_compactor: Optional[AnalyticsRollupCompactor] = None
+
+
+def get_rollup_compactor() -> AnalyticsRollupCompactor:
+    global _rollup_compactor
+    if _rollup_compactor is None:
+        _rollup_compactor = AnalyticsRollupCompactor(
+            interval_seconds=settings.analytics_rollup_interval_seconds,
+            chunk_hours=settings.analytics_rollup_backfill_chunk_hours,
+        )
+    return _rollup_compactor
@@ -0,0 +1,280 @@
+"""
+Analytics Batch Writer
+
+채팅 응답 경로에서 analytics INSERT를 제거하기 위한 백그라운드 writer입니다.
+
+- analytics_id는 클라이언트 측에서 생성 (응답이 DB 쓰기를 기다리지 않음)
+- 제한된 크기의 큐 → 배치 크기 또는 시간 주기마다 multi-row INSERT
+- 큐가 가득 차면 레코드를 버리고 drop 메트릭 증가
+- 종료 시 남은 레코드를 모두 기록 (drain)
+  - INSERT는 ON CONFLICT DO NOTHING이라 이미 커밋된 행을 다시 flush해도 안전 (id는 클라이언트 UUID)
+- 아직 기록되지 않은 레코드에 대한 피드백도 반영
+"""
+
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.config import get_settings
+from app.db.neon import async_session_maker
+from app.models.db_models import QueryAnalytics, generate_uuid
+from app.services.analytics.rollup import record_feedback_change, record_rows
+from app.services.cache.semantic_cache import generate_query_hash
+
+settings = get_settings()
+
+# 배치 INSERT 재시도 횟수 (이후 행 단위로 기록 시도)
+MAX_BATCH_RETRIES = 3
+
+
+class AnalyticsWriter:
+    """QueryAnalytics 배치 writer (단일 이벤트 루프 전용)"""
+
+    def __init__(self, max_queue_size: int, batch_size: int, flush_interval_seconds: float):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_queue_size)
+        self._pending: Dict[str, Dict[str, Any]] = {}  # id → 아직 커밋되지 않은 레코드
+        self._flushing: Dict[str, Dict[str, Any]] = {}  # flush 중인 레코드의 INSERT 시점 스냅샷
+        self._late_feedback: Dict[str, int] = {}  # flush 도중 들어온 피드백
+        self._batch: List[Dict[str, Any]] = []  # 수집 중인 배치 (종료 시 drain 대상)
+        self._task: Optional[asyncio.Task] = None
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped_full = 0
+        self.dropped_failed = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.queue_high_watermark = 0
+        self.last_flush_ms: Optional[int] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """남은 레코드를 모두 기록한 후 종료"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        # drain (수집 중이던 배치 포함)
+        batch, self._batch = self._batch, []
+        await self._flush(batch)
+        while not self._queue.empty():
+            await self._flush(self._take_batch())
+
+    def submit(
+        self,
+        query_text: str,
+        response_text: str,
+        source_type: str,
+        user_id: Optional[str] = None,
+        latency_ms: Optional[int] = None,
+    ) -> Optional[str]:
+        """
+        레코드를 큐에 추가 (DB I/O 없음)
+
+        Returns:
+            생성된 analytics_id, 큐가 가득 차서 버려진 경우 None
+        """
+        row = {
+            "id": generate_uuid(),
+            "user_id": user_id,
+            "query_text": query_text,
+            "query_fingerprint": generate_query_hash(query_text),
+            "response_text": response_text,
+            "source_type": source_type,
+            "feedback": None,
+            "latency_ms": latency_ms,
+            "created_at": datetime.now(timezone.utc),
+        }
+
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped_full += 1
+            return None
+
+        self._pending[row["id"]] = row
+        self.enqueued += 1
+        self.queue_high_watermark = max(self.queue_high_watermark, self._queue.qsize())
+        return row["id"]
+
+    def apply_feedback(self, analytics_id: str, feedback: int) -> bool:
+        """아직 DB에 기록되지 않은 레코드에 피드백 반영"""
+        row = self._pending.get(analytics_id)
+        if row is None:
+            return False
+
+        row["feedback"] = feedback
+        if analytics_id in self._flushing:
+            # 이미 INSERT 스냅샷이 만들어졌으므로 커밋 후 UPDATE로 반영
+            self._late_feedback[analytics_id] = feedback
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            self._batch.append(await self._queue.get())
+            deadline = time.monotonic() + self.flush_interval_seconds
+
+            # 배치 크기 또는 시간 주기 중 먼저 도달하는 조건으로 flush
+            while len(self._batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # flush 도중 종료되면 self._batch가 drain에서 다시 기록됨
+            await self._flush(self._batch)
+            self._batch = []
+
+    def _take_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        while not self._queue.empty() and len(batch) < self.batch_size:
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+
+        started = time.monotonic()
+        # INSERT/롤업에는 스냅샷을 사용 (flush 도중 피드백이 바뀌어도 둘이 어긋나지 않도록)
+        snapshot = [dict(row) for row in batch]
+        self._flushing = {row["id"]: row for row in snapshot}
+        written_ids: set = set()
+
+        try:
+            for attempt in range(MAX_BATCH_RETRIES):
+                try:
+                    self.written += await self._insert_rows(snapshot)
+                    written_ids = set(self._flushing)
+                    break
+                except Exception as e:
+                    self.failed_flushes += 1
+                    print(f"[AnalyticsWriter] Batch insert failed (attempt {attempt + 1}): {e}")
+                    await asyncio.sleep(0.5 * (attempt + 1))
+            else:
+                # 배치 전체 실패 → 문제 행(예: 잘못된 user_id)만 버리도록 행 단위 기록
+                for row in snapshot:
+                    try:
+                        self.written += await self._insert_rows([row])
+                        written_ids.add(row["id"])
+                    except Exception as e:
+                        self.dropped_failed += 1
+                        print(f"[AnalyticsWriter] Dropped record {row['id']}: {e}")
+
+            await self._apply_late_feedback(written_ids)
+        finally:
+            for row in batch:
+                self._pending.pop(row["id"], None)
+            self._flushing = {}
+            self._late_feedback = {}
+            self.flushes += 1
+            self.last_flush_ms = int((time.monotonic() - started) * 1000)
+
+    async def _insert_rows(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        단일 multi-row INSERT ... VALUES (...), (...), ... ON CONFLICT DO NOTHING
+
+        종료 중 커밋 직후 취소되어 같은 배치가 drain에서 다시 기록되어도
+        중복 행/롤업 이중 집계가 생기지 않도록 실제로 들어간 행만 롤업에 반영합니다.
+
+        Returns:
+            새로 기록된 행 수
+        """
+        async with async_session_maker() as session:
+            result = await session.execute(
+                pg_insert(QueryAnalytics)
+                .values(rows)
+                # 파티션 테이블의 PK는 (id, created_at)이므로 대상 제약을 지정하지 않음
+                .on_conflict_do_nothing()
+                .returning(QueryAnalytics.id)
+            )
+            inserted_ids = set(result.scalars())
+            inserted = [row for row in rows if row["id"] in inserted_ids]
+            # 시간별 롤업도 같은 트랜잭션에서 갱신
+            await record_rows(session, inserted)
+            await session.commit()
+        return len(inserted)
+
+    async def _apply_late_feedback(self, written_ids: set) -> None:
+        # 반영하는 동안 새로 들어온 피드백도 flush가 끝나기 전에 처리
+        while True:
+            late = {k: v for k, v in self._late_feedback.items() if k in written_ids}
+            self._late_feedback = {}
+            if not late:
+                return
+
+            async with async_session_maker() as session:
+                for analytics_id, feedback in late.items():
+                    inserted = self._flushing[analytics_id]
+                    await session.execute(
+                        update(QueryAnalytics)
+                        .where(QueryAnalytics.id == analytics_id)
+                        .values(feedback=feedback)
+                    )
+                    await record_feedback_change(
+                        session,
+                        inserted["created_at"],
+                        inserted["query_text"],
+                        inserted["source_type"],
+                        inserted["feedback"],
+                        feedback,
+                    )
+                await session.commit()
+
+            for analytics_id, feedback in late.items():
+                self._flushing[analytics_id]["feedback"] = feedback
+
+    def stats(self) -> Dict[str, Any]:
+        queue_size = self._queue.qsize()
+        return {
+            "running": self.running,
+            "queue_size": queue_size,
+            "max_queue_size": self.max_queue_size,
+            "queue_utilization": round(queue_size / self.max_queue_size, 4),
+            "queue_high_watermark": self.queue_high_watermark,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped_full": self.dropped_full,
+            "dropped_failed": self.dropped_failed,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "last_flush_ms": self.last_flush_ms,
+        }
+
+
+# 싱글톤 인스턴스
+_analytics_writer: Optional[AnalyticsWriter] = None
+
+
+def get_analytics_writer() -> AnalyticsWriter:
+    global _analytics_writer
+    if _analytics_writer is None:
+        _analytics_writer = AnalyticsWriter(
+            max_queue_size=settings.analytics_queue_size,
+            batch_size=settings.analytics_batch_size,
+            flush_interval_seconds=settings.analytics_flush_interval_ms / 1000,
+        )
+    return _analytics_writer
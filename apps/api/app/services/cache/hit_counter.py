@@ -0,0 +1,133 @@
+"""
+L1 Cache Hit Counter
+
+L1 메모리 캐시 히트는 DB를 거치지 않으므로 query_cache.hit_count가 늘지 않습니다.
+가장 자주 쓰이는 응답이 조회 0회로 보여 CacheSweeper의 stale 규칙
+(hit_count <= cache_stale_min_hit_count)에 삭제되고 학습 통계에서도 빠지는 것을 막기 위해
+원본 캐시 행의 해시별로 히트 수를 모아 주기적으로 한 번의 UPDATE로 반영합니다.
+
+- UPDATE ... FROM unnest(hashes, counts): 해시 수와 관계없이 왕복 한 번
+- 기록 실패 시 카운트를 버퍼에 되돌려 다음 주기에 재시도
+- 종료 시 남은 카운트 기록
+"""
+
+import asyncio
+from typing import Optional, Dict, Any
+
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.db.neon import async_session_maker
+
+settings = get_settings()
+
+FLUSH_SQL = text("""
+    UPDATE query_cache AS c
+    SET hit_count = c.hit_count + v.n
+    FROM unnest(CAST(:hashes AS text[]), CAST(:counts AS integer[])) AS v(query_hash, n)
+    WHERE c.query_hash = v.query_hash
+""")
+
+
+class CacheHitCounter:
+    """해시별 L1 히트 수 버퍼 (단일 이벤트 루프 전용)"""
+
+    def __init__(self, flush_interval_seconds: float, max_pending: int):
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+
+        self._pending: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        self.recorded = 0
+        self.flushed = 0
+        self.failures = 0
+        self.dropped_full = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """남은 카운트를 기록한 후 종료"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    def record(self, query_hash: str) -> None:
+        if query_hash not in self._pending and len(self._pending) >= self.max_pending:
+            self.dropped_full += 1
+            return
+        self._pending[query_hash] = self._pending.get(query_hash, 0) + 1
+        self.recorded += 1
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_seconds)
+            await self.flush()
+
+    async def flush(self) -> int:
+        """
+        버퍼의 히트 수를 query_cache.hit_count에 반영
+
+        Returns:
+            반영한 히트 수
+        """
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        try:
+            async with async_session_maker() as session:
+                await session.execute(
+                    FLUSH_SQL,
+                    {"hashes": list(pending), "counts": list(pending.values())},
+                )
+                await session.commit()
+        except BaseException as e:
+            # 실패/취소 시 다음 flush에서 다시 기록
+            for query_hash, count in pending.items():
+                self._pending[query_hash] = self._pending.get(query_hash, 0) + count
+            if not isinstance(e, Exception):
+                raise
+            self.failures += 1
+            print(f"[CacheHitCounter] Flush failed: {e}")
+            return 0
+
+        hits = sum(pending.values())
+        self.flushed += hits
+        return hits
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "pending_hashes": len(self._pending),
+            "pending_hits": sum(self._pending.values()),
+            "recorded": self.recorded,
+            "flushed": self.flushed,
+            "failures": self.failures,
+            "dropped_full": self.dropped_full,
+        }
+
+
+# 싱글톤 인스턴스
+_cache_hit_counter: Optional[CacheHitCounter] = None
+
+
+def get_cache_hit_counter() -> CacheHitCounter:
+    global _cache_hit_counter
+    if _cache_hit_counter is None:
+        _cache_hit_counter = CacheHitCounter(
+            flush_interval_seconds=settings.l1_hit_flush_interval_seconds,
+            max_pending=settings.l1_cache_max_entries,
+        )
+    return _cache_hit_counter
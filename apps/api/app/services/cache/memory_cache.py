@@ -0,0 +1,159 @@
+"""
+In-process L1 Response Cache
+
+Semantic cache(pgvector) 앞단의 프로세스 내 LRU + TTL 캐시입니다.
+generate_query_hash 키로 자주 묻는 질문의 응답을 메모리에서 바로 반환하여
+임베딩 API 호출과 DB 왕복 없이 캐시 히트를 제공합니다.
+
+- 엔트리 수 / 바이트 크기 상한 (LRU 순서로 축출)
+- TTL (기본값은 cache_ttl_hours)
+- 원본 캐시 해시 기준 무효화 (semantic hit로 채워진 엔트리까지 함께 제거)
+"""
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple, Dict, Any, Iterable
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+@dataclass
+class _Entry:
+    response: str
+    sources: list
+    origin_hash: str  # 응답이 저장된 query_cache 행의 해시
+    expires_at: float
+    size: int
+
+
+class MemoryCache:
+    """LRU + TTL 응답 캐시 (단일 이벤트 루프 전용, 락 불필요)"""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, query_hash: str) -> Optional[Tuple[str, list]]:
+        entry = self.get_entry(query_hash)
+        return (entry.response, entry.sources) if entry else None
+
+    def get_entry(self, query_hash: str) -> Optional[_Entry]:
+        """get과 같지만 origin_hash까지 담긴 엔트리 반환"""
+        entry = self._entries.get(query_hash)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self._remove(query_hash)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(query_hash)
+        self.hits += 1
+        return entry
+
+    def set(
+        self,
+        query_hash: str,
+        response: str,
+        sources: Optional[list] = None,
+        origin_hash: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        sources = sources or []
+        size = len(response.encode()) + len(json.dumps(sources, ensure_ascii=False).encode())
+
+        # 단일 엔트리가 전체 상한보다 크면 캐시하지 않음
+        if size > self.max_bytes:
+            self._remove(query_hash)
+            return
+
+        self._remove(query_hash)
+        self._entries[query_hash] = _Entry(
+            response=response,
+            sources=sources,
+            origin_hash=origin_hash or query_hash,
+            expires_at=time.monotonic() + (ttl_seconds or self.ttl_seconds),
+            size=size,
+        )
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_hash = next(iter(self._entries))
+            self._remove(oldest_hash)
+            self.evictions += 1
+
+    def invalidate(self, query_hash: str) -> int:
+        """해시에 해당하는 엔트리와, 그 캐시 행에서 파생된 엔트리 모두 제거"""
+        return self.invalidate_many([query_hash])
+
+    def invalidate_many(self, query_hashes: Iterable[str]) -> int:
+        hashes = set(query_hashes)
+        if not hashes:
+            return 0
+        targets = [
+            key for key, entry in self._entries.items()
+            if key in hashes or entry.origin_hash in hashes
+        ]
+        for key in targets:
+            self._remove(key)
+        self.invalidations += len(targets)
+        return len(targets)
+
+    def clear(self) -> int:
+        cleared = len(self._entries)
+        self.invalidations += cleared
+        self._entries.clear()
+        self._bytes = 0
+        return cleared
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, query_hash: str) -> None:
+        entry = self._entries.pop(query_hash, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+# 싱글톤 인스턴스
+_memory_cache: Optional[MemoryCache] = None
+
+
+def get_memory_cache() -> MemoryCache:
+    global _memory_cache
+    if _memory_cache is None:
+        _memory_cache = MemoryCache(
+            max_entries=settings.l1_cache_max_entries,
+            max_bytes=settings.l1_cache_max_bytes,
+            ttl_seconds=settings.cache_ttl_hours * 3600,
+        )
+    return _memory_cache
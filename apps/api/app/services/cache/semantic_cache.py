@@ -18,6 +18,8 @@ from app.models.db_models import QueryCache
 from app.config import get_settings
 from app.services.llm.openai_client import get_embedding
 from app.services.cache import exact_match  # Fallback용
+from app.services.cache.hit_counter import get_cache_hit_counter
+from app.services.cache.memory_cache import get_memory_cache
 
 settings = get_settings()
 
@@ -28,6 +30,59 @@ def generate_query_hash(query: str) -> str:
     return hashlib.sha256(normalized.encode()).hexdigest()[:32]
 
 
+def _remember(
+    query: str,
+    response: str,
+    sources: list,
+    origin_hash: Optional[str] = None,
+    expires_at: Optional[datetime] = None,
+) -> None:
+    """L1 캐시에 응답 저장 (DB 행의 남은 TTL을 넘지 않도록)"""
+    if not settings.l1_cache_enabled:
+        return
+
+    ttl_seconds = None
+    if expires_at is not None:
+        ttl_seconds = (expires_at - datetime.now(timezone.utc)).total_seconds()
+        if ttl_seconds <= 0:
+            return
+        ttl_seconds = min(ttl_seconds, settings.cache_ttl_hours * 3600)
+
+    get_memory_cache().set(
+        generate_query_hash(query),
+        response,
+        sources,
+        origin_hash=origin_hash,
+        ttl_seconds=ttl_seconds,
+    )
+
+
+def prime_memory_cache(query: str, response: str, sources: list) -> None:
+    """새 응답으로 L1 갱신 (같은 해시에서 파생된 기존 엔트리는 제거)"""
+    invalidate_memory_cache([generate_query_hash(query)])
+    _remember(query, response, sources)
+
+
+def invalidate_memory_cache(query_hashes: Optional[List[str]] = None) -> int:
+    """
+    L1 캐시 무효화 훅
+
+    query_hashes가 없으면 전체 비움 (DB 캐시가 일괄 변경된 경우)
+    """
+    memory_cache = get_memory_cache()
+    if query_hashes is None:
+        return memory_cache.clear()
+    return memory_cache.invalidate_many(query_hashes)
+
+
+async def _apply_vector_search_params(db: AsyncSession) -> None:
+    """현재 트랜잭션에만 적용되는 ANN 탐색 파라미터 설정 (SET LOCAL)"""
+    if settings.vector_index_type == "hnsw":
+        await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(settings.hnsw_ef_search)}"))
+    elif settings.vector_index_type == "ivfflat":
+        await db.execute(text(f"SET LOCAL ivfflat.probes = {int(settings.ivfflat_probes)}"))
+
+
 async def _get_query_embedding(query: str) -> Optional[List[float]]:
     """
     쿼리의 임베딩 벡터 생성
@@ -49,6 +104,7 @@ async def get_cached_response(
     """
     캐시된 응답 조회 (Semantic Search)
 
+    0. L1 메모리 캐시 확인 (네트워크 I/O 없음)
     1. 쿼리 임베딩 생성
     2. 코사인 유사도로 가장 유사한 캐시 검색
     3. 유사도가 threshold 이상이면 캐시 히트
@@ -57,9 +113,20 @@ async def get_cached_response(
     Returns:
         (response, sources) 튜플 또는 None
     """
+    # L1 메모리 캐시 (hit_count는 원본 캐시 행 기준으로 모아서 반영)
+    if settings.l1_cache_enabled:
+        memory_hit = get_memory_cache().get_entry(generate_query_hash(query))
+        if memory_hit:
+            get_cache_hit_counter().record(memory_hit.origin_hash)
+            print(f"[SemanticCache] L1 HIT for: {query[:50]}...")
+            return memory_hit.response, memory_hit.sources
+
     # Semantic cache 비활성화 시 exact_match 사용
     if not settings.semantic_cache_enabled:
-        return await exact_match.get_cached_response(db, query)
+        exact_result = await exact_match.get_cached_response(db, query)
+        if exact_result:
+            _remember(query, *exact_result)
+        return exact_result
 
     # 쿼리 임베딩 생성
     query_embedding = await _get_query_embedding(query)
@@ -67,17 +134,22 @@ async def get_cached_response(
     # 임베딩 생성 실패 시 exact_match로 폴백
     if query_embedding is None:
         print("[SemanticCache] Falling back to exact_match")
-        return await exact_match.get_cached_response(db, query)
+        exact_result = await exact_match.get_cached_response(db, query)
+        if exact_result:
+            _remember(query, *exact_result)
+        return exact_result
 
     now = datetime.now(timezone.utc)
     threshold = settings.semantic_cache_threshold
 
+    await _apply_vector_search_params(db)
+
     # pgvector 코사인 유사도 검색
     # 1 - cosine_distance = cosine_similarity
     # <=> 연산자는 cosine distance를 계산
     sql = text("""
         SELECT
-            id, query_text, response, sources, hit_count,
+            id, query_hash, query_text, response, sources, hit_count, expires_at,
             1 - (query_embedding <=> :embedding) as similarity
         FROM query_cache
         WHERE
@@ -106,12 +178,14 @@ async def get_cached_response(
         await db.flush()
 
         sources = json.loads(row.sources) if row.sources else []
+        _remember(query, row.response, sources, origin_hash=row.query_hash, expires_at=row.expires_at)
         print(f"[SemanticCache] HIT (similarity: {row.similarity:.4f}) for: {query[:50]}...")
         return row.response, sources
 
     # 유사한 캐시가 없으면 exact_match도 시도
     exact_result = await exact_match.get_cached_response(db, query)
     if exact_result:
+        _remember(query, *exact_result)
         print(f"[SemanticCache] Exact match fallback HIT for: {query[:50]}...")
         return exact_result
 
@@ -124,10 +198,12 @@ async def save_to_cache(
     query: str,
     response: str,
     sources: list = None,
+    query_embedding: Optional[List[float]] = None,
 ) -> None:
     """
     응답을 캐시에 저장 (임베딩 포함)
 
+    query_embedding이 주어지면 재사용하고, 없으면 생성합니다.
     임베딩 생성 실패 시에도 exact_match용으로 저장
     """
     query_hash = generate_query_hash(query)
@@ -135,7 +211,8 @@ async def save_to_cache(
     expires_at = now + timedelta(hours=settings.cache_ttl_hours)
 
     # 쿼리 임베딩 생성 (실패해도 계속 진행)
-    query_embedding = await _get_query_embedding(query)
+    if query_embedding is None:
+        query_embedding = await _get_query_embedding(query)
 
     # 기존 캐시 확인 (해시 기반)
     result = await db.execute(
@@ -164,6 +241,10 @@ async def save_to_cache(
         db.add(cache_entry)
 
     await db.flush()
+
+    # 같은 해시에서 파생된 L1 엔트리를 새 응답으로 교체
+    invalidate_memory_cache([query_hash])
+    _remember(query, response, sources or [], expires_at=expires_at)
     print(f"[SemanticCache] Saved cache for: {query[:50]}...")
 
 
@@ -171,6 +252,9 @@ async def invalidate_cache(db: AsyncSession, query: str) -> bool:
     """특정 쿼리 캐시 무효화"""
     query_hash = generate_query_hash(query)
 
+    # DB 행 유무와 관계없이 L1 엔트리는 제거
+    invalidate_memory_cache([query_hash])
+
     result = await db.execute(
         select(QueryCache).where(QueryCache.query_hash == query_hash)
     )
@@ -203,6 +287,8 @@ async def find_similar_queries(
 
     now = datetime.now(timezone.utc)
 
+    await _apply_vector_search_params(db)
+
     sql = text("""
         SELECT
             query_text,
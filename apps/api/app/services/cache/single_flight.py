@@ -0,0 +1,81 @@
+"""
+Single-flight Request Coalescing
+
+동일한 키(정규화된 쿼리 해시)로 동시에 들어온 요청 중 첫 번째(leader)만 실제 작업을 수행하고,
+나머지(follower)는 그 결과를 함께 기다립니다.
+캐시 미스가 동시에 몰릴 때 OpenAI 호출이 중복으로 폭증하는 것(cache stampede)을 막습니다.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class SingleFlight:
+    """키별 in-flight 작업 공유 (단일 이벤트 루프 전용)"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.leader_errors = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        key에 대한 작업이 진행 중이면 그 결과를 기다리고, 없으면 fn()을 실행
+
+        leader 요청이 취소(클라이언트 연결 끊김 등)되면 대기 중인 follower 중 하나가
+        새 leader가 되어 작업을 다시 수행합니다.
+        """
+        while True:
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+
+            self.coalesced += 1
+            try:
+                # follower 자신이 취소되어도 공유 future는 취소되지 않도록 shield
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if pending.cancelled() and not asyncio.current_task().cancelling():
+                    continue  # leader가 취소됨 → 재시도
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self.leaders += 1
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            self.leader_errors += 1
+            future.set_exception(e)
+            future.exception()  # follower가 없어도 경고가 나지 않도록
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "leader_errors": self.leader_errors,
+        }
+
+
+# 싱글톤 인스턴스
+_chat_single_flight: Optional[SingleFlight] = None
+
+
+def get_chat_single_flight() -> SingleFlight:
+    global _chat_single_flight
+    if _chat_single_flight is None:
+        _chat_single_flight = SingleFlight()
+    return _chat_single_flight
@@ -0,0 +1,225 @@
+"""
+Query Cache Sweeper
+
+query_cache에서 만료된 항목(expires_at < now)과 오래되고 조회가 적은 항목을
+주기적으로 삭제하는 백그라운드 작업입니다.
+
+- ORM 객체를 로드하지 않고 DELETE ... WHERE id IN (SELECT ... LIMIT n) RETURNING query_hash 로 배치 삭제
+- 배치마다 커밋하여 잠금/WAL을 작게 유지, 삭제된 query_hash는 L1 캐시에서도 제거
+- 여러 인스턴스가 동시에 돌지 않도록 배치 트랜잭션마다 xact advisory lock
+  (잡지 못하면 이번 주기는 건너뜀, 커밋 시 해제되므로 pgbouncer transaction 모드에서도 안전)
+"""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List
+
+from sqlalchemy import and_, delete, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.config import get_settings
+from app.db.neon import async_session_maker
+from app.models.db_models import QueryCache
+from app.services.cache.semantic_cache import invalidate_memory_cache
+
+settings = get_settings()
+
+SWEEPER_LOCK_KEY = 0x63737770  # "cswp"
+
+
+def expired_condition(now: Optional[datetime] = None):
+    return QueryCache.expires_at < (now or datetime.now(timezone.utc))
+
+
+def stale_condition(max_age_days: int, min_hit_count: int):
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+    return and_(QueryCache.created_at < cutoff, QueryCache.hit_count <= min_hit_count)
+
+
+async def delete_cache_batch(db: AsyncSession | AsyncConnection, condition, batch_size: int) -> List[str]:
+    """
+    조건에 맞는 캐시 항목을 최대 batch_size개 삭제 (커밋은 호출 측)
+
+    Returns:
+        삭제된 query_hash 목록
+    """
+    batch = (
+        select(QueryCache.id)
+        .where(condition)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        delete(QueryCache)
+        .where(QueryCache.id.in_(batch.scalar_subquery()))
+        .returning(QueryCache.query_hash)
+        .execution_options(synchronize_session=False)
+    )
+    return [row[0] for row in result]
+
+
+async def purge_cache(
+    db: AsyncSession | AsyncConnection,
+    condition,
+    batch_size: int,
+    max_batches: Optional[int] = None,
+) -> int:
+    """
+    조건에 맞는 캐시 항목을 배치 단위로 모두 삭제 (배치마다 커밋)
+
+    Returns:
+        삭제된 행 수
+    """
+    deleted = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        hashes = await delete_cache_batch(db, condition, batch_size)
+        await db.commit()
+        if not hashes:
+            break
+        invalidate_memory_cache(hashes)
+        deleted += len(hashes)
+        batches += 1
+        if len(hashes) < batch_size:
+            break
+        await asyncio.sleep(0)  # 다른 요청에 양보
+    return deleted
+
+
+class CacheSweeper:
+    """만료/오래된 캐시 정리 (단일 이벤트 루프 전용)"""
+
+    def __init__(
+        self,
+        interval_seconds: float,
+        batch_size: int,
+        stale_max_age_days: int,
+        stale_min_hit_count: int,
+        max_batches_per_run: Optional[int] = None,
+    ):
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.stale_max_age_days = stale_max_age_days
+        self.stale_min_hit_count = stale_min_hit_count
+        self.max_batches_per_run = max_batches_per_run
+        self._task: Optional[asyncio.Task] = None
+
+        self.runs = 0
+        self.skipped_locked = 0
+        self.failures = 0
+        self.expired_deleted = 0
+        self.stale_deleted = 0
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                self.failures += 1
+                print(f"[CacheSweeper] Run failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self) -> Optional[Dict[str, Any]]:
+        """
+        한 번 정리 실행
+
+        Returns:
+            이번 실행 결과 (다른 인스턴스가 lock을 잡고 있으면 None)
+        """
+        started = time.monotonic()
+        expired = await self._purge_locked(expired_condition())
+        if expired is None:
+            self.skipped_locked += 1
+            return None
+        stale = await self._purge_locked(
+            stale_condition(self.stale_max_age_days, self.stale_min_hit_count)
+        ) or 0
+
+        self.runs += 1
+        self.expired_deleted += expired
+        self.stale_deleted += stale
+        self.last_run = {
+            "finished_at": datetime.now(timezone.utc).isoformat(),
+            "expired_deleted": expired,
+            "stale_deleted": stale,
+            "duration_ms": int((time.monotonic() - started) * 1000),
+        }
+        if expired or stale:
+            print(f"[CacheSweeper] Reclaimed {expired} expired, {stale} stale cache entries")
+        return self.last_run
+
+    async def _purge_locked(self, condition) -> Optional[int]:
+        """
+        purge_cache와 같지만 배치 트랜잭션마다 advisory lock을 시도
+
+        Returns:
+            삭제된 행 수 (첫 배치에서 lock을 잡지 못하면 None, 도중에 놓치면 그때까지의 수)
+        """
+        deleted = 0
+        batches = 0
+        while self.max_batches_per_run is None or batches < self.max_batches_per_run:
+            async with async_session_maker() as session:
+                locked = (await session.execute(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": SWEEPER_LOCK_KEY}
+                )).scalar()
+                if not locked:
+                    return None if batches == 0 else deleted
+                hashes = await delete_cache_batch(session, condition, self.batch_size)
+                await session.commit()
+            if not hashes:
+                break
+            invalidate_memory_cache(hashes)
+            deleted += len(hashes)
+            batches += 1
+            if len(hashes) < self.batch_size:
+                break
+            await asyncio.sleep(0)  # 다른 요청에 양보
+        return deleted
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "runs": self.runs,
+            "skipped_locked": self.skipped_locked,
+            "failures": self.failures,
+            "expired_deleted": self.expired_deleted,
+            "stale_deleted": self.stale_deleted,
+            "last_run": self.last_run,
+        }
+
+
+# 싱글톤 인스턴스
+_cache_sweeper: Optional[CacheSweeper] = None
+
+
+def get_cache_sweeper() -> CacheSweeper:
+    global _cache_sweeper
+    if _cache_sweeper is None:
+        _cache_sweeper = CacheSweeper(
+            interval_seconds=settings.cache_sweep_interval_seconds,
+            batch_size=settings.cache_sweep_batch_size,
+            stale_max_age_days=settings.cache_stale_max_age_days,
+            stale_min_hit_count=settings.cache_stale_min_hit_count,
+            max_batches_per_run=settings.cache_sweep_max_batches or None,
+        )
+    return _cache_sweeper
@@ -0,0 +1,188 @@
+"""
+Write-behind Semantic Cache
+
+캐시 저장(임베딩 → 해시 조회 → INSERT/UPDATE)을 응답 반환 이후 백그라운드에서 수행합니다.
+
+- 요청에서 이미 계산한 쿼리 임베딩 재사용
+- 같은 해시의 대기 중인 쓰기는 최신 것 하나로 병합
+- 워커 전용 DB 세션 사용
+- 일시적 DB 오류는 백오프 후 재시도
+- L1 메모리 캐시는 즉시 갱신하므로 직후의 같은 질문은 바로 히트
+"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
+
+from sqlalchemy.exc import DBAPIError, IntegrityError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.db.neon import async_session_maker
+from app.services.cache.semantic_cache import generate_query_hash, prime_memory_cache, save_to_cache
+from app.services.llm.openai_client import peek_embedding
+
+settings = get_settings()
+
+
+def _is_transient(error: Exception) -> bool:
+    """재시도할 가치가 있는 오류인지 판단"""
+    if isinstance(error, (OperationalError, InterfaceError, IntegrityError)):
+        # IntegrityError: 다른 인스턴스가 같은 해시를 먼저 INSERT → 재시도 시 UPDATE 경로
+        return True
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(error, (OSError, ConnectionError, asyncio.TimeoutError))
+
+
+class CacheWriteBehind:
+    """해시별로 병합되는 캐시 쓰기 큐 (단일 이벤트 루프 전용)"""
+
+    def __init__(self, max_pending: int, max_retries: int):
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.enqueued = 0
+        self.deduped = 0
+        self.written = 0
+        self.retries = 0
+        self.failed = 0
+        self.dropped_full = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """대기 중인 쓰기를 모두 처리한 후 종료"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        while self._pending:
+            _, item = self._pending.popitem(last=False)
+            await self._write(item)
+
+    def submit(
+        self,
+        query: str,
+        response: str,
+        sources: Optional[list] = None,
+        query_embedding: Optional[List[float]] = None,
+    ) -> bool:
+        query_hash = generate_query_hash(query)
+
+        if query_hash in self._pending:
+            # 아직 기록되지 않은 이전 응답은 최신 응답으로 대체
+            self.deduped += 1
+        elif len(self._pending) >= self.max_pending:
+            self.dropped_full += 1
+            return False
+
+        self._pending[query_hash] = {
+            "query": query,
+            "response": response,
+            "sources": sources,
+            "query_embedding": query_embedding,
+        }
+        self.enqueued += 1
+        self._wakeup.set()
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while self._pending:
+                query_hash, item = self._pending.popitem(last=False)
+                try:
+                    await self._write(item)
+                except asyncio.CancelledError:
+                    # 종료 중이면 drain에서 다시 기록 (그 사이 새 쓰기가 들어왔으면 그것을 우선)
+                    self._pending.setdefault(query_hash, item)
+                    raise
+
+    async def _write(self, item: Dict[str, Any]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with async_session_maker() as session:
+                    await save_to_cache(
+                        session,
+                        item["query"],
+                        item["response"],
+                        item["sources"],
+                        query_embedding=item["query_embedding"],
+                    )
+                    await session.commit()
+                self.written += 1
+                return
+            except Exception as e:
+                if attempt < self.max_retries and _is_transient(e):
+                    self.retries += 1
+                    await asyncio.sleep(0.2 * (2 ** attempt))
+                    continue
+                self.failed += 1
+                print(f"[CacheWriteBehind] Failed to save cache for: {item['query'][:50]}... - {e}")
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "enqueued": self.enqueued,
+            "deduped": self.deduped,
+            "written": self.written,
+            "retries": self.retries,
+            "failed": self.failed,
+            "dropped_full": self.dropped_full,
+        }
+
+
+# 싱글톤 인스턴스
+_cache_write_behind: Optional[CacheWriteBehind] = None
+
+
+def get_cache_write_behind() -> CacheWriteBehind:
+    global _cache_write_behind
+    if _cache_write_behind is None:
+        _cache_write_behind = CacheWriteBehind(
+            max_pending=settings.cache_write_behind_max_pending,
+            max_retries=settings.cache_write_max_retries,
+        )
+    return _cache_write_behind
+
+
+async def save_to_cache_deferred(
+    db: AsyncSession,
+    query: str,
+    response: str,
+    sources: list = None,
+) -> None:
+    """
+    캐시 저장 (write-behind 모드면 큐에 넣고 즉시 반환)
+
+    write-behind가 비활성화되었거나 큐가 가득 찬 경우 요청 세션으로 즉시 저장합니다.
+    """
+    writer = get_cache_write_behind()
+    if settings.cache_write_behind_enabled and writer.running:
+        # 요청에서 이미 계산된 임베딩 재사용 (없으면 워커가 생성)
+        if writer.submit(query, response, sources, query_embedding=peek_embedding(query)):
+            prime_memory_cache(query, response, sources or [])
+            return
+
+    await save_to_cache(db, query, response, sources)
@@ -0,0 +1,44 @@
+"""
+Guru 포스트 쓰기
+
+포스트 추가/삭제는 이 함수들을 거쳐야 미리 계산된 타임라인(user_timelines)과
+피드 total(user_timeline_state.post_count)이 함께 갱신됩니다. 커밋은 호출 측에서 합니다.
+"""
+
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.db_models import GuruPost
+from app.services.feed.timeline import fan_out_posts, retract_posts
+
+
+async def add_posts(db: AsyncSession, posts_data: Sequence[Dict[str, Any]]) -> List[GuruPost]:
+    """포스트 추가 후 타임라인이 있는 팔로워에게 fan-out"""
+    posts = [GuruPost(**post_data) for post_data in posts_data]
+    if not posts:
+        return posts
+    db.add_all(posts)
+    await db.flush()
+    await fan_out_posts(db, [post.id for post in posts])
+    return posts
+
+
+async def delete_posts(db: AsyncSession, post_ids: Sequence[str]) -> List[str]:
+    """
+    타임라인에서 먼저 제거한 뒤 포스트 삭제
+
+    Returns:
+        실제로 삭제된 포스트 id 목록
+    """
+    if not post_ids:
+        return []
+    await retract_posts(db, post_ids)
+    result = await db.execute(
+        delete(GuruPost)
+        .where(GuruPost.id.in_(list(post_ids)))
+        .returning(GuruPost.id)
+        .execution_options(synchronize_session=False)
+    )
+    return [row[0] for row in result]
@@ -0,0 +1,236 @@
+"""
+User Timeline (미리 계산된 팔로우 피드)
+
+/api/feed?user_id= 요청마다 팔로우 Guru를 로드하고 IN (...) 쿼리를 실행하는 대신,
+사용자별 최근 포스트 목록(user_timelines)을 유지해 (user_id, posted_at, post_id) 인덱스 한 번으로 읽습니다.
+
+- 팔로우 변경 시: rebuild_user_timeline
+- 포스트 추가 시: fan_out_posts (타임라인이 만들어진 팔로워에게만 추가 후 한도 초과분 삭제)
+- 포스트 삭제 전: retract_posts (타임라인 항목 제거 + post_count 감소)
+  (포스트 쓰기는 feed.posts.add_posts / delete_posts를 거쳐 두 훅이 항상 호출됨)
+- 타임라인이 없거나(cold) 보관 범위를 넘는 페이지는 호출 측에서 쿼리 경로로 폴백
+"""
+
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, delete, desc, func, literal, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.config import get_settings
+from app.models.db_models import GuruPost, UserTimeline, UserTimelineState
+
+settings = get_settings()
+
+
+async def get_timeline_state(db: AsyncSession, user_id: str) -> Optional[UserTimelineState]:
+    """사용 가능한 타임라인 상태 (없거나 보관 한도 설정이 바뀌었으면 None)"""
+    # 같은 세션에서 rebuild/fan-out 이후에도 최신 값을 읽도록 populate_existing
+    state = await db.get(UserTimelineState, user_id, populate_existing=True)
+    if state is None or state.max_entries != settings.timeline_max_entries:
+        return None
+    return state
+
+
+async def rebuild_user_timeline(db: AsyncSession, user_id: str, guru_ids: Sequence[str]) -> int:
+    """
+    팔로우 Guru 기준으로 타임라인 재생성
+
+    Returns:
+        팔로우 Guru의 전체 포스트 수
+    """
+    max_entries = settings.timeline_max_entries
+
+    await db.execute(delete(UserTimeline).where(UserTimeline.user_id == user_id))
+
+    if not guru_ids:
+        # 팔로우가 없으면 전체 피드를 보여주므로 타임라인을 두지 않음 (쿼리 경로)
+        await db.execute(delete(UserTimelineState).where(UserTimelineState.user_id == user_id))
+        return 0
+
+    recent_posts = (
+        select(literal(user_id), GuruPost.id, GuruPost.guru_id, GuruPost.posted_at)
+        .where(GuruPost.guru_id.in_(guru_ids))
+        .order_by(desc(GuruPost.posted_at), desc(GuruPost.id))
+        .limit(max_entries)
+    )
+    await db.execute(
+        pg_insert(UserTimeline)
+        .from_select(["user_id", "post_id", "guru_id", "posted_at"], recent_posts)
+        .on_conflict_do_nothing()
+    )
+
+    count_result = await db.execute(
+        select(func.count()).select_from(GuruPost).where(GuruPost.guru_id.in_(guru_ids))
+    )
+    post_count = count_result.scalar_one()
+
+    state = pg_insert(UserTimelineState).values(
+        user_id=user_id,
+        post_count=post_count,
+        max_entries=max_entries,
+        built_at=func.now(),
+    )
+    await db.execute(
+        state.on_conflict_do_update(
+            index_elements=[UserTimelineState.user_id],
+            set_={
+                "post_count": state.excluded.post_count,
+                "max_entries": state.excluded.max_entries,
+                "built_at": state.excluded.built_at,
+            },
+        )
+    )
+
+    print(f"[Timeline] Rebuilt timeline for user {user_id} ({post_count} posts, {len(guru_ids)} gurus)")
+    return post_count
+
+
+async def fan_out_posts(db: AsyncSession, post_ids: Sequence[str]) -> int:
+    """
+    새 포스트(flush 완료)를 해당 Guru 팔로워들의 타임라인에 추가
+
+    타임라인이 없는 사용자는 건너뜁니다 (첫 피드 조회 시 빌드).
+
+    Returns:
+        추가된 타임라인 행 수
+    """
+    if not post_ids:
+        return 0
+
+    params = {"post_ids": list(post_ids)}
+
+    # 피드 total 갱신
+    await db.execute(
+        text("""
+            UPDATE user_timeline_state s
+            SET post_count = s.post_count + c.new_posts
+            FROM (
+                SELECT ug.user_id, count(*) AS new_posts
+                FROM guru_posts p
+                JOIN user_gurus ug ON ug.guru_id = p.guru_id
+                WHERE p.id IN :post_ids
+                GROUP BY ug.user_id
+            ) c
+            WHERE s.user_id = c.user_id
+        """).bindparams(bindparam("post_ids", expanding=True)),
+        params,
+    )
+
+    result = await db.execute(
+        text("""
+            INSERT INTO user_timelines (user_id, post_id, guru_id, posted_at)
+            SELECT ug.user_id, p.id, p.guru_id, p.posted_at
+            FROM guru_posts p
+            JOIN user_gurus ug ON ug.guru_id = p.guru_id
+            JOIN user_timeline_state s ON s.user_id = ug.user_id
+            WHERE p.id IN :post_ids
+            ON CONFLICT DO NOTHING
+            RETURNING user_id
+        """).bindparams(bindparam("post_ids", expanding=True)),
+        params,
+    )
+    inserted_rows = result.fetchall()
+    if not inserted_rows:
+        return 0
+
+    user_ids = {row.user_id for row in inserted_rows}
+    # 보관 한도를 넘는 오래된 항목 삭제
+    await db.execute(
+        text("""
+            DELETE FROM user_timelines t
+            USING (
+                SELECT
+                    user_id, post_id,
+                    row_number() OVER (PARTITION BY user_id ORDER BY posted_at DESC, post_id DESC) AS rn
+                FROM user_timelines
+                WHERE user_id IN :user_ids
+            ) ranked
+            WHERE t.user_id = ranked.user_id
+              AND t.post_id = ranked.post_id
+              AND ranked.rn > :max_entries
+        """).bindparams(bindparam("user_ids", expanding=True)),
+        {"user_ids": list(user_ids), "max_entries": settings.timeline_max_entries},
+    )
+
+    print(f"[Timeline] Fanned out {len(post_ids)} posts to {len(user_ids)} timelines")
+    return len(inserted_rows)
+
+
+async def retract_posts(db: AsyncSession, post_ids: Sequence[str]) -> int:
+    """
+    삭제할 포스트(아직 삭제 전)를 팔로워 타임라인에서 제거
+
+    post_count는 타임라인 보관 여부와 관계없이 팔로워마다 감소합니다.
+    보관 한도 때문에 빈자리는 채우지 않으며, 모자라는 페이지는 read_timeline이 쿼리 경로로 넘깁니다.
+
+    Returns:
+        제거된 타임라인 행 수
+    """
+    if not post_ids:
+        return 0
+
+    params = {"post_ids": list(post_ids)}
+
+    await db.execute(
+        text("""
+            UPDATE user_timeline_state s
+            SET post_count = greatest(s.post_count - c.removed_posts, 0)
+            FROM (
+                SELECT ug.user_id, count(*) AS removed_posts
+                FROM guru_posts p
+                JOIN user_gurus ug ON ug.guru_id = p.guru_id
+                WHERE p.id IN :post_ids
+                GROUP BY ug.user_id
+            ) c
+            WHERE s.user_id = c.user_id
+        """).bindparams(bindparam("post_ids", expanding=True)),
+        params,
+    )
+
+    result = await db.execute(
+        delete(UserTimeline)
+        .where(UserTimeline.post_id.in_(list(post_ids)))
+        .returning(UserTimeline.user_id)
+    )
+    removed = len(result.fetchall())
+    if removed:
+        print(f"[Timeline] Retracted {len(post_ids)} posts from {removed} timeline entries")
+    return removed
+
+
+async def read_timeline(
+    db: AsyncSession,
+    state: UserTimelineState,
+    limit: int,
+    offset: int = 0,
+    cursor: Optional[Tuple[datetime, str]] = None,
+) -> Optional[Tuple[List[GuruPost], bool]]:
+    """
+    타임라인에서 피드 페이지 조회
+
+    Returns:
+        (posts, has_more) 또는 요청 범위가 보관된 타임라인을 넘으면 None
+    """
+    query = (
+        select(GuruPost)
+        .join(UserTimeline, UserTimeline.post_id == GuruPost.id)
+        .options(selectinload(GuruPost.guru))
+        .where(UserTimeline.user_id == state.user_id)
+    )
+    if cursor:
+        query = query.where(tuple_(UserTimeline.posted_at, UserTimeline.post_id) < tuple_(*cursor))
+    else:
+        query = query.offset(offset)
+    query = query.order_by(desc(UserTimeline.posted_at), desc(UserTimeline.post_id)).limit(limit + 1)
+
+    result = await db.execute(query)
+    posts = result.scalars().all()
+
+    has_more = len(posts) > limit
+    if not has_more and state.post_count > state.max_entries:
+        # 보관 한도 밖의 오래된 포스트가 더 있음
+        return None
+    return posts[:limit], has_more
@@ -0,0 +1,12 @@
+from .queue import enqueue_job, get_job, get_kind_status, job_to_dict, list_jobs
+from .worker import JobWorker, get_job_worker
+
+__all__ = [
+    "enqueue_job",
+    "get_job",
+    "get_kind_status",
+    "job_to_dict",
+    "list_jobs",
+    "JobWorker",
+    "get_job_worker",
+]
@@ -0,0 +1,117 @@
+"""
+작업 종류별 핸들러
+
+핸들러는 JobWorker가 작업마다 여는 전용 세션과 payload를 받아 결과 dict를 반환합니다.
+lock_group이 같은 작업들은 advisory lock으로 모든 레플리카에서 한 번에 하나만 실행됩니다.
+payload는 등록 시 validate_payload로 허용된 키만 통과시킵니다 (핸들러가 **payload로 전달).
+"""
+
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, NamedTuple, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.services.learning.self_learner import SelfLearner
+from app.services.rag.embedder import ingest_documents
+
+settings = get_settings()
+
+JobHandler = Callable[[AsyncSession, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class JobKind(NamedTuple):
+    handler: JobHandler
+    lock_group: Optional[str] = None  # None이면 동시 실행 허용
+    payload_keys: FrozenSet[str] = frozenset()  # 허용되는 payload 키
+    required_keys: FrozenSet[str] = frozenset()
+    # 실행 가능한 rag_backend (None이면 제한 없음)
+    # 프로세스 내 인덱스(chroma / numpy)는 작업을 가져간 레플리카에만 반영되므로 공유 저장소만 허용
+    rag_backends: Optional[FrozenSet[str]] = None
+
+
+async def _run_learning_cycle(db: AsyncSession, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await SelfLearner(db).run_learning_cycle()
+
+
+async def _pre_warm(db: AsyncSession, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await SelfLearner(db).pre_warm_popular_queries(**payload)
+
+
+async def _improve_responses(db: AsyncSession, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await SelfLearner(db).improve_negative_responses(**payload)
+
+
+async def _cleanup_cache(db: AsyncSession, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await SelfLearner(db).cleanup_stale_cache(**payload)
+
+
+async def _extend_ttl(db: AsyncSession, payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await SelfLearner(db).extend_high_quality_cache(**payload)
+
+
+async def _ingest_documents(db: AsyncSession, payload: Dict[str, Any]) -> Dict[str, Any]:
+    # 등록 후 rag_backend가 바뀐 경우에도 한 레플리카의 인덱스만 바뀌지 않도록
+    check_rag_backend("ingest_documents")
+    # 바뀐 문서만 임베딩, prune=True면 scope 안에서 입력에 없는 문서 삭제
+    return await ingest_documents(
+        payload["documents"],
+        prune=payload.get("prune", False),
+        scope=payload.get("scope"),
+    )
+
+
+JOB_KINDS: Dict[str, JobKind] = {
+    # 학습 작업은 같은 캐시 항목을 다시 쓰므로 서로 겹치지 않게 실행
+    "learning_cycle": JobKind(_run_learning_cycle, lock_group="learning"),
+    "pre_warm": JobKind(
+        _pre_warm, lock_group="learning", payload_keys=frozenset({"days", "min_count", "limit"})
+    ),
+    "improve_responses": JobKind(
+        _improve_responses, lock_group="learning", payload_keys=frozenset({"days", "min_negative"})
+    ),
+    "cleanup": JobKind(
+        _cleanup_cache, lock_group="learning", payload_keys=frozenset({"max_age_days", "min_hit_count"})
+    ),
+    "extend_ttl": JobKind(
+        _extend_ttl, lock_group="learning", payload_keys=frozenset({"positive_threshold", "extension_days"})
+    ),
+    "ingest_documents": JobKind(
+        _ingest_documents,
+        lock_group="ingest",
+        payload_keys=frozenset({"documents", "prune", "scope"}),
+        required_keys=frozenset({"documents"}),
+        rag_backends=frozenset({"pgvector"}),
+    ),
+}
+
+
+def check_rag_backend(kind: str) -> None:
+    """현재 rag_backend에서 실행할 수 없는 작업이면 ValueError"""
+    backends = JOB_KINDS[kind].rag_backends
+    if backends is not None and settings.rag_backend not in backends:
+        raise ValueError(
+            f"{kind} requires rag_backend in ({', '.join(sorted(backends))}), "
+            f"current: {settings.rag_backend} (in-process index is per replica; "
+            "run scripts.seed_rag on every replica instead)"
+        )
+
+
+def validate_payload(kind: str, payload: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    등록 전 payload 검사 (알 수 없는 종류/키, 누락된 필수 키, 현재 rag_backend에서 실행 불가는 ValueError)
+
+    Returns:
+        검사된 payload (None이면 빈 dict)
+    """
+    job_kind = JOB_KINDS.get(kind)
+    if job_kind is None:
+        raise ValueError(f"Unknown job kind: {kind}")
+    check_rag_backend(kind)
+    payload = payload or {}
+    unknown = set(payload) - job_kind.payload_keys
+    if unknown:
+        raise ValueError(f"Unknown payload keys for {kind}: {', '.join(sorted(unknown))}")
+    missing = job_kind.required_keys - set(payload)
+    if missing:
+        raise ValueError(f"Missing payload keys for {kind}: {', '.join(sorted(missing))}")
+    return payload
@@ -0,0 +1,292 @@
+"""
+Postgres 작업 큐 (background_jobs)
+
+- enqueue: dedupe_key가 같은 queued/running 작업이 있으면 추가하지 않음 (부분 unique 인덱스)
+- claim: FOR UPDATE SKIP LOCKED로 여러 워커/레플리카가 겹치지 않게 가져가고 lease 부여
+- heartbeat: lease 연장 (lease가 끝난 running 작업은 다른 워커가 다시 claim)
+- 실패 시 max_attempts까지 backoff 후 재시도
+"""
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, bindparam, case, desc, func, literal_column, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.models.db_models import BackgroundJob, generate_uuid
+
+settings = get_settings()
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+ACTIVE_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+CLAIM_SQL = text("""
+    UPDATE background_jobs j
+    SET status = 'running',
+        locked_by = :worker_id,
+        attempts = j.attempts + 1,
+        lease_expires_at = now() + make_interval(secs => :lease_seconds),
+        heartbeat_at = now(),
+        started_at = coalesce(j.started_at, now()),
+        error = NULL
+    FROM (
+        SELECT id
+        FROM background_jobs
+        WHERE kind IN :kinds
+          AND (
+            (status = 'queued' AND run_after <= now())
+            OR (status = 'running' AND lease_expires_at < now() AND attempts < max_attempts)
+          )
+        ORDER BY run_after
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED
+    ) c
+    WHERE j.id = c.id
+    RETURNING j.id, j.kind, j.payload, j.attempts, j.max_attempts
+""").bindparams(bindparam("kinds", expanding=True))
+
+# lease가 끝났는데 재시도 횟수를 모두 쓴 작업 (워커 프로세스가 죽은 경우)
+EXPIRE_SQL = text("""
+    UPDATE background_jobs
+    SET status = 'failed',
+        error = 'lease expired after final attempt',
+        finished_at = now(),
+        locked_by = NULL,
+        lease_expires_at = NULL
+    WHERE status = 'running'
+      AND lease_expires_at < now()
+      AND attempts >= max_attempts
+""")
+
+
+async def enqueue_job(
+    db: AsyncSession,
+    kind: str,
+    payload: Optional[Dict[str, Any]] = None,
+    dedupe_key: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+    delay_seconds: float = 0,
+) -> Optional[str]:
+    """
+    작업 추가 (커밋 포함)
+
+    Returns:
+        작업 id, 같은 dedupe_key의 작업이 이미 대기/실행 중이면 None
+    """
+    job_id = generate_uuid()
+    result = await db.execute(
+        pg_insert(BackgroundJob)
+        .values(
+            id=job_id,
+            kind=kind,
+            payload=json.dumps(payload or {}, ensure_ascii=False),
+            status=JOB_QUEUED,
+            dedupe_key=dedupe_key,
+            max_attempts=max_attempts or settings.jobs_max_attempts,
+            run_after=datetime.now(timezone.utc) + timedelta(seconds=delay_seconds),
+        )
+        .on_conflict_do_nothing()
+        .returning(BackgroundJob.id)
+    )
+    inserted = result.scalar_one_or_none()
+    await db.commit()
+    return inserted
+
+
+async def claim_jobs(
+    db: AsyncSession,
+    worker_id: str,
+    kinds: Sequence[str],
+    limit: int,
+    lease_seconds: float,
+) -> List[Dict[str, Any]]:
+    """실행할 작업을 최대 limit개 가져옴 (커밋 포함)"""
+    await db.execute(EXPIRE_SQL)
+    result = await db.execute(
+        CLAIM_SQL,
+        {"worker_id": worker_id, "kinds": list(kinds), "limit": limit, "lease_seconds": lease_seconds},
+    )
+    jobs = [
+        {
+            "id": row.id,
+            "kind": row.kind,
+            "payload": json.loads(row.payload) if row.payload else {},
+            "attempts": row.attempts,
+            "max_attempts": row.max_attempts,
+        }
+        for row in result
+    ]
+    await db.commit()
+    return jobs
+
+
+def _owned(job_id: str, worker_id: str):
+    return and_(
+        BackgroundJob.id == job_id,
+        BackgroundJob.locked_by == worker_id,
+        BackgroundJob.status == JOB_RUNNING,
+    )
+
+
+async def heartbeat_job(db: AsyncSession, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+    """
+    lease 연장 (커밋 포함)
+
+    Returns:
+        False면 lease를 잃음 (만료 후 다른 워커가 가져감)
+    """
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(BackgroundJob)
+        .where(_owned(job_id, worker_id))
+        .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=lease_seconds))
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def complete_job(db: AsyncSession, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+    """작업 성공 기록 (커밋 포함)"""
+    updated = await db.execute(
+        update(BackgroundJob)
+        .where(_owned(job_id, worker_id))
+        .values(
+            status=JOB_SUCCEEDED,
+            result=json.dumps(result, ensure_ascii=False, default=str),
+            finished_at=datetime.now(timezone.utc),
+            locked_by=None,
+            lease_expires_at=None,
+        )
+    )
+    await db.commit()
+    return updated.rowcount == 1
+
+
+async def fail_job(db: AsyncSession, job_id: str, worker_id: str, error: str) -> Optional[str]:
+    """
+    작업 실패 기록 (커밋 포함)
+
+    재시도 횟수가 남았으면 backoff 후 다시 queued, 아니면 failed
+
+    Returns:
+        변경된 상태 (lease를 잃었으면 None)
+    """
+    retry = BackgroundJob.attempts < BackgroundJob.max_attempts
+    # 재시도마다 backoff 배수 증가
+    backoff = literal_column("interval '1 second'") * (BackgroundJob.attempts * settings.jobs_retry_backoff_seconds)
+    result = await db.execute(
+        update(BackgroundJob)
+        .where(_owned(job_id, worker_id))
+        .values(
+            status=case((retry, JOB_QUEUED), else_=JOB_FAILED),
+            run_after=func.now() + backoff,
+            finished_at=case((retry, None), else_=func.now()),
+            error=error[:2000],
+            locked_by=None,
+            lease_expires_at=None,
+        )
+        .returning(BackgroundJob.status)
+    )
+    status = result.scalar_one_or_none()
+    await db.commit()
+    return status
+
+
+async def release_job(db: AsyncSession, job_id: str, worker_id: str, delay_seconds: float = 0) -> bool:
+    """
+    실행하지 못한 작업을 시도 횟수 차감 없이 대기열로 되돌림 (커밋 포함)
+
+    종료(shutdown)나 상호 배제 lock을 얻지 못한 경우에 사용
+    """
+    result = await db.execute(
+        update(BackgroundJob)
+        .where(_owned(job_id, worker_id))
+        .values(
+            status=JOB_QUEUED,
+            attempts=BackgroundJob.attempts - 1,
+            run_after=datetime.now(timezone.utc) + timedelta(seconds=delay_seconds),
+            locked_by=None,
+            lease_expires_at=None,
+        )
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+def job_to_dict(job: BackgroundJob) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "payload": json.loads(job.payload) if job.payload else None,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "locked_by": job.locked_by,
+        "result": json.loads(job.result) if job.result else None,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        "heartbeat_at": job.heartbeat_at.isoformat() if job.heartbeat_at else None,
+    }
+
+
+async def get_job(db: AsyncSession, job_id: str) -> Optional[BackgroundJob]:
+    return await db.get(BackgroundJob, job_id, populate_existing=True)
+
+
+async def list_jobs(
+    db: AsyncSession,
+    kind: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 20,
+) -> List[BackgroundJob]:
+    query = select(BackgroundJob).order_by(desc(BackgroundJob.created_at)).limit(limit)
+    if kind:
+        query = query.where(BackgroundJob.kind == kind)
+    if status:
+        query = query.where(BackgroundJob.status == status)
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def get_kind_status(db: AsyncSession, kind: str) -> Dict[str, Any]:
+    """
+    종류별 상태 요약 (모든 레플리카 공통)
+
+    Returns:
+        {"is_running", "last_run", "last_result"}
+    """
+    active = await db.execute(
+        select(BackgroundJob.id)
+        .where(and_(BackgroundJob.kind == kind, BackgroundJob.status.in_(ACTIVE_STATUSES)))
+        .limit(1)
+    )
+    finished = await db.execute(
+        select(BackgroundJob)
+        .where(
+            and_(
+                BackgroundJob.kind == kind,
+                or_(BackgroundJob.status == JOB_SUCCEEDED, BackgroundJob.status == JOB_FAILED),
+            )
+        )
+        .order_by(desc(BackgroundJob.finished_at))
+        .limit(1)
+    )
+    last = finished.scalar_one_or_none()
+
+    last_result = None
+    if last is not None:
+        last_result = json.loads(last.result) if last.result else {"error": last.error}
+
+    return {
+        "is_running": active.first() is not None,
+        "last_run": last.finished_at.isoformat() if last and last.finished_at else None,
+        "last_result": last_result,
+    }
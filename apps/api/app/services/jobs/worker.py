@@ -0,0 +1,237 @@
+"""
+Job Worker
+
+background_jobs에서 작업을 가져와 실행하는 백그라운드 워커입니다 (레플리카마다 하나).
+
+- 최대 jobs_worker_concurrency개 작업을 동시에 실행, 작업마다 별도 DB 세션
+- 실행 중에는 heartbeat로 lease 연장 (lease를 잃으면 결과를 기록하지 않음)
+- lock_group이 있는 작업은 세션 수준 advisory lock을 잡은 연결을 실행 내내 유지
+  (lease 만료로 다른 워커가 같은 작업을 다시 가져가도 동시에 실행되지 않음)
+  - lock 연결은 get_lock_engine(): pgbouncer transaction 모드에서도 pooler를 거치지 않는 직접 연결
+- 종료 시 실행 중인 작업은 시도 횟수 차감 없이 대기열로 되돌림
+"""
+
+import asyncio
+import os
+import socket
+import time
+import uuid
+import zlib
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.db.neon import async_session_maker, get_lock_engine
+from app.services.jobs.handlers import JOB_KINDS
+from app.services.jobs.queue import (
+    JOB_FAILED,
+    claim_jobs,
+    complete_job,
+    fail_job,
+    heartbeat_job,
+    release_job,
+)
+
+settings = get_settings()
+
+# advisory lock 키 네임스페이스 (pg_try_advisory_lock(int, int)의 첫 번째 키)
+JOB_LOCK_NAMESPACE = 0x6A6F62  # "job"
+
+# lock을 얻지 못한 작업을 다시 시도하기까지 대기 (초)
+LOCK_RETRY_DELAY_SECONDS = 15.0
+
+
+def _lock_key(lock_group: str) -> int:
+    return zlib.crc32(lock_group.encode()) & 0x7FFFFFFF
+
+
+class JobWorker:
+    """Postgres 작업 큐 워커 (단일 이벤트 루프 전용)"""
+
+    def __init__(self, concurrency: int, poll_interval_seconds: float, lease_seconds: float):
+        self.concurrency = concurrency
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+        self._task: Optional[asyncio.Task] = None
+        self._running_jobs: Dict[str, asyncio.Task] = {}
+        self._wakeup = asyncio.Event()
+
+        self.claimed = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+        self.lock_conflicts = 0
+        self.leases_lost = 0
+        self.poll_failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    def notify(self) -> None:
+        """새 작업 추가 시 다음 poll을 기다리지 않고 바로 claim"""
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        jobs = list(self._running_jobs.values())
+        for job_task in jobs:
+            job_task.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+
+    async def _run(self) -> None:
+        while True:
+            free = self.concurrency - len(self._running_jobs)
+            if free > 0:
+                try:
+                    async with async_session_maker() as session:
+                        jobs = await claim_jobs(
+                            session, self.worker_id, list(JOB_KINDS), free, self.lease_seconds
+                        )
+                except Exception as e:
+                    self.poll_failures += 1
+                    jobs = []
+                    print(f"[JobWorker] Claim failed: {e}")
+
+                for job in jobs:
+                    self.claimed += 1
+                    job_task = asyncio.create_task(self._execute(job))
+                    self._running_jobs[job["id"]] = job_task
+                    job_task.add_done_callback(lambda _, job_id=job["id"]: self._running_jobs.pop(job_id, None))
+
+                if jobs and len(jobs) == free:
+                    # 남은 작업이 더 있을 수 있음 → 슬롯이 비면 바로 다시 claim
+                    await self._wait_for_slot()
+                    continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _wait_for_slot(self) -> None:
+        if len(self._running_jobs) >= self.concurrency:
+            await asyncio.wait(list(self._running_jobs.values()), return_when=asyncio.FIRST_COMPLETED)
+
+    async def _execute(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+        kind = JOB_KINDS[job["kind"]]
+
+        lock_conn = None
+        try:
+            if kind.lock_group:
+                try:
+                    lock_conn = await get_lock_engine().connect()
+                    locked = (await lock_conn.execute(
+                        text("SELECT pg_try_advisory_lock(:ns, :key)"),
+                        {"ns": JOB_LOCK_NAMESPACE, "key": _lock_key(kind.lock_group)},
+                    )).scalar()
+                    await lock_conn.commit()
+                except Exception as e:
+                    # DB 연결 문제: lease 만료를 기다리지 않고 재시도 대기열로
+                    print(f"[JobWorker] Lock acquisition failed for job {job_id}: {e}")
+                    await self._finish(fail_job, job_id, self.worker_id, f"lock acquisition failed: {e}")
+                    return
+                if not locked:
+                    self.lock_conflicts += 1
+                    await self._finish(release_job, job_id, self.worker_id, LOCK_RETRY_DELAY_SECONDS)
+                    return
+
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            started = time.monotonic()
+            try:
+                async with async_session_maker() as session:
+                    result = await kind.handler(session, job["payload"])
+            except asyncio.CancelledError:
+                # 종료: 다른 워커/레플리카가 이어서 실행하도록 반환
+                await asyncio.shield(self._finish(release_job, job_id, self.worker_id))
+                raise
+            except Exception as e:
+                status = await self._finish(fail_job, job_id, self.worker_id, f"{type(e).__name__}: {e}")
+                if status == JOB_FAILED:
+                    self.failed += 1
+                elif status is not None:
+                    self.retried += 1
+                print(f"[JobWorker] {job['kind']} {job_id} failed (attempt {job['attempts']}/{job['max_attempts']}): {e}")
+            else:
+                if await self._finish(complete_job, job_id, self.worker_id, result):
+                    self.succeeded += 1
+                    print(f"[JobWorker] {job['kind']} {job_id} done in {int((time.monotonic() - started) * 1000)}ms")
+                else:
+                    self.leases_lost += 1
+            finally:
+                heartbeat.cancel()
+        finally:
+            if lock_conn is not None:
+                # 연결 종료 시 세션 수준 lock도 해제되지만 풀에 돌아가므로 명시적으로 해제
+                try:
+                    await lock_conn.execute(
+                        text("SELECT pg_advisory_unlock(:ns, :key)"),
+                        {"ns": JOB_LOCK_NAMESPACE, "key": _lock_key(kind.lock_group)},
+                    )
+                    await lock_conn.commit()
+                except Exception as e:
+                    print(f"[JobWorker] Advisory unlock failed for job {job_id}: {e}")
+                finally:
+                    await lock_conn.close()
+
+    async def _finish(self, fn, *args) -> Any:
+        async with async_session_maker() as session:
+            return await fn(session, *args)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        interval = max(1.0, self.lease_seconds / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with async_session_maker() as session:
+                    if not await heartbeat_job(session, job_id, self.worker_id, self.lease_seconds):
+                        print(f"[JobWorker] Lost lease on job {job_id}")
+                        return
+            except Exception as e:
+                print(f"[JobWorker] Heartbeat failed for job {job_id}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "running": self.running,
+            "concurrency": self.concurrency,
+            "active_jobs": len(self._running_jobs),
+            "claimed": self.claimed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+            "lock_conflicts": self.lock_conflicts,
+            "leases_lost": self.leases_lost,
+            "poll_failures": self.poll_failures,
+        }
+
+
+# 싱글톤 인스턴스
+_job_worker: Optional[JobWorker] = None
+
+
+def get_job_worker() -> JobWorker:
+    global _job_worker
+    if _job_worker is None:
+        _job_worker = JobWorker(
+            concurrency=settings.jobs_worker_concurrency,
+            poll_interval_seconds=settings.jobs_poll_interval_seconds,
+            lease_seconds=settings.jobs_lease_seconds,
+        )
+    return _job_worker
@@ -1,3 +1,4 @@
 from .self_learner import SelfLearner, run_self_learning
+from .worker_pool import RateBudget, get_openai_budget, run_worker_pool
 
-__all__ = ["SelfLearner", "run_self_learning"]
+__all__ = ["SelfLearner", "run_self_learning", "RateBudget", "get_openai_budget", "run_worker_pool"]
@@ -4,28 +4,54 @@ Self-Learning Service (Phase 4)
 1. 인기 쿼리 자동 캐싱 (Pre-warming)
 2. 부정 피드백 기반 응답 개선
 3. 스마트 캐시 관리
+
+1, 2는 쿼리마다 분류 → 검색 → MCP → 생성을 순차로 수행하므로
+worker_pool로 동시에 처리합니다 (워커별 세션, 공유 OpenAI 예산).
 """
 
 from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, desc, update
 
-from app.models.db_models import QueryAnalytics, QueryCache
-from app.services.analytics.logger import get_popular_queries, get_negative_feedback_queries
-from app.services.cache.semantic_cache import save_to_cache, get_cached_response, invalidate_cache, generate_query_hash
+from app.config import get_settings
+from app.db.neon import async_session_maker
+from app.models.db_models import QueryAnalytics, QueryAnalyticsHourly, QueryCache
+from app.services.analytics.logger import (
+    get_popular_queries,
+    get_negative_feedback_queries,
+    query_fingerprint_expr,
+)
+from app.services.analytics.rollup import bucket_start, rollup_covers
+from app.services.cache.semantic_cache import (
+    save_to_cache,
+    get_cached_response,
+    invalidate_cache,
+)
+from app.services.cache.sweeper import purge_cache
 from app.services.rag.retriever import retrieve_documents, format_context
 from app.services.llm.openai_client import generate_response
 from app.services.router.llm_router import classify_query, QueryType
 from app.services.mcp.arxiv_client import get_arxiv_client
 from app.services.mcp.huggingface_client import get_huggingface_client
+from app.services.learning.worker_pool import run_worker_pool
+
+settings = get_settings()
 
 
 class SelfLearner:
     """셀프러닝 엔진"""
 
-    def __init__(self, db: AsyncSession):
+    def __init__(
+        self,
+        db: AsyncSession,
+        session_factory: Callable[[], Any] = async_session_maker,
+        workers: Optional[int] = None,
+    ):
         self.db = db
+        # 쿼리별 생성 작업은 워커마다 별도 세션 사용 (self.db는 태스크 간 공유 불가)
+        self.session_factory = session_factory
+        self.workers = workers
 
     async def run_learning_cycle(self) -> Dict[str, Any]:
         """
@@ -64,41 +90,39 @@ class SelfLearner:
 
         - 자주 묻는 질문을 미리 처리해서 캐시에 저장
         - 사용자 응답 속도 향상
+        - 쿼리들은 워커 풀에서 동시에 처리
         """
         popular = await get_popular_queries(self.db, days, limit)
 
-        warmed = 0
-        skipped = 0
-        errors = []
-
-        for item in popular:
-            query = item["query"]
-            count = item["count"]
-
-            # 최소 조회수 미만이면 스킵
-            if count < min_count:
-                continue
+        # 최소 조회수 미만이면 스킵
+        queries = [item["query"] for item in popular if item["count"] >= min_count]
 
+        async def warm(db: AsyncSession, query: str) -> str:
             # 이미 캐시에 있으면 스킵
-            cached = await get_cached_response(self.db, query)
+            cached = await get_cached_response(db, query)
             if cached:
-                skipped += 1
-                continue
-
-            try:
-                # 새로 응답 생성
-                await self._generate_and_cache_response(query)
-                warmed += 1
-                print(f"[PreWarm] Cached: {query[:50]}...")
-            except Exception as e:
-                errors.append({"query": query[:50], "error": str(e)})
-                print(f"[PreWarm] Error: {query[:50]}... - {e}")
+                return "skipped"
+
+            # 새로 응답 생성
+            await self._generate_and_cache_response(db, query)
+            print(f"[PreWarm] Cached: {query[:50]}...")
+            return "warmed"
+
+        result = await run_worker_pool(
+            queries,
+            warm,
+            name="PreWarm",
+            workers=self.workers,
+            session_factory=self.session_factory,
+        )
 
         return {
             "total_popular": len(popular),
-            "warmed": warmed,
-            "skipped": skipped,
-            "errors": len(errors),
+            "warmed": result["outcomes"].get("warmed", 0),
+            "skipped": result["outcomes"].get("skipped", 0),
+            "errors": result["failed"] + result["timed_out"],
+            "timed_out": result["timed_out"],
+            "execution": result["execution"],
         }
 
     async def improve_negative_responses(
@@ -111,34 +135,40 @@ class SelfLearner:
 
         - 부정 피드백이 많은 쿼리를 재처리
         - 개선된 응답으로 캐시 업데이트
+        - 쿼리들은 워커 풀에서 동시에 처리
         """
         negative_queries = await get_negative_feedback_queries(
             self.db, days, min_negative
         )
 
-        improved = 0
-        errors = []
-
-        for item in negative_queries:
+        async def improve(db: AsyncSession, item: Dict[str, Any]) -> str:
             query = item["query"]
-            negative_count = item["negative_count"]
-
-            try:
-                # 기존 캐시 삭제
-                await self._invalidate_cache(query)
 
-                # 개선된 프롬프트로 재생성
-                await self._generate_improved_response(query, negative_count)
-                improved += 1
-                print(f"[Improve] Regenerated: {query[:50]}...")
-            except Exception as e:
-                errors.append({"query": query[:50], "error": str(e)})
-                print(f"[Improve] Error: {query[:50]}... - {e}")
+            # 기존 캐시 삭제
+            await self._invalidate_cache(db, query)
+
+            # 개선된 프롬프트로 재생성
+            await self._generate_improved_response(db, query, item["negative_count"])
+            print(f"[Improve] Regenerated: {query[:50]}...")
+            return "improved"
+
+        result = await run_worker_pool(
+            negative_queries,
+            improve,
+            name="Improve",
+            workers=self.workers,
+            session_factory=self.session_factory,
+            # 개선 응답은 검색 문서/논문이 더 많아 프롬프트가 큼
+            tokens_per_item=settings.learning_item_token_estimate * 2,
+            describe=lambda item: item["query"],
+        )
 
         return {
             "total_negative": len(negative_queries),
-            "improved": improved,
-            "errors": len(errors),
+            "improved": result["outcomes"].get("improved", 0),
+            "errors": result["failed"] + result["timed_out"],
+            "timed_out": result["timed_out"],
+            "execution": result["execution"],
         }
 
     async def cleanup_stale_cache(
@@ -154,24 +184,14 @@ class SelfLearner:
         """
         cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
 
-        # 오래된 캐시 조회
-        result = await self.db.execute(
-            select(QueryCache).where(
-                and_(
-                    QueryCache.created_at < cutoff,
-                    QueryCache.hit_count <= min_hit_count,
-                )
-            )
+        # ORM 객체를 로드하지 않고 배치 DELETE (L1 무효화 포함)
+        deleted = await purge_cache(
+            self.db,
+            and_(QueryCache.created_at < cutoff, QueryCache.hit_count <= min_hit_count),
+            settings.cache_sweep_batch_size,
         )
-        stale_caches = result.scalars().all()
-
-        deleted = 0
-        for cache in stale_caches:
-            await self.db.delete(cache)
-            deleted += 1
 
         if deleted > 0:
-            await self.db.commit()
             print(f"[Cleanup] Deleted {deleted} stale cache entries")
 
         return {
@@ -189,41 +209,49 @@ class SelfLearner:
 
         - 좋은 응답은 더 오래 캐시
         """
-        # 긍정 피드백이 많은 쿼리 조회
         since = datetime.now(timezone.utc) - timedelta(days=30)
+        new_expires_at = datetime.now(timezone.utc) + timedelta(days=extension_days)
+
+        # 긍정 피드백이 많은 쿼리의 fingerprint (= query_cache.query_hash)
+        if await rollup_covers(self.db, since):
+            hourly = QueryAnalyticsHourly
+            positive = func.sum(hourly.positive)
+            high_quality = (
+                select(hourly.fingerprint.label("fingerprint"))
+                .where(hourly.bucket_start >= bucket_start(since))
+                .group_by(hourly.fingerprint)
+                .having(positive >= positive_threshold)
+            )
+        else:
+            high_quality = (
+                select(query_fingerprint_expr.label("fingerprint"))
+                .where(
+                    and_(
+                        QueryAnalytics.created_at >= since,
+                        QueryAnalytics.feedback == 1,
+                    )
+                )
+                .group_by(query_fingerprint_expr)
+                .having(func.count(QueryAnalytics.id) >= positive_threshold)
+            )
+        high_quality = high_quality.subquery()
 
+        # 해당 캐시의 expires_at 연장 (한 번의 UPDATE ... FROM, 이미 더 긴 항목은 건드리지 않음)
         result = await self.db.execute(
-            select(
-                QueryAnalytics.query_text,
-                func.count(QueryAnalytics.id).label("positive_count"),
-            )
+            update(QueryCache)
             .where(
                 and_(
-                    QueryAnalytics.created_at >= since,
-                    QueryAnalytics.feedback == 1,
+                    QueryCache.query_hash == high_quality.c.fingerprint,
+                    QueryCache.expires_at < new_expires_at,
                 )
             )
-            .group_by(QueryAnalytics.query_text)
-            .having(func.count(QueryAnalytics.id) >= positive_threshold)
+            .values(expires_at=new_expires_at)
+            .execution_options(synchronize_session=False)
         )
-
-        extended = 0
-        for row in result:
-            query_text = row[0]
-            query_hash = generate_query_hash(query_text)
-
-            # 해당 캐시의 expires_at 연장
-            cache_result = await self.db.execute(
-                select(QueryCache).where(QueryCache.query_hash == query_hash)
-            )
-            cache = cache_result.scalar_one_or_none()
-
-            if cache:
-                cache.expires_at = datetime.now(timezone.utc) + timedelta(days=extension_days)
-                extended += 1
+        extended = result.rowcount
+        await self.db.commit()
 
         if extended > 0:
-            await self.db.commit()
             print(f"[Extend] Extended TTL for {extended} high-quality caches")
 
         return {
@@ -231,7 +259,7 @@ class SelfLearner:
             "extension_days": extension_days,
         }
 
-    async def _generate_and_cache_response(self, query: str) -> None:
+    async def _generate_and_cache_response(self, db: AsyncSession, query: str) -> None:
         """쿼리에 대한 응답을 생성하고 캐시에 저장"""
         # 쿼리 분류
         router_result = await classify_query(query)
@@ -275,10 +303,10 @@ class SelfLearner:
             response_text = "관련 정보를 찾을 수 없습니다."
 
         # 캐시 저장
-        await save_to_cache(self.db, query, response_text, sources)
-        await self.db.commit()
+        await save_to_cache(db, query, response_text, sources)
+        await db.commit()
 
-    async def _generate_improved_response(self, query: str, negative_count: int) -> None:
+    async def _generate_improved_response(self, db: AsyncSession, query: str, negative_count: int) -> None:
         """개선된 응답 생성 (더 상세하고 정확한 답변)"""
         # 쿼리 분류
         router_result = await classify_query(query)
@@ -331,12 +359,12 @@ class SelfLearner:
             response_text = "죄송합니다. 더 나은 답변을 위해 관련 정보를 수집 중입니다."
 
         # 개선된 응답 캐시
-        await save_to_cache(self.db, query, response_text, sources)
-        await self.db.commit()
+        await save_to_cache(db, query, response_text, sources)
+        await db.commit()
 
-    async def _invalidate_cache(self, query: str) -> bool:
+    async def _invalidate_cache(self, db: AsyncSession, query: str) -> bool:
         """특정 쿼리의 캐시 무효화"""
-        return await invalidate_cache(self.db, query)
+        return await invalidate_cache(db, query)
 
 
 async def run_self_learning(db: AsyncSession) -> Dict[str, Any]:
@@ -0,0 +1,216 @@
+"""
+Self-Learning 작업 풀
+
+pre-warming / 응답 개선 루프의 쿼리들을 동시에 처리하기 위한 실행 엔진입니다.
+
+- 워커 수 제한 (learning_workers), 워커마다 별도 DB 세션
+- OpenAI RPM/TPM 예산을 모든 워커(및 동시에 실행되는 사이클)가 공유
+- 항목별 타임아웃, 실패/타임아웃 시 해당 워커 세션 rollback
+- 처리량과 항목별 지연 시간(p50/p95/max) 보고
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.db.neon import async_session_maker
+
+settings = get_settings()
+
+# 예산 계산 구간 (OpenAI 한도는 분 단위)
+BUDGET_WINDOW_SECONDS = 60.0
+
+# 결과에 포함할 최대 에러 수
+MAX_REPORTED_ERRORS = 20
+
+
+class RateBudget:
+    """
+    분당 요청 수(RPM) / 토큰 수(TPM) 공유 예산 (sliding window, 단일 이벤트 루프 전용)
+
+    호출 측은 작업 전에 예상 비용을 acquire 합니다. 예산이 부족하면
+    가장 오래된 사용 기록이 구간 밖으로 나갈 때까지 대기합니다 (FIFO).
+    """
+
+    def __init__(self, rpm: int, tpm: int, window_seconds: float = BUDGET_WINDOW_SECONDS):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.window_seconds = window_seconds
+
+        self._usage: Deque[Tuple[float, int, int]] = deque()  # (시각, 요청 수, 토큰 수)
+        self._requests = 0
+        self._tokens = 0
+        self._lock = asyncio.Lock()
+
+        self.acquired = 0
+        self.waits = 0
+        self.wait_ms_total = 0.0
+
+    def _prune(self, now: float) -> None:
+        while self._usage and now - self._usage[0][0] >= self.window_seconds:
+            _, requests, tokens = self._usage.popleft()
+            self._requests -= requests
+            self._tokens -= tokens
+
+    def _fits(self, requests: int, tokens: int) -> bool:
+        if not self._usage:
+            # 한 번에 예산보다 큰 요청도 빈 구간에서는 허용 (무한 대기 방지)
+            return True
+        return self._requests + requests <= self.rpm and self._tokens + tokens <= self.tpm
+
+    async def acquire(self, requests: int = 1, tokens: int = 0) -> None:
+        async with self._lock:
+            started = time.monotonic()
+            waited = False
+            while True:
+                now = time.monotonic()
+                self._prune(now)
+                if self._fits(requests, tokens):
+                    break
+                waited = True
+                await asyncio.sleep(max(0.01, self._usage[0][0] + self.window_seconds - now))
+
+            self._usage.append((time.monotonic(), requests, tokens))
+            self._requests += requests
+            self._tokens += tokens
+            self.acquired += 1
+            if waited:
+                self.waits += 1
+                self.wait_ms_total += (time.monotonic() - started) * 1000
+
+    def stats(self) -> Dict[str, Any]:
+        self._prune(time.monotonic())
+        return {
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "window_requests": self._requests,
+            "window_tokens": self._tokens,
+            "acquired": self.acquired,
+            "waits": self.waits,
+            "wait_ms_total": round(self.wait_ms_total, 1),
+        }
+
+
+# 싱글톤 인스턴스
+_openai_budget: Optional[RateBudget] = None
+
+
+def get_openai_budget() -> RateBudget:
+    global _openai_budget
+    if _openai_budget is None:
+        _openai_budget = RateBudget(
+            rpm=settings.learning_openai_rpm_budget,
+            tpm=settings.learning_openai_tpm_budget,
+        )
+    return _openai_budget
+
+
+# handler(session, item) → 결과 라벨 (예: "warmed", "skipped")
+ItemHandler = Callable[[AsyncSession, Any], Awaitable[str]]
+
+
+async def run_worker_pool(
+    items: Sequence[Any],
+    handler: ItemHandler,
+    name: str,
+    workers: Optional[int] = None,
+    item_timeout_seconds: Optional[float] = None,
+    requests_per_item: Optional[int] = None,
+    tokens_per_item: Optional[int] = None,
+    budget: Optional[RateBudget] = None,
+    session_factory: Callable[[], Any] = async_session_maker,
+    describe: Callable[[Any], str] = str,
+) -> Dict[str, Any]:
+    """
+    items를 제한된 수의 워커로 동시에 처리
+
+    handler는 워커 전용 세션을 받아 커밋까지 수행하고 결과 라벨을 반환합니다.
+
+    Returns:
+        {"outcomes": {라벨: 개수}, "failed", "timed_out", "errors", "execution": {...}}
+    """
+    workers = max(1, min(workers or settings.learning_workers, len(items) or 1))
+    item_timeout_seconds = item_timeout_seconds or settings.learning_item_timeout_seconds
+    requests_per_item = requests_per_item if requests_per_item is not None else settings.learning_item_request_estimate
+    tokens_per_item = tokens_per_item if tokens_per_item is not None else settings.learning_item_token_estimate
+    budget = budget or get_openai_budget()
+
+    queue: "asyncio.Queue[Any]" = asyncio.Queue()
+    for item in items:
+        queue.put_nowait(item)
+
+    outcomes: Dict[str, int] = {}
+    latencies_ms: List[float] = []
+    errors: List[Dict[str, str]] = []
+    failed = 0
+    timed_out = 0
+    budget_wait_ms = 0.0
+
+    async def worker() -> None:
+        nonlocal failed, timed_out, budget_wait_ms
+        async with session_factory() as session:
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+
+                wait_started = time.perf_counter()
+                await budget.acquire(requests_per_item, tokens_per_item)
+                budget_wait_ms += (time.perf_counter() - wait_started) * 1000
+
+                started = time.perf_counter()
+                try:
+                    label = await asyncio.wait_for(handler(session, item), timeout=item_timeout_seconds)
+                    outcomes[label] = outcomes.get(label, 0) + 1
+                except asyncio.TimeoutError:
+                    timed_out += 1
+                    await session.rollback()
+                    _record_error(errors, describe(item), "timeout")
+                    print(f"[{name}] Timeout: {describe(item)[:50]}...")
+                except Exception as e:
+                    failed += 1
+                    await session.rollback()
+                    _record_error(errors, describe(item), str(e))
+                    print(f"[{name}] Error: {describe(item)[:50]}... - {e}")
+                finally:
+                    latencies_ms.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "outcomes": outcomes,
+        "failed": failed,
+        "timed_out": timed_out,
+        "errors": errors,
+        "execution": {
+            "workers": workers,
+            "items": len(items),
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "items_per_second": round(len(items) / elapsed, 2) if elapsed > 0 else None,
+            "budget_wait_ms": round(budget_wait_ms, 1),
+            **_latency_summary(latencies_ms),
+        },
+    }
+
+
+def _record_error(errors: List[Dict[str, str]], item: str, error: str) -> None:
+    if len(errors) < MAX_REPORTED_ERRORS:
+        errors.append({"query": item[:50], "error": error})
+
+
+def _latency_summary(samples: List[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"latency_p50_ms": None, "latency_p95_ms": None, "latency_max_ms": None}
+    ordered = sorted(samples)
+    return {
+        "latency_p50_ms": round(ordered[len(ordered) // 2], 1),
+        "latency_p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+        "latency_max_ms": round(ordered[-1], 1),
+    }
@@ -1,13 +1,235 @@
-from openai import AsyncOpenAI
-from typing import List
+import asyncio
+from collections import OrderedDict
+from openai import AsyncOpenAI, BadRequestError
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
 from app.config import get_settings
 
 settings = get_settings()
 client = AsyncOpenAI(api_key=settings.openai_api_key)
 
 
-async def get_embedding(text: str) -> List[float]:
-    """텍스트의 임베딩 벡터 생성"""
+def _normalize_text(text: str) -> str:
+    """임베딩 캐시 키용 정규화 (공백 정리)"""
+    return " ".join(text.strip().split())
+
+
+class EmbeddingCache:
+    """
+    (model, 정규화 텍스트) 키의 임베딩 LRU 캐시
+
+    프로세스 전역으로 공유되며, 같은 키에 대한 동시 요청은
+    하나의 API 호출 결과를 함께 기다립니다 (in-flight 공유).
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.inflight_joins = 0
+        self.evictions = 0
+
+    def peek(self, key: Tuple[str, str]) -> Optional[List[float]]:
+        """통계/LRU 순서를 건드리지 않고 조회"""
+        return self._entries.get(key)
+
+    async def get_or_create(self, key: Tuple[str, str], create) -> List[float]:
+        embedding = self._entries.get(key)
+        if embedding is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+        while True:
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+
+            self.inflight_joins += 1
+            try:
+                # 대기자 자신이 취소되어도 공유 future는 취소되지 않도록 shield
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if pending.cancelled() and not asyncio.current_task().cancelling():
+                    continue  # leader가 취소됨 (SingleFlight.do와 같은 방식) → 재시도하여 새 leader가 됨
+                raise
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            embedding = await create()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # 대기자가 없어도 경고가 나지 않도록
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+        future.set_result(embedding)
+        self._put(key, embedding)
+        return embedding
+
+    def _put(self, key: Tuple[str, str], embedding: List[float]) -> None:
+        self._entries[key] = embedding
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses + self.inflight_joins
+        saved = self.hits + self.inflight_joins
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "inflight_joins": self.inflight_joins,
+            "hit_rate": round(saved / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+embedding_cache = EmbeddingCache(max_entries=settings.embedding_cache_max_entries)
+
+
+def get_embedding_cache_stats() -> Dict[str, Any]:
+    """임베딩 캐시 / 배처 통계"""
+    return {**embedding_cache.stats(), "batcher": embedding_batcher.stats()}
+
+
+def peek_embedding(text: str) -> Optional[List[float]]:
+    """이미 계산된 임베딩이 있으면 반환 (API 호출 없음)"""
+    return embedding_cache.peek((settings.openai_embedding_model, _normalize_text(text)))
+
+
+class EmbeddingBatcher:
+    """
+    동시에 들어온 get_embedding 호출을 짧은 시간 창 동안 모아 한 번의 API 요청으로 처리
+
+    - window_seconds 동안 모이거나 max_items에 도달하면 전송
+    - 결과는 입력 순서대로 각 호출자에게 전달
+    - 배치가 400(BadRequest)으로 거부되면 개별 요청으로 재시도하여 오류를 호출자별로 전달,
+      그 밖의 오류(429, 타임아웃 등)는 배치의 모든 호출자에게 그대로 전달
+    """
+
+    def __init__(self, window_seconds: float, max_items: int):
+        self.window_seconds = window_seconds
+        self.max_items = max_items
+
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+        self.requests = 0
+        self.batches = 0
+        self.items = 0
+        self.max_batch_size = 0
+        self.batch_failures = 0
+
+    async def embed(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        # 대기 중 취소된 호출자는 제외
+        batch = [(text, future) for text, future in batch if not future.done()]
+        if not batch:
+            return
+
+        task = asyncio.create_task(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        self.requests += 1
+        self.batches += 1
+        self.items += len(batch)
+        self.max_batch_size = max(self.max_batch_size, len(batch))
+
+        try:
+            response = await client.embeddings.create(
+                model=settings.openai_embedding_model,
+                input=[text for text, _ in batch],
+            )
+            embeddings = [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+        except Exception as e:
+            self.batch_failures += 1
+            if len(batch) > 1 and isinstance(e, BadRequestError):
+                # 특정 입력(토큰 한도 초과 등) 때문에 배치 전체가 거부됐을 수 있으므로 개별 요청으로 재시도
+                await asyncio.gather(*(self._send_single(text, future) for text, future in batch))
+                return
+            # 429 / 타임아웃 등은 개별 재시도가 요청 수만 늘리므로 모든 호출자에게 그대로 전달
+            for _, future in batch:
+                _set_future_exception(future, e)
+            return
+
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+    async def _send_single(self, text: str, future: asyncio.Future) -> None:
+        if future.done():
+            return
+        self.requests += 1
+        try:
+            response = await client.embeddings.create(
+                model=settings.openai_embedding_model,
+                input=text,
+            )
+        except Exception as e:
+            _set_future_exception(future, e)
+            return
+        if not future.done():
+            future.set_result(response.data[0].embedding)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_ms": round(self.window_seconds * 1000, 2),
+            "max_items": self.max_items,
+            "api_requests": self.requests,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "batch_failures": self.batch_failures,
+        }
+
+
+def _set_future_exception(future: asyncio.Future, error: Exception) -> None:
+    if not future.done():
+        future.set_exception(error)
+
+
+embedding_batcher = EmbeddingBatcher(
+    window_seconds=settings.embedding_batch_window_ms / 1000,
+    max_items=settings.embedding_batch_max_items,
+)
+
+
+async def _create_embedding(text: str) -> List[float]:
+    if settings.embedding_batch_enabled:
+        return await embedding_batcher.embed(text)
+
     response = await client.embeddings.create(
         model=settings.openai_embedding_model,
         input=text,
@@ -15,6 +237,22 @@ async def get_embedding(text: str) -> List[float]:
     return response.data[0].embedding
 
 
+async def get_embedding(text: str) -> List[float]:
+    """
+    텍스트의 임베딩 벡터 생성
+
+    같은 쿼리는 한 요청 안에서(캐시 조회, 검색, 캐시 저장) 그리고
+    요청 간에도 한 번만 임베딩합니다.
+    """
+    normalized = _normalize_text(text)
+
+    if not settings.embedding_cache_enabled:
+        return await _create_embedding(normalized)
+
+    key = (settings.openai_embedding_model, normalized)
+    return await embedding_cache.get_or_create(key, lambda: _create_embedding(normalized))
+
+
 async def get_embeddings(texts: List[str]) -> List[List[float]]:
     """여러 텍스트의 임베딩 벡터 배치 생성"""
     response = await client.embeddings.create(
@@ -24,14 +262,7 @@ async def get_embeddings(texts: List[str]) -> List[List[float]]:
     return [item.embedding for item in response.data]
 
 
-async def generate_response(
-    query: str,
-    context: str,
-    system_prompt: str = None,
-) -> str:
-    """RAG 응답 생성"""
-    if not system_prompt:
-        system_prompt = """당신은 AI 분야 전문가입니다. 제공된 컨텍스트를 기반으로 사용자의 질문에 정확하고 도움이 되는 답변을 제공하세요.
+DEFAULT_SYSTEM_PROMPT = """당신은 AI 분야 전문가입니다. 제공된 컨텍스트를 기반으로 사용자의 질문에 정확하고 도움이 되는 답변을 제공하세요.
 
 규칙:
 1. 컨텍스트에 있는 정보만 사용하세요.
@@ -40,8 +271,11 @@ async def generate_response(
 4. 기술적 용어는 영어로 유지하되 설명을 추가하세요.
 5. 가능하면 논문이나 출처를 언급하세요."""
 
-    messages = [
-        {"role": "system", "content": system_prompt},
+
+def _build_messages(query: str, context: str, system_prompt: str = None) -> List[Dict[str, str]]:
+    """RAG 응답 생성용 메시지 구성"""
+    return [
+        {"role": "system", "content": system_prompt or DEFAULT_SYSTEM_PROMPT},
         {
             "role": "user",
             "content": f"""컨텍스트:
@@ -53,11 +287,40 @@ async def generate_response(
         },
     ]
 
+
+async def generate_response(
+    query: str,
+    context: str,
+    system_prompt: str = None,
+) -> str:
+    """RAG 응답 생성"""
     response = await client.chat.completions.create(
         model=settings.openai_chat_model,
-        messages=messages,
+        messages=_build_messages(query, context, system_prompt),
         temperature=0.7,
         max_tokens=1024,
     )
 
     return response.choices[0].message.content
+
+
+async def generate_response_stream(
+    query: str,
+    context: str,
+    system_prompt: str = None,
+) -> AsyncIterator[str]:
+    """RAG 응답 스트리밍 생성 (토큰 조각 단위로 yield)"""
+    stream = await client.chat.completions.create(
+        model=settings.openai_chat_model,
+        messages=_build_messages(query, context, system_prompt),
+        temperature=0.7,
+        max_tokens=1024,
+        stream=True,
+    )
+
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
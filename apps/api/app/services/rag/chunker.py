@@ -0,0 +1,137 @@
+"""
+RAG 문서 청킹 (tiktoken 토큰 기준)
+
+문서 전체를 하나의 임베딩으로 저장하면 임베딩 모델 입력 한도에서 잘리고,
+format_context가 문서 전체를 프롬프트에 넣어 토큰/생성 지연이 늘어납니다.
+문서를 rag_chunk_tokens 크기(rag_chunk_overlap_tokens만큼 겹침)로 나눠 청크 단위로 저장합니다.
+
+- 청크 id: "{parent_id}#c{index}" (같은 문서를 다시 수집해도 같은 id)
+- 메타데이터: 부모 메타데이터 + parent_id / chunk_index / chunk_count
+- 검색 후 collapse_chunks로 부모 문서 단위로 다시 묶음
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import tiktoken
+
+from app.config import get_settings
+
+settings = get_settings()
+
+CHUNK_ID_SEPARATOR = "#c"
+
+
+def chunk_id(parent_id: str, index: int) -> str:
+    return f"{parent_id}{CHUNK_ID_SEPARATOR}{index}"
+
+
+@lru_cache(maxsize=1)
+def get_encoding() -> tiktoken.Encoding:
+    """임베딩 모델의 토크나이저 (모델을 모르면 cl100k_base)"""
+    try:
+        return tiktoken.encoding_for_model(settings.openai_embedding_model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    return len(get_encoding().encode(text, disallowed_special=()))
+
+
+def split_text(text: str, chunk_tokens: int, overlap_tokens: int) -> List[str]:
+    """
+    토큰 윈도우로 분할 (step = chunk_tokens - overlap_tokens)
+
+    경계에서 잘린 멀티바이트 문자(한글 등)는 버리며, 겹치는 구간의 이웃 청크에 온전히 남습니다.
+    """
+    if chunk_tokens <= 0:
+        raise ValueError("chunk_tokens must be positive")
+    if not 0 <= overlap_tokens < chunk_tokens:
+        raise ValueError("overlap_tokens must be in [0, chunk_tokens)")
+
+    encoding = get_encoding()
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= chunk_tokens:
+        return [text] if text.strip() else []
+
+    chunks = []
+    step = chunk_tokens - overlap_tokens
+    for start in range(0, len(tokens), step):
+        window = tokens[start:start + chunk_tokens]
+        chunk = encoding.decode_bytes(window).decode("utf-8", errors="ignore").strip()
+        if chunk:
+            chunks.append(chunk)
+        if start + chunk_tokens >= len(tokens):
+            break
+    return chunks
+
+
+def chunk_document(
+    parent_id: str,
+    content: str,
+    metadata: Dict[str, Any],
+    chunk_tokens: Optional[int] = None,
+    overlap_tokens: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    문서 하나 → 청크 리스트
+
+    Returns:
+        [{"id", "content", "metadata"}] (metadata에 parent_id / chunk_index / chunk_count 포함)
+    """
+    pieces = split_text(
+        content,
+        chunk_tokens or settings.rag_chunk_tokens,
+        settings.rag_chunk_overlap_tokens if overlap_tokens is None else overlap_tokens,
+    )
+    return [
+        {
+            "id": chunk_id(parent_id, index),
+            "content": piece,
+            "metadata": {
+                **metadata,
+                "parent_id": parent_id,
+                "chunk_index": index,
+                "chunk_count": len(pieces),
+            },
+        }
+        for index, piece in enumerate(pieces)
+    ]
+
+
+def collapse_chunks(documents: List[Dict[str, Any]], max_chunks_per_parent: int) -> List[Dict[str, Any]]:
+    """
+    검색된 청크를 부모 문서 단위로 묶음
+
+    - 부모 점수는 가장 높은 청크 점수, 순서도 그 점수 기준 (입력은 score 내림차순)
+    - 부모마다 점수 상위 max_chunks_per_parent개 청크만 문서 내 순서대로 이어 붙임
+    - parent_id가 없는 문서(청킹 이전 데이터)는 그대로 유지
+    """
+    groups: Dict[str, Dict[str, Any]] = {}
+    for doc in documents:
+        metadata = doc.get("metadata") or {}
+        parent_id = metadata.get("parent_id") or doc["id"]
+        group = groups.get(parent_id)
+        if group is None:
+            group = groups[parent_id] = {"doc": doc, "chunks": []}
+        if len(group["chunks"]) < max_chunks_per_parent:
+            group["chunks"].append(doc)
+
+    collapsed = []
+    for parent_id, group in groups.items():
+        best = group["doc"]
+        chunks = sorted(group["chunks"], key=lambda d: (d.get("metadata") or {}).get("chunk_index", 0))
+        metadata = {
+            key: value
+            for key, value in (best.get("metadata") or {}).items()
+            if key not in ("chunk_index", "chunk_count")
+        }
+        collapsed.append({
+            **best,
+            "id": parent_id,
+            "content": "\n...\n".join(chunk["content"] for chunk in chunks),
+            "metadata": metadata,
+            "chunk_ids": [chunk["id"] for chunk in chunks],
+        })
+    return collapsed
@@ -1,61 +1,211 @@
-from typing import List, Dict, Any
-from app.db.chroma import get_collection
+import hashlib
+import json
+from typing import List, Dict, Any, Optional
+from app.config import get_settings
+from app.services.rag.chunker import chunk_document
+from app.services.rag.snapshot import delete_snapshot_rows, get_rag_index_loader, upsert_snapshot_rows
+from app.services.rag.vector_store import get_vector_store
 from app.services.llm.openai_client import get_embeddings
-import uuid
 
+settings = get_settings()
 
-async def add_documents(
+
+def _document_metadata(doc: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "title": doc.get("title", ""),
+        "url": doc.get("url", ""),
+        "type": doc.get("type", "unknown"),
+    }
+
+
+def content_hash(doc: Dict[str, Any]) -> str:
+    """
+    문서 내용 해시 (청크 메타데이터 content_hash로 저장)
+
+    메타데이터와 청킹/임베딩 설정도 포함하므로 설정이 바뀌면 다시 임베딩됩니다.
+    """
+    payload = json.dumps(
+        {
+            "content": doc["content"],
+            "metadata": _document_metadata(doc),
+            "chunking": [settings.rag_chunk_tokens, settings.rag_chunk_overlap_tokens],
+            "model": settings.openai_embedding_model,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+async def _write_chunks(store, chunks: List[Dict[str, Any]], embeddings: List[List[float]]) -> None:
+    if not chunks:
+        return
+    ids = [chunk["id"] for chunk in chunks]
+    contents = [chunk["content"] for chunk in chunks]
+    metadatas = [chunk["metadata"] for chunk in chunks]
+
+    # 벡터 저장소에 추가 (같은 id의 기존 청크는 _replace_documents에서 먼저 삭제)
+    await store.aadd(
+        ids=ids,
+        embeddings=embeddings,
+        documents=contents,
+        metadatas=metadatas,
+    )
+    if settings.rag_snapshot_mode == "postgres":
+        # 재시작 후 임베딩 재계산 없이 복원하도록 스냅샷에도 기록
+        await upsert_snapshot_rows(ids, embeddings, contents, metadatas)
+
+
+async def _delete_chunks(store, ids: List[str]) -> None:
+    if not ids:
+        return
+    await store.adelete(ids)
+    if settings.rag_snapshot_mode == "postgres":
+        await delete_snapshot_rows(ids)
+
+
+async def _replace_documents(
+    store,
+    parent_ids: List[str],
+    chunks: List[Dict[str, Any]],
+    batch_size: int,
+) -> int:
+    """
+    문서들의 청크를 새 버전으로 교체
+
+    1. 모든 청크를 먼저 임베딩 (실패하면 저장소는 그대로)
+    2. 첫 청크를 뺀 기존 청크 삭제 → chunk_index > 0 청크 쓰기 → content_hash를 가진 첫 청크 교체
+    첫 청크가 마지막이므로 도중에 실패하면 저장된 hash가 이전 값(또는 없음)으로 남아
+    다음 수집에서 그 문서를 다시 임베딩합니다.
+    """
+    embeddings: List[List[float]] = []
+    for i in range(0, len(chunks), batch_size):
+        embeddings.extend(await get_embeddings([chunk["content"] for chunk in chunks[i : i + batch_size]]))
+
+    heads = [i for i, chunk in enumerate(chunks) if chunk["metadata"]["chunk_index"] == 0]
+    rest = [i for i, chunk in enumerate(chunks) if chunk["metadata"]["chunk_index"] != 0]
+    head_ids = [chunks[i]["id"] for i in heads]
+
+    # 첫 청크를 뺀 기존 청크 + 청킹 이전에 문서 id 그대로 저장된 문서
+    stale = [doc_id for doc_id in await store.aget_metadatas({"parent_id": parent_ids}) if doc_id not in head_ids]
+    await _delete_chunks(store, stale + parent_ids)
+    for j in range(0, len(rest), batch_size):
+        rows = rest[j : j + batch_size]
+        await _write_chunks(store, [chunks[i] for i in rows], [embeddings[i] for i in rows])
+
+    await _delete_chunks(store, head_ids)
+    for j in range(0, len(heads), batch_size):
+        rows = heads[j : j + batch_size]
+        await _write_chunks(store, [chunks[i] for i in rows], [embeddings[i] for i in rows])
+    return len(chunks)
+
+
+async def ingest_documents(
     documents: List[Dict[str, Any]],
     batch_size: int = 100,
-) -> int:
+    prune: bool = False,
+    scope: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
     """
-    문서들을 ChromaDB에 추가
+    문서들을 content hash 기준으로 증분 수집 (upsert)
+
+    1. 저장된 첫 청크(chunk_index=0)의 content_hash를 한 번의 조회로 가져와 비교
+    2. 새 문서 / 바뀐 문서만 청킹 + 임베딩 (문서의 청크를 모두 임베딩한 뒤 교체, _replace_documents)
+    3. prune=True면 scope(메타데이터 필터, 예: {"type": "arxiv"}) 안에서
+       이번 입력에 없는 문서를 삭제 (scope가 없으면 저장소 전체가 대상)
 
     Args:
         documents: 문서 리스트, 각 문서는 다음을 포함:
             - content: 문서 내용 (필수)
+            - id: 문서 ID (청크 id "{id}#c{index}"의 부모, 없으면 content hash)
             - title: 제목
             - url: 출처 URL
             - type: 문서 유형 (arxiv, huggingface 등)
+        batch_size: 임베딩 요청 하나에 넣을 청크 수
 
     Returns:
-        추가된 문서 수
+        {"total", "added", "updated", "unchanged", "deleted", "chunks_embedded"}
     """
-    collection = get_collection()
-    added_count = 0
-
-    # 배치 처리
-    for i in range(0, len(documents), batch_size):
-        batch = documents[i : i + batch_size]
+    # 스냅샷 복원 중 수집하면 복원 배치가 새 청크를 덮어쓰거나 hash 비교가 빈 저장소 기준이 됨
+    await get_rag_index_loader().wait_ready()
+    store = get_vector_store()
+
+    # 같은 id가 여러 번 오면 마지막 문서 사용
+    incoming: Dict[str, Dict[str, Any]] = {}
+    for doc in documents:
+        doc_hash = content_hash(doc)
+        incoming[doc.get("id") or doc_hash] = {"doc": doc, "hash": doc_hash}
+
+    if prune:
+        stored = await store.aget_metadatas({"chunk_index": 0, **(scope or {})})
+    elif incoming:
+        stored = await store.aget_metadatas({"chunk_index": 0, "parent_id": list(incoming)})
+    else:
+        stored = {}
+    stored_hashes = {meta.get("parent_id"): meta.get("content_hash") for meta in stored.values()}
+
+    added = [parent_id for parent_id in incoming if parent_id not in stored_hashes]
+    updated = [
+        parent_id for parent_id, item in incoming.items()
+        if parent_id in stored_hashes and stored_hashes[parent_id] != item["hash"]
+    ]
+    removed = []
+    if prune:
+        if incoming:
+            removed = [parent_id for parent_id in stored_hashes if parent_id not in incoming]
+        else:
+            # 원본 수집 실패로 빈 입력이 오면 전체가 지워지지 않도록 건너뜀
+            print("[Embedder] Skipping prune for empty document list")
+
+    # 문서 단위로 묶어 batch_size 청크 정도씩 "임베딩 전부 → 쓰기" (중간 실패 시 문서가 섞이지 않음)
+    chunks_embedded = 0
+    group: List[Dict[str, Any]] = []
+    group_parents: List[str] = []
+    for parent_id in added + updated:
+        item = incoming[parent_id]
+        group.extend(chunk_document(
+            parent_id=parent_id,
+            content=item["doc"]["content"],
+            metadata={**_document_metadata(item["doc"]), "content_hash": item["hash"]},
+        ))
+        group_parents.append(parent_id)
+        if len(group) >= batch_size:
+            chunks_embedded += await _replace_documents(store, group_parents, group, batch_size)
+            group, group_parents = [], []
+    if group_parents:
+        chunks_embedded += await _replace_documents(store, group_parents, group, batch_size)
+
+    if removed:
+        await store.adelete_where({"parent_id": removed})
+        if settings.rag_snapshot_mode == "postgres":
+            await delete_snapshot_rows([], parent_ids=removed)
+
+    await store.aflush()
+
+    report = {
+        "total": len(incoming),
+        "added": len(added),
+        "updated": len(updated),
+        "unchanged": len(incoming) - len(added) - len(updated),
+        "deleted": len(removed),
+        "chunks_embedded": chunks_embedded,
+    }
+    print(f"[Embedder] Ingested {report}")
+    return report
 
-        ids = []
-        contents = []
-        metadatas = []
 
-        for doc in batch:
-            doc_id = doc.get("id") or str(uuid.uuid4())
-            ids.append(doc_id)
-            contents.append(doc["content"])
-            metadatas.append({
-                "title": doc.get("title", ""),
-                "url": doc.get("url", ""),
-                "type": doc.get("type", "unknown"),
-            })
-
-        # 임베딩 생성
-        embeddings = await get_embeddings(contents)
-
-        # ChromaDB에 추가
-        collection.add(
-            ids=ids,
-            embeddings=embeddings,
-            documents=contents,
-            metadatas=metadatas,
-        )
-
-        added_count += len(batch)
+async def add_documents(
+    documents: List[Dict[str, Any]],
+    batch_size: int = 100,
+) -> int:
+    """
+    문서들을 벡터 저장소(rag_backend)에 추가 (바뀌지 않은 문서는 다시 임베딩하지 않음)
 
-    return added_count
+    Returns:
+        새로 추가되거나 갱신된 문서 수
+    """
+    report = await ingest_documents(documents, batch_size)
+    return report["added"] + report["updated"]
 
 
 async def update_document(
@@ -63,30 +213,28 @@ async def update_document(
     content: str,
     metadata: Dict[str, Any] = None,
 ) -> bool:
-    """문서 업데이트"""
-    collection = get_collection()
-
-    # 임베딩 생성
-    embeddings = await get_embeddings([content])
-
-    collection.update(
-        ids=[doc_id],
-        embeddings=embeddings,
-        documents=[content],
-        metadatas=[metadata] if metadata else None,
-    )
+    """
+    문서 업데이트
 
+    청크 수가 달라질 수 있으므로 기존 청크를 모두 지우고 다시 청킹합니다.
+    metadata(title / url / type)는 새 값으로 교체됩니다.
+    """
+    await ingest_documents([{**(metadata or {}), "id": doc_id, "content": content}])
     return True
 
 
-def delete_document(doc_id: str) -> bool:
-    """문서 삭제"""
-    collection = get_collection()
-    collection.delete(ids=[doc_id])
+async def delete_document(doc_id: str) -> bool:
+    """문서 삭제 (모든 청크, 청킹 이전에 저장된 단일 문서 포함)"""
+    await get_rag_index_loader().wait_ready()
+    store = get_vector_store()
+    await store.adelete_where({"parent_id": doc_id})
+    await store.adelete([doc_id])
+    await store.aflush()
+    if settings.rag_snapshot_mode == "postgres":
+        await delete_snapshot_rows([doc_id], parent_ids=[doc_id])
     return True
 
 
-def get_document_count() -> int:
+async def get_document_count() -> int:
     """현재 저장된 문서 수"""
-    collection = get_collection()
-    return collection.count()
+    return await get_vector_store().acount()
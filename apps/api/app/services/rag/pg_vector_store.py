@@ -0,0 +1,214 @@
+"""
+pgvector RAG 저장소 (rag_backend=pgvector)
+
+문서 청크를 semantic cache와 같은 Neon DB의 rag_documents 테이블에 저장합니다.
+- 모든 레플리카가 하나의 인덱스를 공유 (프로세스별 메모리 사본, 재시작 후 재적재 없음)
+- HNSW(vector_cosine_ops) 인덱스는 migrations에서 hnsw_m / hnsw_ef_construction으로 생성
+- 메타데이터 필터는 WHERE로 pushdown: title / url / type은 컬럼, 나머지는 JSONB @>
+- 필터가 있으면 pgvector 0.8 iterative scan으로 HNSW 후보가 필터에 걸러져 부족해지는 것을 방지
+
+DB I/O라 async 메서드만 지원합니다.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.db.neon import async_session_maker
+from app.models.db_models import RagDocument
+from app.services.rag.vector_store import MetadataFilters, VectorStore
+
+ITERATIVE_SCAN_MODES = ("", "off", "strict_order", "relaxed_order")
+
+# 메타데이터 키 → 컬럼 (나머지 키는 metadata JSONB)
+COLUMN_FILTERS = {
+    "title": RagDocument.title,
+    "url": RagDocument.url,
+    "type": RagDocument.doc_type,
+}
+
+
+def _split_metadata(metadata: Optional[Dict[str, Any]]) -> Tuple[Optional[str], Optional[str], Optional[str], Dict[str, Any]]:
+    extra = dict(metadata or {})
+    return extra.pop("title", None), extra.pop("url", None), extra.pop("type", None), extra
+
+
+def _row_metadata(row) -> Dict[str, Any]:
+    metadata = dict(row.extra_metadata or {})
+    metadata.update({"title": row.title or "", "url": row.url or "", "type": row.doc_type or ""})
+    return metadata
+
+
+def filter_conditions(filters: MetadataFilters) -> list:
+    """메타데이터 필터 → WHERE 조건 (컬럼은 = / IN, JSONB는 @>로 GIN 인덱스 사용)"""
+    conditions = []
+    for key, value in (filters or {}).items():
+        values = list(value) if isinstance(value, (list, tuple, set)) else None
+        column = COLUMN_FILTERS.get(key)
+        if column is not None:
+            conditions.append(column.in_(values) if values is not None else column == value)
+        elif values is not None:
+            conditions.append(or_(*[RagDocument.extra_metadata.contains({key: v}) for v in values]))
+        else:
+            conditions.append(RagDocument.extra_metadata.contains({key: value}))
+    return conditions
+
+
+class PgVectorStore(VectorStore):
+    """rag_documents 테이블 기반 저장소 (HNSW 근사 검색)"""
+
+    name = "pgvector"
+    is_async = True
+
+    def __init__(self, ef_search: int, iterative_scan: str = "", session_factory=async_session_maker):
+        if iterative_scan not in ITERATIVE_SCAN_MODES:
+            raise ValueError(f"Unknown rag_pgvector_iterative_scan: {iterative_scan}")
+        self.ef_search = ef_search
+        self.iterative_scan = iterative_scan
+        self.session_factory = session_factory
+
+    def _sync_unsupported(self, *args, **kwargs):
+        raise RuntimeError("pgvector 저장소는 async 메서드(aadd, aquery 등)만 지원합니다")
+
+    add = update = delete = delete_where = get_metadatas = query = count = reset = iter_batches = _sync_unsupported
+
+    # ---------- async ----------
+
+    async def aadd(self, ids, embeddings, documents, metadatas) -> None:
+        """같은 id가 있으면 덮어씀 (재수집에 안전)"""
+        if not ids:
+            return
+        rows = []
+        for i, doc_id in enumerate(ids):
+            title, url, doc_type, extra = _split_metadata(metadatas[i])
+            rows.append({
+                "id": doc_id,
+                "content": documents[i],
+                "title": title,
+                "url": url,
+                "doc_type": doc_type,
+                "metadata": extra,
+                "embedding": np.asarray(embeddings[i], dtype=np.float32),
+            })
+
+        stmt = pg_insert(RagDocument.__table__)
+        async with self.session_factory() as session:
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=["id"],
+                    set_={
+                        "content": stmt.excluded["content"],
+                        "title": stmt.excluded["title"],
+                        "url": stmt.excluded["url"],
+                        "doc_type": stmt.excluded["doc_type"],
+                        "metadata": stmt.excluded["metadata"],
+                        "embedding": stmt.excluded["embedding"],
+                        "updated_at": func.now(),
+                    },
+                ),
+                rows,
+            )
+            await session.commit()
+
+    async def aupdate(self, ids, embeddings, documents, metadatas=None) -> None:
+        """기존 문서만 갱신 (없는 id는 무시, metadatas가 없으면 메타데이터 유지)"""
+        if not ids:
+            return
+        rows = []
+        for i, doc_id in enumerate(ids):
+            row = {
+                "id": doc_id,
+                "content": documents[i],
+                "embedding": np.asarray(embeddings[i], dtype=np.float32),
+            }
+            if metadatas:
+                title, url, doc_type, extra = _split_metadata(metadatas[i])
+                row.update({"title": title, "url": url, "doc_type": doc_type, "extra_metadata": extra})
+            rows.append(row)
+
+        async with self.session_factory() as session:
+            # ORM bulk UPDATE by primary key (executemany)
+            existing = set((await session.execute(
+                select(RagDocument.id).where(RagDocument.id.in_(list(ids)))
+            )).scalars())
+            rows = [row for row in rows if row["id"] in existing]
+            if rows:
+                await session.execute(update(RagDocument), rows)
+            await session.commit()
+
+    async def adelete(self, ids) -> None:
+        async with self.session_factory() as session:
+            await session.execute(delete(RagDocument).where(RagDocument.id.in_(list(ids))))
+            await session.commit()
+
+    async def adelete_where(self, filters) -> None:
+        if not filters:
+            raise ValueError("filters required")
+        async with self.session_factory() as session:
+            await session.execute(delete(RagDocument).where(*filter_conditions(filters)))
+            await session.commit()
+
+    async def aget_metadatas(self, filters) -> Dict[str, Dict[str, Any]]:
+        stmt = select(
+            RagDocument.id,
+            RagDocument.title,
+            RagDocument.url,
+            RagDocument.doc_type,
+            RagDocument.extra_metadata,
+        ).where(*filter_conditions(filters))
+        async with self.session_factory() as session:
+            rows = (await session.execute(stmt)).all()
+        return {row.id: _row_metadata(row) for row in rows}
+
+    async def aquery(self, embedding, top_k: int, filters: MetadataFilters = None) -> List[Dict[str, Any]]:
+        if top_k <= 0:
+            return []
+        distance = RagDocument.embedding.cosine_distance(np.asarray(embedding, dtype=np.float32))
+        stmt = (
+            select(
+                RagDocument.id,
+                RagDocument.content,
+                RagDocument.title,
+                RagDocument.url,
+                RagDocument.doc_type,
+                RagDocument.extra_metadata,
+                distance.label("distance"),
+            )
+            .where(*filter_conditions(filters))
+            .order_by(distance)
+            .limit(top_k)
+        )
+
+        async with self.session_factory() as session:
+            # 현재 트랜잭션에만 적용되는 탐색 파라미터 (SET LOCAL)
+            await session.execute(text(f"SET LOCAL hnsw.ef_search = {int(self.ef_search)}"))
+            if filters and self.iterative_scan:
+                await session.execute(text(f"SET LOCAL hnsw.iterative_scan = {self.iterative_scan}"))
+            rows = (await session.execute(stmt)).all()
+
+        documents = [
+            {
+                "id": row.id,
+                "content": row.content,
+                "metadata": _row_metadata(row),
+                "score": 1 - float(row.distance),
+            }
+            for row in rows
+        ]
+        # relaxed_order는 순서가 약간 어긋날 수 있으므로 다시 정렬
+        documents.sort(key=lambda doc: doc["score"], reverse=True)
+        return documents
+
+    async def acount(self) -> int:
+        async with self.session_factory() as session:
+            return (await session.execute(select(func.count()).select_from(RagDocument))).scalar_one()
+
+    async def areset(self) -> None:
+        async with self.session_factory() as session:
+            await session.execute(text("TRUNCATE rag_documents"))
+            await session.commit()
+
+    async def aflush(self) -> None:
+        """쓰기마다 commit하므로 no-op"""
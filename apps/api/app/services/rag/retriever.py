@@ -1,16 +1,29 @@
-from typing import List, Dict, Any
-from app.db.chroma import get_collection
+from typing import List, Dict, Any, Optional
+from app.config import get_settings
+from app.services.rag.chunker import collapse_chunks
+from app.services.rag.vector_store import get_vector_store
 from app.services.llm.openai_client import get_embedding
 
+settings = get_settings()
+
+# 부모 문서로 묶을 때 top_k개 부모를 채우기 위해 더 가져오는 청크 배수
+CHUNK_OVERFETCH = 3
+
 
 async def retrieve_documents(
     query: str,
     top_k: int = 5,
     min_score: float = 0.3,
+    filters: Optional[Dict[str, Any]] = None,
+    collapse: Optional[bool] = None,
 ) -> List[Dict[str, Any]]:
     """
     쿼리와 유사한 문서 검색
 
+    filters: 메타데이터 동등 조건 (예: {"type": "arxiv"}, 리스트면 IN)
+    collapse: 청크를 부모 문서 단위로 묶기 (기본값 rag_collapse_chunks)
+        묶으면 top_k는 부모 문서 수이고, content는 관련 청크만 이어 붙인 내용입니다.
+
     Returns:
         List of documents with:
         - id: 문서 ID
@@ -21,30 +34,22 @@ async def retrieve_documents(
     # 쿼리 임베딩 생성
     query_embedding = await get_embedding(query)
 
-    # ChromaDB에서 검색
-    collection = get_collection()
-    results = collection.query(
-        query_embeddings=[query_embedding],
-        n_results=top_k,
-        include=["documents", "metadatas", "distances"],
-    )
+    if collapse is None:
+        collapse = settings.rag_collapse_chunks
+    fetch_k = top_k * CHUNK_OVERFETCH if collapse else top_k
+
+    # 벡터 저장소에서 검색 (rag_backend: chroma | numpy | pgvector)
+    results = await get_vector_store().aquery(query_embedding, fetch_k, filters)
 
     # 결과 포맷팅
     documents = []
-    if results["ids"] and results["ids"][0]:
-        for i, doc_id in enumerate(results["ids"][0]):
-            # ChromaDB distance를 유사도 점수로 변환 (cosine distance)
-            # distance가 낮을수록 유사 → 1 - distance로 변환
-            distance = results["distances"][0][i] if results["distances"] else 0
-            score = 1 - distance
-
-            if score >= min_score:
-                documents.append({
-                    "id": doc_id,
-                    "content": results["documents"][0][i] if results["documents"] else "",
-                    "metadata": results["metadatas"][0][i] if results["metadatas"] else {},
-                    "score": round(score, 4),
-                })
+    for result in results:
+        score = result["score"]
+        if score >= min_score:
+            documents.append({**result, "score": round(score, 4)})
+
+    if collapse:
+        documents = collapse_chunks(documents, settings.rag_max_chunks_per_parent)[:top_k]
 
     return documents
 
@@ -0,0 +1,285 @@
+"""
+RAG 인덱스 스냅샷
+
+운영 환경의 Chroma는 in-memory(ephemeral)라 배포/재시작마다 문서가 0개가 됩니다.
+임베딩을 다시 계산(OpenAI 호출)하지 않도록 ids / documents / metadata / 원본 임베딩을
+스냅샷으로 보관했다가 시작 시 큰 배치로 벡터 저장소에 적재합니다.
+
+- rag_snapshot_mode=postgres: rag_snapshot_chunks 테이블 (add_documents 시 write-through)
+- rag_snapshot_mode=file: rag_snapshot_path의 .npz (float32 행렬 + JSON 메타데이터)
+- RagIndexLoader: 시작 시 백그라운드 적재, /health/ready에서 준비 상태 보고
+"""
+
+import asyncio
+import io
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.config import get_settings
+from app.db.neon import async_session_maker
+from app.models.db_models import RagSnapshotChunk
+from app.services.rag.chunker import CHUNK_ID_SEPARATOR
+from app.services.rag.vector_store import VectorStore, get_vector_store
+
+settings = get_settings()
+
+SNAPSHOT_MODES = ("off", "postgres", "file")
+
+
+# ---------- Postgres 스냅샷 ----------
+
+async def upsert_snapshot_rows(
+    ids: Sequence[str],
+    embeddings: Sequence[Sequence[float]],
+    documents: Sequence[str],
+    metadatas: Sequence[Dict[str, Any]],
+) -> int:
+    """스냅샷 테이블에 청크 upsert (임베딩은 이미 계산된 값)"""
+    if not ids:
+        return 0
+    rows = [
+        {
+            "id": doc_id,
+            "document": documents[i],
+            "metadata": json.dumps(metadatas[i] or {}, ensure_ascii=False),
+            "embedding": np.asarray(embeddings[i], dtype=np.float32),
+        }
+        for i, doc_id in enumerate(ids)
+    ]
+    stmt = pg_insert(RagSnapshotChunk.__table__)
+    async with async_session_maker() as session:
+        await session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["id"],
+                set_={
+                    "document": stmt.excluded["document"],
+                    "metadata": stmt.excluded["metadata"],
+                    "embedding": stmt.excluded["embedding"],
+                    "updated_at": func.now(),
+                },
+            ),
+            rows,
+        )
+        await session.commit()
+    return len(rows)
+
+
+async def delete_snapshot_rows(ids: Sequence[str], parent_ids: Sequence[str] = ()) -> None:
+    """id로, 또는 부모 문서의 모든 청크("{parent_id}#c*")를 삭제"""
+    conditions = [RagSnapshotChunk.id.in_(list(ids))]
+    conditions += [
+        RagSnapshotChunk.id.startswith(f"{parent_id}{CHUNK_ID_SEPARATOR}", autoescape=True)
+        for parent_id in parent_ids
+    ]
+    async with async_session_maker() as session:
+        await session.execute(delete(RagSnapshotChunk).where(or_(*conditions)))
+        await session.commit()
+
+
+async def export_to_postgres(store: VectorStore, batch_size: int) -> int:
+    """현재 벡터 저장소 전체를 스냅샷 테이블로 교체"""
+    async with async_session_maker() as session:
+        await session.execute(delete(RagSnapshotChunk))
+        await session.commit()
+
+    exported = 0
+    for ids, embeddings, documents, metadatas in store.iter_batches(batch_size):
+        exported += await upsert_snapshot_rows(ids, embeddings, documents, metadatas)
+    return exported
+
+
+async def load_from_postgres(store: VectorStore, batch_size: int, progress=None) -> int:
+    """스냅샷 테이블을 id 순서로 스트리밍하며 batch_size씩 적재"""
+    loaded = 0
+    async with async_session_maker() as session:
+        result = await session.stream(
+            select(
+                RagSnapshotChunk.id,
+                RagSnapshotChunk.embedding,
+                RagSnapshotChunk.document,
+                RagSnapshotChunk.doc_metadata,
+            )
+            .order_by(RagSnapshotChunk.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions(batch_size):
+            ids = [row.id for row in partition]
+            embeddings = np.asarray([row.embedding for row in partition], dtype=np.float32)
+            documents = [row.document for row in partition]
+            metadatas = [json.loads(row.doc_metadata) if row.doc_metadata else {} for row in partition]
+            await store.aadd(ids, embeddings, documents, metadatas)
+            loaded += len(ids)
+            if progress:
+                progress(loaded)
+    return loaded
+
+
+async def count_postgres_snapshot() -> int:
+    async with async_session_maker() as session:
+        return (await session.execute(select(func.count()).select_from(RagSnapshotChunk))).scalar_one()
+
+
+# ---------- 파일 스냅샷 ----------
+
+def export_to_file(store: VectorStore, path: str, batch_size: int) -> int:
+    """벡터 저장소 전체를 .npz 한 파일로 저장 (임시 파일 후 rename)"""
+    ids: List[str] = []
+    documents: List[str] = []
+    metadatas: List[Dict[str, Any]] = []
+    matrices: List[np.ndarray] = []
+    for batch_ids, embeddings, batch_documents, batch_metadatas in store.iter_batches(batch_size):
+        ids.extend(batch_ids)
+        documents.extend(batch_documents)
+        metadatas.extend(batch_metadatas)
+        matrices.append(embeddings)
+
+    matrix = np.concatenate(matrices) if matrices else np.empty((0, 0), dtype=np.float32)
+    meta = json.dumps({"ids": ids, "documents": documents, "metadatas": metadatas}, ensure_ascii=False)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, embeddings=matrix, meta=np.frombuffer(meta.encode("utf-8"), dtype=np.uint8))
+    os.replace(tmp_path, path)
+    return len(ids)
+
+
+def read_snapshot_file(path: str):
+    with open(path, "rb") as f:
+        data = np.load(io.BytesIO(f.read()), allow_pickle=False)
+        matrix = data["embeddings"]
+        meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+    return matrix, meta
+
+
+async def load_from_file(store: VectorStore, path: str, batch_size: int, progress=None) -> int:
+    matrix, meta = await asyncio.to_thread(read_snapshot_file, path)
+    ids, documents, metadatas = meta["ids"], meta["documents"], meta["metadatas"]
+
+    loaded = 0
+    for start in range(0, len(ids), batch_size):
+        end = min(start + batch_size, len(ids))
+        await store.aadd(ids[start:end], matrix[start:end], documents[start:end], metadatas[start:end])
+        loaded = end
+        if progress:
+            progress(loaded)
+    return loaded
+
+
+# ---------- 시작 시 적재 ----------
+
+class RagIndexLoader:
+    """시작 시 스냅샷을 벡터 저장소에 적재하고 준비 상태를 보고 (단일 이벤트 루프 전용)"""
+
+    def __init__(self, mode: str, path: str, batch_size: int):
+        if mode not in SNAPSHOT_MODES:
+            raise ValueError(f"Unknown rag_snapshot_mode: {mode}")
+        self.mode = mode
+        self.path = path
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+        self.status = "cold"  # cold → loading → ready | failed
+        self.loaded = 0
+        self.total: Optional[int] = None
+        self.duration_ms: Optional[int] = None
+        self.error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.load())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def wait_ready(self) -> None:
+        """
+        적재가 끝날 때까지 대기 (수집/삭제가 스냅샷 복원과 섞이지 않도록)
+
+        start()가 호출되지 않은 경우(스크립트 등)는 바로 반환합니다.
+        """
+        if self._task is None:
+            return
+        # 대기자가 취소돼도 적재 작업은 계속
+        await asyncio.shield(self._task)
+        if self.status == "failed":
+            raise RuntimeError(f"RAG index load failed: {self.error}")
+
+    async def load(self) -> None:
+        store = get_vector_store()
+        started = time.monotonic()
+        self.status = "loading"
+        try:
+            existing = await store.acount()
+            if self.mode == "off" or existing > 0:
+                # 스냅샷 미사용, 또는 영구 저장소(Chroma persistent / numpy mmap / pgvector)에 이미 문서가 있음
+                self.loaded = existing
+                self.total = existing
+            elif self.mode == "postgres":
+                self.total = await count_postgres_snapshot()
+                self.loaded = await load_from_postgres(store, self.batch_size, self._progress)
+            elif os.path.exists(self.path):
+                self.loaded = await load_from_file(store, self.path, self.batch_size, self._progress)
+                self.total = self.loaded
+            else:
+                print(f"[RagIndex] Snapshot file not found: {self.path}")
+                self.total = 0
+
+            await store.aflush()
+            self.status = "ready"
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            print(f"[RagIndex] Snapshot load failed: {e}")
+        finally:
+            self.duration_ms = int((time.monotonic() - started) * 1000)
+
+        if self.status == "ready":
+            print(f"[RagIndex] Ready with {self.loaded} chunks ({self.mode}, {self.duration_ms}ms)")
+
+    def _progress(self, loaded: int) -> None:
+        self.loaded = loaded
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "status": self.status,
+            "backend": get_vector_store().name,
+            "snapshot_mode": self.mode,
+            "loaded": self.loaded,
+            "total": self.total,
+            "duration_ms": self.duration_ms,
+            "error": self.error,
+        }
+
+
+# 싱글톤 인스턴스
+_rag_index_loader: Optional[RagIndexLoader] = None
+
+
+def get_rag_index_loader() -> RagIndexLoader:
+    global _rag_index_loader
+    if _rag_index_loader is None:
+        _rag_index_loader = RagIndexLoader(
+            mode=settings.rag_snapshot_mode,
+            path=settings.rag_snapshot_path,
+            batch_size=settings.rag_snapshot_batch_size,
+        )
+    return _rag_index_loader
@@ -0,0 +1,506 @@
+"""
+RAG 벡터 저장소 (rag_backend로 선택)
+
+- chroma: 기존 ChromaDB 컬렉션
+- numpy: 정규화된 임베딩을 연속된 float32 행렬로 유지하는 in-process 인덱스
+  - 정확한 top-k: 행렬곱 한 번 + argpartition
+  - 문서/메타데이터는 행 순서와 같은 병렬 리스트
+  - rag_numpy_persist_directory가 있으면 .npy(메모리 매핑 로드) + JSON으로 저장
+- pgvector: Neon의 rag_documents 테이블 (pg_vector_store.py, 레플리카 간 공유)
+
+retrieve_documents / add_documents는 이 인터페이스의 async 메서드만 사용합니다.
+filters는 메타데이터 동등 비교이며 값이 리스트면 IN으로 처리합니다 ({"type": ["arxiv", "blog"]}).
+"""
+
+import asyncio
+import functools
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+
+settings = get_settings()
+
+MetadataFilters = Optional[Dict[str, Any]]
+
+
+def matches_filters(metadata: Dict[str, Any], filters: MetadataFilters) -> bool:
+    if not filters:
+        return True
+    for key, expected in filters.items():
+        value = metadata.get(key)
+        if isinstance(expected, (list, tuple, set)):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def _locked(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class VectorStore:
+    """벡터 저장소 인터페이스 (score는 코사인 유사도, 높을수록 유사)"""
+
+    name = "base"
+    # True면 I/O가 async 메서드에만 구현된 저장소 (동기 메서드 사용 불가)
+    is_async = False
+
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+    ) -> None:
+        raise NotImplementedError
+
+    def update(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Optional[Sequence[Dict[str, Any]]] = None,
+    ) -> None:
+        raise NotImplementedError
+
+    def delete(self, ids: Sequence[str]) -> None:
+        raise NotImplementedError
+
+    def delete_where(self, filters: Dict[str, Any]) -> None:
+        """메타데이터 필터에 맞는 문서 삭제 (예: {"parent_id": ...}로 문서의 모든 청크)"""
+        raise NotImplementedError
+
+    def get_metadatas(self, filters: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """필터에 맞는 문서의 id → 메타데이터 (임베딩/본문 없이 한 번에 조회)"""
+        raise NotImplementedError
+
+    def query(
+        self, embedding: Sequence[float], top_k: int, filters: MetadataFilters = None
+    ) -> List[Dict[str, Any]]:
+        """Returns: [{"id", "content", "metadata", "score"}] (score 내림차순)"""
+        raise NotImplementedError
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """변경 사항 영구 저장 (지원하지 않으면 no-op)"""
+
+    def iter_batches(
+        self, batch_size: int
+    ) -> Iterator[Tuple[List[str], np.ndarray, List[str], List[Dict[str, Any]]]]:
+        """스냅샷 export용 전체 순회: (ids, 임베딩 행렬, documents, metadatas) 배치"""
+        raise NotImplementedError
+
+    # ---------- async (이벤트 루프에서 호출) ----------
+    # in-process 저장소는 동기 메서드를 스레드에서 실행하고, DB 기반 저장소가 재정의합니다.
+    # (스냅샷 적재가 큰 배치로 lock을 잡고 있어도 이벤트 루프는 막히지 않음)
+
+    async def aadd(self, ids, embeddings, documents, metadatas) -> None:
+        await asyncio.to_thread(self.add, ids, embeddings, documents, metadatas)
+
+    async def aupdate(self, ids, embeddings, documents, metadatas=None) -> None:
+        await asyncio.to_thread(self.update, ids, embeddings, documents, metadatas)
+
+    async def adelete(self, ids) -> None:
+        await asyncio.to_thread(self.delete, ids)
+
+    async def adelete_where(self, filters: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self.delete_where, filters)
+
+    async def aget_metadatas(self, filters: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        return await asyncio.to_thread(self.get_metadatas, filters)
+
+    async def aquery(self, embedding, top_k: int, filters: MetadataFilters = None) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.query, embedding, top_k, filters)
+
+    async def acount(self) -> int:
+        return await asyncio.to_thread(self.count)
+
+    async def areset(self) -> None:
+        await asyncio.to_thread(self.reset)
+
+    async def aflush(self) -> None:
+        await asyncio.to_thread(self.flush)
+
+
+class ChromaVectorStore(VectorStore):
+    """ChromaDB 컬렉션 (cosine distance → 1 - distance)"""
+
+    name = "chroma"
+
+    @staticmethod
+    def _as_lists(embeddings) -> List[List[float]]:
+        # numpy 배열/스칼라도 Chroma가 받는 float 리스트로 변환
+        return np.asarray(embeddings, dtype=np.float32).tolist()
+
+    def _collection(self):
+        # numpy 백엔드에서는 Chroma 클라이언트를 만들지 않도록 지연 import
+        from app.db.chroma import get_collection
+
+        return get_collection()
+
+    def add(self, ids, embeddings, documents, metadatas) -> None:
+        self._collection().add(
+            ids=list(ids),
+            embeddings=self._as_lists(embeddings),
+            documents=list(documents),
+            metadatas=list(metadatas),
+        )
+
+    def update(self, ids, embeddings, documents, metadatas=None) -> None:
+        self._collection().update(
+            ids=list(ids),
+            embeddings=self._as_lists(embeddings),
+            documents=list(documents),
+            metadatas=list(metadatas) if metadatas else None,
+        )
+
+    def delete(self, ids) -> None:
+        self._collection().delete(ids=list(ids))
+
+    def delete_where(self, filters) -> None:
+        self._collection().delete(where=self._where(filters))
+
+    def get_metadatas(self, filters) -> Dict[str, Dict[str, Any]]:
+        result = self._collection().get(where=self._where(filters), include=["metadatas"])
+        return {doc_id: dict(result["metadatas"][i] or {}) for i, doc_id in enumerate(result["ids"])}
+
+    @staticmethod
+    def _where(filters: MetadataFilters) -> Optional[Dict[str, Any]]:
+        if not filters:
+            return None
+        clauses = [
+            {key: {"$in": list(value)}} if isinstance(value, (list, tuple, set)) else {key: value}
+            for key, value in filters.items()
+        ]
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def query(self, embedding, top_k: int, filters: MetadataFilters = None) -> List[Dict[str, Any]]:
+        results = self._collection().query(
+            query_embeddings=self._as_lists([embedding]),
+            n_results=top_k,
+            where=self._where(filters),
+            include=["documents", "metadatas", "distances"],
+        )
+
+        documents = []
+        if results["ids"] and results["ids"][0]:
+            for i, doc_id in enumerate(results["ids"][0]):
+                # distance가 낮을수록 유사 → 1 - distance로 변환
+                distance = results["distances"][0][i] if results["distances"] else 0
+                documents.append({
+                    "id": doc_id,
+                    "content": results["documents"][0][i] if results["documents"] else "",
+                    "metadata": results["metadatas"][0][i] if results["metadatas"] else {},
+                    "score": 1 - distance,
+                })
+        return documents
+
+    def count(self) -> int:
+        return self._collection().count()
+
+    def reset(self) -> None:
+        from app.db.chroma import reset_collection
+
+        reset_collection()
+
+    def iter_batches(self, batch_size: int):
+        collection = self._collection()
+        for offset in range(0, collection.count(), batch_size):
+            batch = collection.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=batch_size,
+                offset=offset,
+            )
+            if not batch["ids"]:
+                break
+            yield (
+                list(batch["ids"]),
+                np.asarray(batch["embeddings"], dtype=np.float32),
+                list(batch["documents"]),
+                [dict(m or {}) for m in batch["metadatas"]],
+            )
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    정규화된 float32 행렬 기반 정확한(brute-force) 코사인 검색
+
+    스냅샷 적재와 async 메서드가 각각 스레드에서 동시에 실행되므로
+    모든 공개 메서드는 내부 lock으로 직렬화합니다.
+    """
+
+    name = "numpy"
+
+    MATRIX_FILE = "embeddings.npy"
+    META_FILE = "documents.json"
+
+    def __init__(self, persist_directory: Optional[str] = None, initial_capacity: int = 1024):
+        self.persist_directory = persist_directory or None
+        self.initial_capacity = initial_capacity
+
+        self._matrix: Optional[np.ndarray] = None  # (capacity, dim), 앞의 _size행만 유효
+        self._size = 0
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._index: Dict[str, int] = {}  # id → 행 번호
+        self._dirty = False
+        self._lock = threading.RLock()
+
+        if self.persist_directory:
+            self._load()
+
+    # ---------- 내부 ----------
+
+    @staticmethod
+    def _normalize(embeddings) -> np.ndarray:
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors[None, :]
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _ensure_writable(self, extra: int, dim: int) -> None:
+        """extra행을 더 쓸 수 있는 쓰기 가능한 행렬 확보 (용량은 2배씩 증가)"""
+        needed = self._size + extra
+        if self._matrix is None:
+            self._matrix = np.empty((max(self.initial_capacity, needed), dim), dtype=np.float32)
+            return
+        if self._matrix.shape[1] != dim:
+            raise ValueError(f"Embedding dimension mismatch: {dim} != {self._matrix.shape[1]}")
+
+        capacity = self._matrix.shape[0]
+        if needed > capacity:
+            capacity = max(needed, capacity * 2)
+        elif self._matrix.flags.writeable:
+            return
+        # 용량 부족, 또는 메모리 매핑(읽기 전용)으로 로드된 행렬의 첫 쓰기 → 메모리로 복사
+        grown = np.empty((capacity, dim), dtype=np.float32)
+        grown[:self._size] = self._matrix[:self._size]
+        self._matrix = grown
+
+    # ---------- 인터페이스 ----------
+
+    @_locked
+    def add(self, ids, embeddings, documents, metadatas) -> None:
+        if len(set(ids)) != len(ids) or any(doc_id in self._index for doc_id in ids):
+            raise ValueError("Duplicate document id")
+        vectors = self._normalize(embeddings)
+
+        self._ensure_writable(len(ids), vectors.shape[1])
+        start = self._size
+        self._matrix[start:start + len(ids)] = vectors
+        for offset, doc_id in enumerate(ids):
+            self._index[doc_id] = start + offset
+            self._ids.append(doc_id)
+            self._documents.append(documents[offset])
+            self._metadatas.append(dict(metadatas[offset]))
+        self._size += len(ids)
+        self._dirty = True
+
+    @_locked
+    def update(self, ids, embeddings, documents, metadatas=None) -> None:
+        vectors = self._normalize(embeddings)
+        self._ensure_writable(0, vectors.shape[1])
+        for i, doc_id in enumerate(ids):
+            row = self._index.get(doc_id)
+            if row is None:
+                continue
+            self._matrix[row] = vectors[i]
+            self._documents[row] = documents[i]
+            if metadatas:
+                self._metadatas[row] = dict(metadatas[i])
+        self._dirty = True
+
+    @_locked
+    def delete(self, ids) -> None:
+        if self._matrix is None:
+            return
+        self._ensure_writable(0, self._matrix.shape[1])
+        for doc_id in ids:
+            row = self._index.pop(doc_id, None)
+            if row is None:
+                continue
+            last = self._size - 1
+            if row != last:
+                # 마지막 행을 빈 자리로 옮겨 행렬을 연속으로 유지
+                self._matrix[row] = self._matrix[last]
+                self._ids[row] = self._ids[last]
+                self._documents[row] = self._documents[last]
+                self._metadatas[row] = self._metadatas[last]
+                self._index[self._ids[row]] = row
+            self._ids.pop()
+            self._documents.pop()
+            self._metadatas.pop()
+            self._size -= 1
+        self._dirty = True
+
+    @_locked
+    def delete_where(self, filters) -> None:
+        self.delete(list(self.get_metadatas(filters)))
+
+    @_locked
+    def get_metadatas(self, filters) -> Dict[str, Dict[str, Any]]:
+        return {
+            self._ids[row]: self._metadatas[row]
+            for row in range(self._size)
+            if matches_filters(self._metadatas[row], filters)
+        }
+
+    @_locked
+    def query(self, embedding, top_k: int, filters: MetadataFilters = None) -> List[Dict[str, Any]]:
+        if self._size == 0 or top_k <= 0:
+            return []
+
+        query = self._normalize(embedding)[0]
+        if filters:
+            # 필터를 먼저 적용한 행만 점수 계산 (결과 수가 top_k보다 줄지 않음)
+            rows = np.fromiter(
+                (row for row in range(self._size) if matches_filters(self._metadatas[row], filters)),
+                dtype=np.int64,
+            )
+            if rows.size == 0:
+                return []
+            scores = self._matrix[rows] @ query
+        else:
+            rows = None
+            scores = self._matrix[:self._size] @ query
+
+        k = min(top_k, scores.shape[0])
+        top = np.argpartition(scores, -k)[-k:] if k < scores.shape[0] else np.arange(scores.shape[0])
+        top = top[np.argsort(scores[top])[::-1]]
+        scored = [(int(rows[i]) if rows is not None else int(i), float(scores[i])) for i in top]
+
+        return [
+            {
+                "id": self._ids[row],
+                "content": self._documents[row],
+                "metadata": self._metadatas[row],
+                "score": score,
+            }
+            for row, score in scored
+        ]
+
+    @_locked
+    def count(self) -> int:
+        return self._size
+
+    @_locked
+    def reset(self) -> None:
+        self._matrix = None
+        self._size = 0
+        self._ids, self._documents, self._metadatas = [], [], []
+        self._index = {}
+        self._dirty = True
+        self.flush()
+
+    def iter_batches(self, batch_size: int):
+        start = 0
+        while True:
+            # yield 사이에는 lock을 잡지 않도록 배치마다 복사
+            with self._lock:
+                end = min(start + batch_size, self._size)
+                if start >= end:
+                    return
+                batch = (
+                    self._ids[start:end],
+                    np.array(self._matrix[start:end]),
+                    self._documents[start:end],
+                    self._metadatas[start:end],
+                )
+            yield batch
+            start = end
+
+    # ---------- 영구 저장 ----------
+
+    @_locked
+    def flush(self) -> None:
+        if not self.persist_directory or not self._dirty:
+            return
+        os.makedirs(self.persist_directory, exist_ok=True)
+        matrix_path = os.path.join(self.persist_directory, self.MATRIX_FILE)
+        meta_path = os.path.join(self.persist_directory, self.META_FILE)
+
+        # 임시 파일에 쓴 뒤 rename (중간에 죽어도 이전 상태 유지)
+        if self._matrix is not None:
+            matrix = self._matrix[:self._size]
+        else:
+            matrix = np.empty((0, 0), dtype=np.float32)
+        with open(matrix_path + ".tmp", "wb") as f:
+            np.save(f, matrix)
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(
+                {"ids": self._ids, "documents": self._documents, "metadatas": self._metadatas},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(matrix_path + ".tmp", matrix_path)
+        os.replace(meta_path + ".tmp", meta_path)
+        self._dirty = False
+        print(f"[VectorStore] Saved {self._size} vectors to {self.persist_directory}")
+
+    def _load(self) -> None:
+        matrix_path = os.path.join(self.persist_directory, self.MATRIX_FILE)
+        meta_path = os.path.join(self.persist_directory, self.META_FILE)
+        if not (os.path.exists(matrix_path) and os.path.exists(meta_path)):
+            return
+
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        matrix = np.load(matrix_path, mmap_mode="r")
+        if matrix.shape[0] != len(meta["ids"]):
+            print(f"[VectorStore] Ignoring inconsistent snapshot in {self.persist_directory}")
+            return
+
+        self._matrix = matrix if matrix.shape[0] else None
+        self._size = matrix.shape[0]
+        self._ids = meta["ids"]
+        self._documents = meta["documents"]
+        self._metadatas = meta["metadatas"]
+        self._index = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        print(f"[VectorStore] Loaded {self._size} vectors from {self.persist_directory} (mmap)")
+
+
+# 싱글톤 인스턴스
+_vector_store: Optional[VectorStore] = None
+
+
+def create_vector_store(backend: Optional[str] = None) -> VectorStore:
+    backend = backend or settings.rag_backend
+    if backend == "numpy":
+        return NumpyVectorStore(persist_directory=settings.rag_numpy_persist_directory)
+    if backend == "chroma":
+        return ChromaVectorStore()
+    if backend == "pgvector":
+        # DB 엔진은 pgvector 백엔드를 쓸 때만 import
+        from app.services.rag.pg_vector_store import PgVectorStore
+
+        return PgVectorStore(
+            ef_search=settings.rag_pgvector_ef_search,
+            iterative_scan=settings.rag_pgvector_iterative_scan,
+        )
+    raise ValueError(f"Unknown rag_backend: {backend}")
+
+
+def get_vector_store() -> VectorStore:
+    global _vector_store
+    if _vector_store is None:
+        _vector_store = create_vector_store()
+    return _vector_store
@@ -0,0 +1,152 @@
+"""
+Analytics 집계 벤치마크
+사용법: python -m scripts.bench_analytics --rows 10000000 --days 7 30
+
+bench 스키마의 query_analytics에 합성 로그를 채운 뒤 다음을 비교합니다.
+
+- summary: 기존 방식(쿼리 5개 순차 실행) vs 단일 집계 패스(FILTER)
+- dashboard: 한 세션에서 순차 실행 vs get_dashboard_data (조회별 세션 동시 실행)
+"""
+
+import argparse
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import and_, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.db_models import QueryAnalytics, User
+from app.services.analytics.logger import (
+    get_analytics_summary,
+    get_dashboard_data,
+    get_negative_feedback_queries,
+    get_popular_queries,
+    get_recent_queries,
+)
+from scripts.bench_utils import Timer, create_bench_engine, create_bench_tables, print_table, raw_asyncpg
+
+SOURCE_TYPES = ["rag", "mcp", "cache", "hybrid"]
+COPY_COLUMNS = ["id", "query_text", "response_text", "source_type", "feedback", "latency_ms", "created_at"]
+
+
+async def fill_rows(engine, rows: int, distinct_queries: int, days: int, chunk: int = 100_000) -> None:
+    rng = np.random.default_rng(42)
+    now = datetime.now(timezone.utc)
+    queries = [f"bench question {i} about transformers" for i in range(distinct_queries)]
+
+    async with engine.connect() as conn:
+        apg = await raw_asyncpg(conn)
+        for offset in range(0, rows, chunk):
+            size = min(chunk, rows - offset)
+            # 인기 쿼리 쏠림 (zipf)
+            query_idx = np.minimum(rng.zipf(1.3, size=size), distinct_queries) - 1
+            sources = rng.integers(0, len(SOURCE_TYPES), size=size)
+            feedback = rng.choice([0, 1, -1], size=size, p=[0.8, 0.15, 0.05])
+            latency = rng.gamma(2.0, 600.0, size=size).astype(int)
+            age_seconds = rng.integers(0, days * 86400, size=size)
+
+            records = [
+                (
+                    str(uuid.uuid4()),
+                    queries[query_idx[i]],
+                    "bench response",
+                    SOURCE_TYPES[sources[i]],
+                    int(feedback[i]) or None,
+                    int(latency[i]),
+                    now - timedelta(seconds=int(age_seconds[i])),
+                )
+                for i in range(size)
+            ]
+            await apg.copy_records_to_table(
+                "query_analytics",
+                schema_name="bench",
+                records=records,
+                columns=COPY_COLUMNS,
+            )
+            print(f"  {offset + size:,} / {rows:,}")
+        await conn.commit()
+
+
+async def legacy_summary(db: AsyncSession, days: int) -> dict:
+    """단일 패스 도입 이전 방식 (기간을 5번 스캔)"""
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    window = QueryAnalytics.created_at >= since
+
+    await db.execute(select(func.count(QueryAnalytics.id)).where(window))
+    await db.execute(
+        select(QueryAnalytics.source_type, func.count(QueryAnalytics.id))
+        .where(window)
+        .group_by(QueryAnalytics.source_type)
+    )
+    await db.execute(select(func.count(QueryAnalytics.id)).where(and_(window, QueryAnalytics.feedback == 1)))
+    await db.execute(select(func.count(QueryAnalytics.id)).where(and_(window, QueryAnalytics.feedback == -1)))
+    await db.execute(
+        select(func.avg(QueryAnalytics.latency_ms)).where(and_(window, QueryAnalytics.latency_ms.isnot(None)))
+    )
+    return {}
+
+
+async def sequential_dashboard(db: AsyncSession, days: int) -> dict:
+    return {
+        "summary": await get_analytics_summary(db, days),
+        "popular_queries": await get_popular_queries(db, days, 10),
+        "recent_queries": await get_recent_queries(db, 20),
+        "negative_feedback_queries": await get_negative_feedback_queries(db, days),
+    }
+
+
+async def measure(fn, repeat: int) -> dict:
+    timer = Timer()
+    for _ in range(repeat):
+        async with timer.measure():
+            await fn()
+    return timer.summary()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--distinct-queries", type=int, default=50_000)
+    parser.add_argument("--span-days", type=int, default=90, help="합성 로그가 퍼져 있는 기간")
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 30])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-fill", action="store_true", help="기존 bench 데이터 재사용")
+    args = parser.parse_args()
+
+    engine = create_bench_engine(pool_size=5, max_overflow=5)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    if not args.skip_fill:
+        async with engine.begin() as conn:
+            await create_bench_tables(conn, [User.__table__, QueryAnalytics.__table__])
+        print(f"🚀 {args.rows:,} rows 준비 중...")
+        await fill_rows(engine, args.rows, args.distinct_queries, args.span_days)
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql("ANALYZE query_analytics")
+
+    async def in_session(fn, days):
+        async with session_maker() as session:
+            return await fn(session, days)
+
+    rows = []
+    for days in args.days:
+        cases = [
+            ("summary (5 queries)", lambda: in_session(legacy_summary, days)),
+            ("summary (single pass)", lambda: in_session(get_analytics_summary, days)),
+            ("dashboard (sequential)", lambda: in_session(sequential_dashboard, days)),
+            ("dashboard (concurrent)", lambda: get_dashboard_data(days, session_factory=session_maker)),
+        ]
+        for name, fn in cases:
+            await fn()  # 워밍업
+            rows.append({"days": days, "case": name, **(await measure(fn, args.repeat))})
+            print(f"  days={days} {name} done")
+
+    print()
+    print_table(rows, ["days", "case", "n", "mean_ms", "p50_ms", "p95_ms", "max_ms"])
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,192 @@
+"""
+DB 커넥션 풀 벤치마크
+사용법: python -m scripts.bench_db_pool --concurrency 1 10 50 --duration 10
+
+bench 스키마에 feed / semantic cache 데이터를 채운 뒤
+NullPool과 커넥션 풀(queue) 각각에서 다음 두 워크로드의 requests/sec와 지연 시간을 비교합니다.
+
+- feed: ASGI 앱의 GET /api/feed (get_db 의존성을 벤치마크 엔진으로 교체)
+- cache_hit: 요청 단위 세션으로 get_cached_response 호출 (L1 캐시 비활성화, 임베딩은 미리 캐시)
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import get_settings
+from app.db.neon import get_db, get_pool_stats
+from app.main import app
+from app.models.db_models import Base, Guru, GuruPost, QueryCache, EMBEDDING_DIMENSION
+from app.services.cache.semantic_cache import generate_query_hash, get_cached_response
+from app.services.llm.openai_client import _normalize_text, embedding_cache
+from scripts.bench_utils import Timer, create_bench_db_engine, create_bench_engine, create_bench_tables, print_table
+
+settings = get_settings()
+
+CACHE_QUERY = "What is retrieval augmented generation?"
+
+
+async def seed(engine, gurus: int, posts_per_guru: int) -> None:
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+
+    async with engine.begin() as conn:
+        await create_bench_tables(conn, Base.metadata.sorted_tables)
+
+        guru_rows = [
+            {"id": str(uuid.uuid4()), "name": f"bench guru {i}", "threads_handle": f"bench_guru_{i}"}
+            for i in range(gurus)
+        ]
+        await conn.execute(insert(Guru), guru_rows)
+
+        post_rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "guru_id": guru["id"],
+                "content": f"bench post {j} by {guru['name']}",
+                "posted_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+            }
+            for guru in guru_rows
+            for j in range(posts_per_guru)
+        ]
+        for offset in range(0, len(post_rows), 5000):
+            await conn.execute(insert(GuruPost), post_rows[offset:offset + 5000])
+
+        await conn.execute(insert(QueryCache), [{
+            "id": str(uuid.uuid4()),
+            "query_hash": generate_query_hash(CACHE_QUERY),
+            "query_text": CACHE_QUERY,
+            "query_embedding": _bench_embedding(),
+            "response": "bench response",
+            "sources": "[]",
+            "expires_at": now + timedelta(days=30),
+        }])
+
+
+def _bench_embedding() -> list[float]:
+    rng = random.Random(7)
+    vector = [rng.gauss(0, 1) for _ in range(EMBEDDING_DIMENSION)]
+    norm = sum(v * v for v in vector) ** 0.5
+    return [v / norm for v in vector]
+
+
+async def run_load(worker, concurrency: int, duration: float) -> dict:
+    """concurrency개의 클라이언트가 duration초 동안 반복 요청"""
+    timer = Timer()
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def client_loop():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            try:
+                async with timer.measure():
+                    await worker()
+            except Exception as e:
+                errors += 1
+                if errors == 1:
+                    print(f"  ⚠️ {e}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    summary = timer.summary()
+    return {"rps": round(summary.get("n", 0) / elapsed, 1), "errors": errors, **summary}
+
+
+async def bench_mode(pool_mode: str, concurrency_levels: list[int], duration: float) -> list[dict]:
+    engine = create_bench_db_engine(pool_mode)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def bench_get_db():
+        async with session_maker() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    app.dependency_overrides[get_db] = bench_get_db
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        async def feed_request():
+            response = await http.get("/api/feed", params={"limit": 20})
+            response.raise_for_status()
+
+        async def cache_hit_request():
+            async with session_maker() as session:
+                result = await get_cached_response(session, CACHE_QUERY)
+                await session.commit()
+            if result is None:
+                raise RuntimeError("expected cache hit")
+
+        rows = []
+        for workload, worker in (("feed", feed_request), ("cache_hit", cache_hit_request)):
+            for concurrency in concurrency_levels:
+                # 워밍업 (풀 채우기)
+                await run_load(worker, concurrency, min(1.0, duration))
+                result = await run_load(worker, concurrency, duration)
+                pool = get_pool_stats(engine)
+                rows.append({
+                    "pool": pool_mode,
+                    "workload": workload,
+                    "clients": concurrency,
+                    **result,
+                    "connect_ratio": pool["connect_ratio"],
+                    "acquire_ms_avg": pool["acquire_ms_avg"],
+                })
+                print(f"  {pool_mode:5} {workload:9} c={concurrency:<3} {result['rps']} req/s")
+
+    app.dependency_overrides.pop(get_db, None)
+    await engine.dispose()
+    return rows
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--modes", nargs="+", default=["null", "queue"], choices=["null", "queue"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--gurus", type=int, default=20)
+    parser.add_argument("--posts-per-guru", type=int, default=500)
+    args = parser.parse_args()
+
+    # DB 경로만 측정: L1 캐시 끄고 쿼리 임베딩은 미리 캐시
+    settings.l1_cache_enabled = False
+    embedding = _bench_embedding()
+
+    async def cached_embedding():
+        return embedding
+
+    await embedding_cache.get_or_create(
+        (settings.openai_embedding_model, _normalize_text(CACHE_QUERY)), cached_embedding
+    )
+
+    seed_engine = create_bench_engine()
+    print("🚀 bench 데이터 준비 중...")
+    await seed(seed_engine, args.gurus, args.posts_per_guru)
+    await seed_engine.dispose()
+
+    rows = []
+    for mode in args.modes:
+        rows.extend(await bench_mode(mode, args.concurrency, args.duration))
+
+    print()
+    print_table(rows, [
+        "pool", "workload", "clients", "rps", "errors", "mean_ms", "p50_ms", "p95_ms", "max_ms",
+        "connect_ratio", "acquire_ms_avg",
+    ])
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,133 @@
+"""
+고품질 캐시 TTL 연장 벤치마크
+사용법: python -m scripts.bench_extend_ttl --queries 10000
+
+bench 스키마에 긍정 피드백이 임계값 이상인 쿼리 N개(각각 query_cache 항목 포함)를 채운 뒤
+extend_high_quality_cache를 비교합니다.
+
+- legacy: GROUP BY 후 쿼리마다 query_cache SELECT + ORM 수정 (N+1 왕복)
+- set-based: 집계 서브쿼리와 UPDATE ... FROM 한 번
+"""
+
+import argparse
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.db_models import AnalyticsRollupState, QueryAnalytics, QueryAnalyticsHourly, QueryCache, User
+from app.services.cache.semantic_cache import generate_query_hash
+from app.services.learning.self_learner import SelfLearner
+from scripts.bench_utils import Timer, create_bench_engine, create_bench_tables, print_table, raw_asyncpg
+
+POSITIVE_THRESHOLD = 3
+
+
+async def fill(engine, queries: int, positives_per_query: int) -> None:
+    now = datetime.now(timezone.utc)
+    texts = [f"bench high quality question {i}" for i in range(queries)]
+
+    async with engine.connect() as conn:
+        apg = await raw_asyncpg(conn)
+        await apg.copy_records_to_table(
+            "query_cache",
+            schema_name="bench",
+            records=[
+                (str(uuid.uuid4()), generate_query_hash(q), q, "bench response", now, now + timedelta(days=1), 0)
+                for q in texts
+            ],
+            columns=["id", "query_hash", "query_text", "response", "created_at", "expires_at", "hit_count"],
+        )
+        await apg.copy_records_to_table(
+            "query_analytics",
+            schema_name="bench",
+            records=[
+                (str(uuid.uuid4()), q, generate_query_hash(q), "bench response", "rag", 1, 800, now - timedelta(hours=j + 1))
+                for q in texts
+                for j in range(positives_per_query)
+            ],
+            columns=["id", "query_text", "query_fingerprint", "response_text", "source_type", "feedback", "latency_ms", "created_at"],
+        )
+        await conn.commit()
+
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE query_cache")
+        await conn.exec_driver_sql("ANALYZE query_analytics")
+
+
+async def legacy_extend(db: AsyncSession, positive_threshold: int = POSITIVE_THRESHOLD, extension_days: int = 7) -> int:
+    """set-based UPDATE 도입 이전 방식"""
+    since = datetime.now(timezone.utc) - timedelta(days=30)
+    result = await db.execute(
+        select(QueryAnalytics.query_text, func.count(QueryAnalytics.id))
+        .where(and_(QueryAnalytics.created_at >= since, QueryAnalytics.feedback == 1))
+        .group_by(QueryAnalytics.query_text)
+        .having(func.count(QueryAnalytics.id) >= positive_threshold)
+    )
+    extended = 0
+    for row in result.all():
+        cache_result = await db.execute(
+            select(QueryCache).where(QueryCache.query_hash == generate_query_hash(row[0]))
+        )
+        cache = cache_result.scalar_one_or_none()
+        if cache:
+            cache.expires_at = datetime.now(timezone.utc) + timedelta(days=extension_days)
+            extended += 1
+    await db.commit()
+    return extended
+
+
+async def reset_expiry(session_maker) -> None:
+    """매 측정마다 모든 항목이 실제로 연장되도록 만료 시각 되돌리기 (측정 제외)"""
+    async with session_maker() as session:
+        await session.execute(update(QueryCache).values(expires_at=func.now() + timedelta(days=1)))
+        await session.commit()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=10_000, help="임계값을 넘는 쿼리 수")
+    parser.add_argument("--positives", type=int, default=POSITIVE_THRESHOLD, help="쿼리당 긍정 피드백 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = create_bench_engine()
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with engine.begin() as conn:
+        # 롤업 상태 테이블은 비워 둠 → 원본 집계 경로
+        await create_bench_tables(conn, [
+            User.__table__,
+            QueryCache.__table__,
+            QueryAnalytics.__table__,
+            QueryAnalyticsHourly.__table__,
+            AnalyticsRollupState.__table__,
+        ])
+    print(f"🚀 {args.queries:,} qualifying queries 준비 중...")
+    await fill(engine, args.queries, args.positives)
+
+    async def set_based(session):
+        result = await SelfLearner(session).extend_high_quality_cache(positive_threshold=POSITIVE_THRESHOLD)
+        return result["extended"]
+
+    rows = []
+    for name, fn in [("legacy (N+1)", legacy_extend), ("set-based UPDATE", set_based)]:
+        timer = Timer()
+        extended = 0
+        for _ in range(args.repeat):
+            await reset_expiry(session_maker)
+            async with session_maker() as session:
+                async with timer.measure():
+                    extended = await fn(session)
+        rows.append({"case": name, "extended": extended, **timer.summary()})
+        print(f"  {name} done")
+
+    print()
+    print_table(rows, ["case", "extended", "n", "mean_ms", "p50_ms", "p95_ms", "max_ms"])
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
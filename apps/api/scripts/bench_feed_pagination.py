@@ -0,0 +1,127 @@
+"""
+피드 페이지네이션 벤치마크
+사용법: python -m scripts.bench_feed_pagination --posts 1000000 --pages 1 10 100 500
+
+bench 스키마의 guru_posts에 포스트를 채운 뒤 GET /api/feed를
+OFFSET 방식과 cursor(keyset) 방식으로 같은 페이지 깊이에서 호출해 지연 시간을 비교합니다.
+"""
+
+import argparse
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import numpy as np
+from sqlalchemy import insert, select, desc
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.neon import get_db
+from app.main import app
+from app.models.db_models import Base, Guru, GuruPost
+from app.routers.feed import _encode_cursor
+from scripts.bench_utils import Timer, create_bench_engine, create_bench_tables, print_table, raw_asyncpg
+
+LIMIT = 20
+
+
+async def seed(engine, posts: int, gurus: int, chunk: int = 50_000) -> list[str]:
+    rng = np.random.default_rng(42)
+    now = datetime.now(timezone.utc)
+    guru_ids = [str(uuid.uuid4()) for _ in range(gurus)]
+
+    async with engine.begin() as conn:
+        await create_bench_tables(conn, Base.metadata.sorted_tables)
+        await conn.execute(insert(Guru), [
+            {"id": guru_id, "name": f"bench guru {i}", "threads_handle": f"bench_guru_{i}"}
+            for i, guru_id in enumerate(guru_ids)
+        ])
+
+    async with engine.connect() as conn:
+        apg = await raw_asyncpg(conn)
+        for offset in range(0, posts, chunk):
+            size = min(chunk, posts - offset)
+            minutes = rng.integers(0, 60 * 24 * 365, size=size)
+            owners = rng.integers(0, gurus, size=size)
+            records = [
+                (str(uuid.uuid4()), guru_ids[owners[i]], f"bench post {offset + i}", now - timedelta(minutes=int(minutes[i])))
+                for i in range(size)
+            ]
+            await apg.copy_records_to_table(
+                "guru_posts",
+                schema_name="bench",
+                records=records,
+                columns=["id", "guru_id", "content", "posted_at"],
+            )
+        await conn.commit()
+
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE guru_posts")
+
+    return guru_ids
+
+
+async def cursor_for_page(session_maker, page: int, guru_ids: list[str] | None) -> str | None:
+    """page번째 페이지를 요청할 때 클라이언트가 갖고 있을 커서 (이전 페이지 마지막 포스트)"""
+    if page <= 1:
+        return None
+    query = select(GuruPost).order_by(desc(GuruPost.posted_at), desc(GuruPost.id))
+    if guru_ids:
+        query = query.where(GuruPost.guru_id.in_(guru_ids))
+    async with session_maker() as session:
+        result = await session.execute(query.offset((page - 1) * LIMIT - 1).limit(1))
+        post = result.scalar_one()
+    return _encode_cursor(post)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=1_000_000)
+    parser.add_argument("--gurus", type=int, default=50)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--follow", type=int, default=5, help="guru_ids 필터 시나리오에 사용할 Guru 수")
+    args = parser.parse_args()
+
+    engine = create_bench_engine()
+    print(f"🚀 {args.posts:,} posts 준비 중...")
+    guru_ids = await seed(engine, args.posts, args.gurus)
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def bench_get_db():
+        async with session_maker() as session:
+            yield session
+            await session.commit()
+
+    app.dependency_overrides[get_db] = bench_get_db
+
+    rows = []
+    scenarios = [("all", None), (f"{args.follow} gurus", guru_ids[:args.follow])]
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+        for scenario, filter_ids in scenarios:
+            base_params = {"limit": LIMIT}
+            if filter_ids:
+                base_params["guru_ids"] = ",".join(filter_ids)
+
+            for page in args.pages:
+                cursor = await cursor_for_page(session_maker, page, filter_ids)
+                modes = [("offset", {"offset": (page - 1) * LIMIT})]
+                if cursor or page == 1:
+                    modes.append(("cursor", {"cursor": cursor} if cursor else {}))
+
+                for mode, params in modes:
+                    timer = Timer()
+                    for _ in range(args.repeat):
+                        async with timer.measure():
+                            response = await http.get("/api/feed", params={**base_params, **params})
+                            response.raise_for_status()
+                    rows.append({"scenario": scenario, "page": page, "mode": mode, **timer.summary()})
+
+    app.dependency_overrides.pop(get_db, None)
+    print()
+    print_table(rows, ["scenario", "page", "mode", "mean_ms", "p50_ms", "p95_ms", "max_ms"])
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,183 @@
+"""
+Semantic cache 벡터 인덱스 벤치마크
+사용법: python -m scripts.bench_semantic_cache_index --sizes 10000 100000 1000000
+
+bench 스키마의 query_cache 테이블에 합성 임베딩을 채운 뒤
+인덱스 없는 순차 스캔(정확 검색)과 ANN 인덱스(hnsw/ivfflat) 검색의
+지연 시간과 recall@k를 비교합니다. 인덱스 파라미터는 Settings 값을 사용합니다.
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from pgvector.asyncpg import register_vector
+from sqlalchemy import text
+
+from app.config import get_settings
+from app.db.migrations import query_cache_vector_index_ddl, query_cache_vector_index_name
+from app.models.db_models import QueryCache, EMBEDDING_DIMENSION
+from scripts.bench_utils import Timer, create_bench_engine, create_bench_tables, print_table, raw_asyncpg
+
+settings = get_settings()
+
+# semantic_cache.get_cached_response / find_similar_queries와 같은 형태의 쿼리
+SEARCH_SQL = text("""
+    SELECT id
+    FROM query_cache
+    WHERE
+        query_embedding IS NOT NULL
+        AND expires_at > :now
+    ORDER BY query_embedding <=> :embedding
+    LIMIT :k
+""")
+
+COPY_COLUMNS = [
+    "id", "query_hash", "query_text", "query_embedding", "response",
+    "sources", "created_at", "expires_at", "hit_count",
+]
+
+
+def make_embeddings(rng: np.random.Generator, centers: np.ndarray, n: int) -> np.ndarray:
+    """클러스터 중심 + 노이즈로 만든 정규화 임베딩 (비슷한 질문이 모여 있는 분포 흉내)"""
+    labels = rng.integers(0, len(centers), size=n)
+    vectors = centers[labels] + rng.normal(scale=0.35, size=(n, centers.shape[1])).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+async def fill_rows(engine, rng, centers, start: int, end: int, chunk: int = 5000) -> None:
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(days=30)
+
+    async with engine.connect() as conn:
+        apg = await raw_asyncpg(conn)
+        await register_vector(apg)
+        for offset in range(start, end, chunk):
+            size = min(chunk, end - offset)
+            vectors = make_embeddings(rng, centers, size)
+            records = [
+                (
+                    str(uuid.uuid4()),
+                    uuid.uuid4().hex,
+                    f"bench query {offset + i}",
+                    vectors[i],
+                    "bench response",
+                    None,
+                    now,
+                    expires_at,
+                    0,
+                )
+                for i in range(size)
+            ]
+            await apg.copy_records_to_table(
+                "query_cache",
+                schema_name="bench",
+                records=records,
+                columns=COPY_COLUMNS,
+            )
+        await conn.commit()
+
+
+async def run_queries(engine, queries: np.ndarray, k: int, setup_sql: list[str]):
+    timer = Timer()
+    results = []
+    now = datetime.now(timezone.utc)
+
+    async with engine.connect() as conn:
+        for vector in queries:
+            async with conn.begin():
+                for sql in setup_sql:
+                    await conn.execute(text(sql))
+                async with timer.measure():
+                    rows = await conn.execute(
+                        SEARCH_SQL,
+                        {"embedding": str(vector.tolist()), "now": now, "k": k},
+                    )
+                    results.append([row.id for row in rows])
+    return timer.summary(), results
+
+
+def recall(exact: list[list[str]], approx: list[list[str]], k: int) -> float:
+    hits = sum(len(set(e[:k]) & set(a[:k])) for e, a in zip(exact, approx))
+    total = sum(min(k, len(e)) for e in exact)
+    return round(hits / total, 4) if total else 0.0
+
+
+def search_param_sql(value: int) -> str:
+    if settings.vector_index_type == "hnsw":
+        return f"SET LOCAL hnsw.ef_search = {int(value)}"
+    return f"SET LOCAL ivfflat.probes = {int(value)}"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument(
+        "--search-values", type=int, nargs="+", default=None,
+        help="hnsw.ef_search (또는 ivfflat.probes) 값 목록",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if settings.vector_index_type not in ("hnsw", "ivfflat"):
+        raise SystemExit("VECTOR_INDEX_TYPE must be hnsw or ivfflat for this benchmark")
+
+    default_value = settings.hnsw_ef_search if settings.vector_index_type == "hnsw" else settings.ivfflat_probes
+    search_values = args.search_values or [default_value]
+
+    rng = np.random.default_rng(args.seed)
+    centers = rng.normal(size=(args.clusters, EMBEDDING_DIMENSION)).astype(np.float32)
+
+    engine = create_bench_engine()
+    async with engine.begin() as conn:
+        await create_bench_tables(conn, [QueryCache.__table__])
+
+    index_name = query_cache_vector_index_name()
+    rows = []
+    filled = 0
+
+    for size in sorted(args.sizes):
+        print(f"🚀 {size:,} rows 준비 중...")
+        async with engine.begin() as conn:
+            await conn.execute(text(f"DROP INDEX IF EXISTS bench.{index_name}"))
+        await fill_rows(engine, rng, centers, filled, size)
+        filled = size
+        async with engine.begin() as conn:
+            await conn.execute(text("ANALYZE query_cache"))
+
+        queries = make_embeddings(rng, centers, args.queries)
+
+        exact_summary, exact_ids = await run_queries(
+            engine, queries, args.k, ["SET LOCAL enable_indexscan = off"]
+        )
+        rows.append({"rows": f"{size:,}", "mode": "seq scan", "recall@1": 1.0, f"recall@{args.k}": 1.0, **exact_summary})
+
+        started = time.perf_counter()
+        async with engine.begin() as conn:
+            await conn.execute(text(query_cache_vector_index_ddl(index_name)))
+        build_seconds = round(time.perf_counter() - started, 1)
+
+        for value in search_values:
+            summary, approx_ids = await run_queries(engine, queries, args.k, [search_param_sql(value)])
+            rows.append({
+                "rows": f"{size:,}",
+                "mode": f"{settings.vector_index_type}({value}) build={build_seconds}s",
+                "recall@1": recall(exact_ids, approx_ids, 1),
+                f"recall@{args.k}": recall(exact_ids, approx_ids, args.k),
+                **summary,
+            })
+
+    print()
+    print_table(rows, ["rows", "mode", "recall@1", f"recall@{args.k}", "mean_ms", "p50_ms", "p95_ms", "max_ms"])
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,88 @@
+"""
+벤치마크 공용 유틸리티
+
+벤치마크는 운영 테이블을 건드리지 않도록 별도 스키마(기본: bench)에
+같은 모델 정의로 테이블을 만들어 사용합니다.
+"""
+
+import statistics
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, async_sessionmaker, create_async_engine
+
+from app.db.neon import clean_database_url, connect_args, create_db_engine, engine_connect_args
+from app.models.db_models import Base
+
+BENCH_SCHEMA = "bench"
+
+
+def create_bench_engine(schema: str = BENCH_SCHEMA, **engine_kwargs):
+    """search_path가 벤치마크 스키마를 먼저 보도록 설정된 엔진"""
+    args = dict(connect_args)
+    args["server_settings"] = {"search_path": f"{schema},public"}
+    return create_async_engine(clean_database_url, connect_args=args, **engine_kwargs)
+
+
+def create_bench_db_engine(pool_mode: str, schema: str = BENCH_SCHEMA):
+    """운영 엔진 팩토리(풀 설정/메트릭 포함) + 벤치마크 스키마 search_path"""
+    args = engine_connect_args()
+    args["server_settings"] = {"search_path": f"{schema},public"}
+    return create_db_engine(pool_mode, connect_args=args)
+
+
+async def create_bench_tables(conn: AsyncConnection, tables: Sequence, schema: str = BENCH_SCHEMA) -> None:
+    """벤치마크 스키마에 모델 테이블 생성 (기존 테이블은 삭제 후 재생성)"""
+    await conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+    await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {schema}"))
+    schema_conn = await conn.execution_options(schema_translate_map={None: schema})
+    await schema_conn.run_sync(Base.metadata.drop_all, tables=list(tables))
+    await schema_conn.run_sync(Base.metadata.create_all, tables=list(tables))
+
+
+@asynccontextmanager
+async def bench_session(engine) -> AsyncIterator[AsyncSession]:
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_maker() as session:
+        yield session
+
+
+async def raw_asyncpg(conn: AsyncConnection):
+    """COPY 등 대량 작업용 asyncpg 원시 연결"""
+    raw = await conn.get_raw_connection()
+    return raw.driver_connection
+
+
+class Timer:
+    """반복 측정 결과 요약 (ms)"""
+
+    def __init__(self):
+        self.samples: List[float] = []
+
+    @asynccontextmanager
+    async def measure(self):
+        started = time.perf_counter()
+        yield
+        self.samples.append((time.perf_counter() - started) * 1000)
+
+    def summary(self) -> Dict[str, float]:
+        if not self.samples:
+            return {"n": 0}
+        ordered = sorted(self.samples)
+        return {
+            "n": len(ordered),
+            "mean_ms": round(statistics.fmean(ordered), 2),
+            "p50_ms": round(ordered[len(ordered) // 2], 2),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+            "max_ms": round(ordered[-1], 2),
+        }
+
+
+def print_table(rows: List[Dict], columns: Sequence[str]) -> None:
+    widths = {c: max([len(c)] + [len(str(r.get(c, ""))) for r in rows]) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    print("  ".join("-" * widths[c] for c in columns))
+    for row in rows:
+        print("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
@@ -0,0 +1,142 @@
+"""
+RAG 벡터 저장소 벤치마크 (Chroma in-memory vs NumPy)
+사용법: python -m scripts.bench_vector_store --sizes 10000 100000 1000000
+
+크기/백엔드마다 별도 프로세스에서 합성 청크(정규화된 랜덤 임베딩)를 적재한 뒤
+적재 시간, top-k 쿼리 지연 시간, RSS 증가량을 측정합니다.
+NumPy 결과를 정답으로 Chroma(HNSW, 근사)의 recall@k도 함께 보고합니다.
+
+OpenAI 호출 없이 VectorStore 인터페이스만 사용합니다.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+import uuid
+
+import numpy as np
+
+from scripts.bench_utils import print_table
+
+BATCH_SIZE = 5000  # Chroma 최대 배치 크기 이하
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_case(backend: str, size: int, dim: int, queries: int, top_k: int) -> dict:
+    """한 프로세스에서 한 백엔드/크기만 측정 (RSS가 섞이지 않도록)"""
+    from app.services.rag.vector_store import ChromaVectorStore, NumpyVectorStore
+
+    if backend == "chroma":
+        # 컬렉션 이름이 겹치지 않도록 임시 이름 사용
+        from app.db import chroma
+
+        chroma.settings.chroma_collection_name = f"bench_{uuid.uuid4().hex[:8]}"
+        store = ChromaVectorStore()
+    else:
+        store = NumpyVectorStore()
+
+    store.count()  # 클라이언트 초기화는 RSS 측정에서 제외
+    rng = np.random.default_rng(42)
+    baseline = rss_mb()
+
+    started = time.perf_counter()
+    for offset in range(0, size, BATCH_SIZE):
+        n = min(BATCH_SIZE, size - offset)
+        vectors = rng.standard_normal((n, dim), dtype=np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        store.add(
+            ids=[f"chunk-{offset + i}" for i in range(n)],
+            embeddings=vectors,
+            documents=[f"bench chunk {offset + i}" for i in range(n)],
+            metadatas=[{"title": f"doc {(offset + i) // 10}", "url": "", "type": "bench"} for i in range(n)],
+        )
+    load_seconds = time.perf_counter() - started
+    loaded_rss = rss_mb()
+
+    query_rng = np.random.default_rng(7)
+    query_vectors = query_rng.standard_normal((queries, dim), dtype=np.float32)
+    store.query(query_vectors[0], top_k)  # 워밍업
+
+    samples = []
+    results = []
+    for vector in query_vectors:
+        t0 = time.perf_counter()
+        hits = store.query(vector, top_k)
+        samples.append((time.perf_counter() - t0) * 1000)
+        results.append([hit["id"] for hit in hits])
+
+    ordered = sorted(samples)
+    return {
+        "backend": backend,
+        "size": size,
+        "load_s": round(load_seconds, 1),
+        "rss_mb": round(loaded_rss - baseline, 1),
+        "p50_ms": round(ordered[len(ordered) // 2], 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--backends", nargs="+", default=["chroma", "numpy"])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--case", nargs=2, metavar=("BACKEND", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        backend, size = args.case[0], int(args.case[1])
+        print(json.dumps(run_case(backend, size, args.dim, args.queries, args.top_k)))
+        return
+
+    rows = []
+    for size in args.sizes:
+        exact = None
+        for backend in args.backends:
+            print(f"🚀 {backend} × {size:,} chunks...")
+            output = subprocess.run(
+                [
+                    sys.executable, "-m", "scripts.bench_vector_store",
+                    "--case", backend, str(size),
+                    "--dim", str(args.dim), "--queries", str(args.queries), "--top-k", str(args.top_k),
+                ],
+                capture_output=True, text=True,
+            )
+            if output.returncode != 0:
+                print(output.stderr[-2000:])
+                rows.append({"backend": backend, "size": size, "load_s": "failed"})
+                continue
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+            hits = result.pop("results")
+            if backend == "numpy":
+                exact = hits
+            result["_hits"] = hits
+            rows.append(result)
+
+        # NumPy(정확한 검색) 대비 recall@k
+        if exact is not None:
+            for row in rows:
+                if row.get("size") == size and "_hits" in row:
+                    overlap = [len(set(a) & set(b)) / max(1, len(b)) for a, b in zip(row["_hits"], exact)]
+                    row["recall"] = round(float(np.mean(overlap)), 3)
+        for row in rows:
+            row.pop("_hits", None)
+
+    print()
+    print_table(rows, ["backend", "size", "load_s", "rss_mb", "p50_ms", "p95_ms", "recall"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+RAG 인덱스 스냅샷 관리
+사용법:
+    python -m scripts.rag_snapshot export --to postgres        # 현재 벡터 저장소 → rag_snapshot_chunks
+    python -m scripts.rag_snapshot export --to file --path ./rag_snapshot.npz
+    python -m scripts.rag_snapshot restore --from postgres     # 빈 저장소에 적재하고 소요 시간 측정
+
+restore는 OpenAI를 호출하지 않으며, 콜드 스타트 시 RagIndexLoader가 하는 적재와 같은 경로입니다.
+RAG_BACKEND=pgvector로 restore하면 기존 Chroma/numpy 스냅샷을 rag_documents로 옮길 수 있습니다.
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.config import get_settings
+from app.db.neon import init_db
+from app.services.rag.snapshot import (
+    export_to_file,
+    export_to_postgres,
+    load_from_file,
+    load_from_postgres,
+)
+from app.services.rag.vector_store import get_vector_store
+
+settings = get_settings()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["export", "restore"])
+    parser.add_argument("--to", dest="target", choices=["postgres", "file"], default="postgres")
+    parser.add_argument("--from", dest="source", choices=["postgres", "file"], default="postgres")
+    parser.add_argument("--path", default=settings.rag_snapshot_path)
+    parser.add_argument("--batch-size", type=int, default=settings.rag_snapshot_batch_size)
+    args = parser.parse_args()
+
+    store = get_vector_store()
+    started = time.perf_counter()
+    if store.is_async or args.target == "postgres" or args.source == "postgres":
+        await init_db()
+
+    if args.command == "export":
+        if store.is_async:
+            print(f"⚠️ {store.name} 저장소는 이미 Postgres에 있어 스냅샷이 필요 없습니다.")
+            return
+        print(f"🚀 {store.name} 저장소({store.count():,} chunks) 내보내는 중...")
+        if args.target == "postgres":
+            exported = await export_to_postgres(store, args.batch_size)
+        else:
+            exported = export_to_file(store, args.path, args.batch_size)
+        print(f"✅ {exported:,} chunks → {args.target} ({time.perf_counter() - started:.1f}s)")
+        return
+
+    existing = await store.acount()
+    if existing > 0:
+        print(f"⚠️ {store.name} 저장소에 이미 {existing:,} chunks가 있습니다. 비어 있는 저장소에서 실행하세요.")
+        return
+
+    def progress(loaded: int) -> None:
+        print(f"  {loaded:,} chunks ({time.perf_counter() - started:.1f}s)")
+
+    if args.source == "postgres":
+        loaded = await load_from_postgres(store, args.batch_size, progress)
+    else:
+        loaded = await load_from_file(store, args.path, args.batch_size, progress)
+    await store.aflush()
+    print(f"✅ {loaded:,} chunks 적재 완료: {time.perf_counter() - started:.2f}s ({store.name})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
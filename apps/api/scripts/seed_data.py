@@ -7,7 +7,8 @@ import asyncio
 from datetime import datetime, timedelta, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.neon import async_session_maker, init_db
-from app.models.db_models import Guru, GuruPost
+from app.models.db_models import Guru
+from app.services.feed.posts import add_posts
 
 
 # AI Guru 샘플 데이터
@@ -128,10 +129,8 @@ async def seed_gurus(session: AsyncSession):
 
 async def seed_posts(session: AsyncSession):
     """포스트 시드 데이터 삽입"""
-    for post_data in SAMPLE_POSTS:
-        post = GuruPost(**post_data)
-        session.add(post)
-    await session.flush()
+    # 이미 타임라인이 있는 팔로워에게도 반영
+    await add_posts(session, SAMPLE_POSTS)
     print(f"✅ {len(SAMPLE_POSTS)}개의 포스트 추가됨")
 
 
@@ -4,8 +4,7 @@ RAG용 샘플 문서 시드 스크립트
 """
 
 import asyncio
-from app.services.rag.embedder import add_documents, get_document_count
-from app.db.chroma import reset_collection
+from app.services.rag.embedder import get_document_count, ingest_documents
 
 
 # AI 관련 샘플 문서 (실제 서비스에서는 Arxiv에서 가져옴)
@@ -154,14 +153,17 @@ async def main():
     print("🚀 RAG 문서 시드 시작...")
 
     # 기존 컬렉션 초기화 (선택적)
-    # reset_collection()
+    # await get_vector_store().areset()
 
-    # 문서 추가
-    count = await add_documents(SAMPLE_DOCUMENTS)
-    print(f"✅ {count}개 문서 추가됨")
+    # 문서 추가 (바뀌지 않은 문서는 다시 임베딩하지 않음)
+    report = await ingest_documents(SAMPLE_DOCUMENTS)
+    print(
+        f"✅ 추가 {report['added']} / 갱신 {report['updated']} / 변경 없음 {report['unchanged']} "
+        f"({report['chunks_embedded']} chunks 임베딩)"
+    )
 
     # 총 문서 수 확인
-    total = get_document_count()
+    total = await get_document_count()
     print(f"📊 총 문서 수: {total}")
 
 
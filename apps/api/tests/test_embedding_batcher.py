@@ -0,0 +1,50 @@
+"""EmbeddingBatcher: 배치 실패 시 개별 재시도는 400에서만"""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+from openai import BadRequestError, RateLimitError
+
+from app.services.llm import openai_client
+from app.services.llm.openai_client import EmbeddingBatcher
+
+
+def _error(cls, status):
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    return cls("error", response=httpx.Response(status, request=request), body=None)
+
+
+def _patch_create(monkeypatch, batch_error):
+    calls = []
+
+    async def create(model, input):
+        calls.append(input)
+        if isinstance(input, list) and len(input) > 1:
+            raise batch_error
+        return SimpleNamespace(data=[SimpleNamespace(index=0, embedding=[float(len(input))])])
+
+    monkeypatch.setattr(openai_client.client.embeddings, "create", create)
+    return calls
+
+
+async def _embed_all(batcher, texts):
+    return await asyncio.gather(*(batcher.embed(text) for text in texts), return_exceptions=True)
+
+
+def test_rate_limit_fails_whole_batch_without_splitting(monkeypatch):
+    calls = _patch_create(monkeypatch, _error(RateLimitError, 429))
+    batcher = EmbeddingBatcher(window_seconds=0.01, max_items=10)
+
+    results = asyncio.run(_embed_all(batcher, ["a", "bb", "ccc"]))
+    assert all(isinstance(r, RateLimitError) for r in results)
+    assert len(calls) == 1
+
+
+def test_bad_request_retries_items_individually(monkeypatch):
+    calls = _patch_create(monkeypatch, _error(BadRequestError, 400))
+    batcher = EmbeddingBatcher(window_seconds=0.01, max_items=10)
+
+    results = asyncio.run(_embed_all(batcher, ["a", "bb"]))
+    assert results == [[1.0], [2.0]]
+    assert len(calls) == 3
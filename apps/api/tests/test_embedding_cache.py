@@ -0,0 +1,81 @@
+"""EmbeddingCache in-flight 공유: leader 취소 시 대기자 처리"""
+
+import asyncio
+
+from app.services.llm.openai_client import EmbeddingCache
+
+KEY = ("text-embedding-3-small", "hello")
+
+
+def test_joiner_survives_leader_cancellation():
+    async def scenario():
+        cache = EmbeddingCache(max_entries=10)
+        calls = []
+        release = asyncio.Event()
+
+        async def create():
+            calls.append(1)
+            await release.wait()
+            return [float(len(calls))]
+
+        leader = asyncio.create_task(cache.get_or_create(KEY, create))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(cache.get_or_create(KEY, create))
+        await asyncio.sleep(0)
+
+        # 클라이언트 연결 끊김 / speculative retrieval 취소
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await joiner == [2.0]  # 대기자가 새 leader로 다시 계산
+        assert leader.cancelled()
+        assert len(calls) == 2
+        assert cache.peek(KEY) == [2.0]
+
+    asyncio.run(scenario())
+
+
+def test_joiner_cancellation_does_not_cancel_leader():
+    async def scenario():
+        cache = EmbeddingCache(max_entries=10)
+        release = asyncio.Event()
+
+        async def create():
+            await release.wait()
+            return [1.0]
+
+        leader = asyncio.create_task(cache.get_or_create(KEY, create))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(cache.get_or_create(KEY, create))
+        await asyncio.sleep(0)
+
+        joiner.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await leader == [1.0]
+        assert joiner.cancelled()
+
+    asyncio.run(scenario())
+
+
+def test_leader_error_propagates_to_joiner():
+    async def scenario():
+        cache = EmbeddingCache(max_entries=10)
+        release = asyncio.Event()
+
+        async def create():
+            await release.wait()
+            raise RuntimeError("openai down")
+
+        leader = asyncio.create_task(cache.get_or_create(KEY, create))
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(cache.get_or_create(KEY, create))
+        await asyncio.sleep(0)
+        release.set()
+
+        results = await asyncio.gather(leader, joiner, return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    asyncio.run(scenario())
@@ -0,0 +1,68 @@
+"""CacheHitCounter: L1 히트를 해시별로 모아 한 번에 반영"""
+
+import asyncio
+
+import pytest
+
+from app.services.cache import hit_counter
+from app.services.cache.hit_counter import CacheHitCounter
+
+
+class FakeSession:
+    def __init__(self, calls, fail):
+        self.calls = calls
+        self.fail = fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement, params):
+        if self.fail:
+            raise OSError("connection reset")
+        self.calls.append(params)
+
+    async def commit(self):
+        pass
+
+
+@pytest.fixture
+def sessions(monkeypatch):
+    state = {"calls": [], "fail": False}
+    monkeypatch.setattr(
+        hit_counter, "async_session_maker", lambda: FakeSession(state["calls"], state["fail"])
+    )
+    return state
+
+
+def test_flush_batches_hits_per_hash(sessions):
+    counter = CacheHitCounter(flush_interval_seconds=60, max_pending=10)
+    for query_hash in ["a", "b", "a", "a"]:
+        counter.record(query_hash)
+
+    assert asyncio.run(counter.flush()) == 4
+    assert sessions["calls"] == [{"hashes": ["a", "b"], "counts": [3, 1]}]
+    assert asyncio.run(counter.flush()) == 0
+
+
+def test_failed_flush_keeps_counts_for_next_run(sessions):
+    counter = CacheHitCounter(flush_interval_seconds=60, max_pending=10)
+    counter.record("a")
+    sessions["fail"] = True
+    assert asyncio.run(counter.flush()) == 0
+
+    counter.record("a")
+    sessions["fail"] = False
+    assert asyncio.run(counter.flush()) == 2
+    assert sessions["calls"] == [{"hashes": ["a"], "counts": [2]}]
+
+
+def test_new_hashes_dropped_when_full(sessions):
+    counter = CacheHitCounter(flush_interval_seconds=60, max_pending=1)
+    counter.record("a")
+    counter.record("b")
+    counter.record("a")
+    assert counter.stats()["dropped_full"] == 1
+    assert counter.stats()["pending_hits"] == 2
@@ -0,0 +1,100 @@
+"""ingest_documents: 임베딩 도중 실패해도 문서가 섞이거나 hash가 먼저 기록되지 않음"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.rag import chunker, embedder
+from app.services.rag.vector_store import NumpyVectorStore
+
+
+class ByteEncoding:
+    """tiktoken 대신 UTF-8 바이트를 토큰으로 쓰는 인코더 (네트워크 없이 청킹)"""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text.encode("utf-8"))
+
+    def decode_bytes(self, tokens):
+        return bytes(tokens)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = NumpyVectorStore(initial_capacity=4)
+    monkeypatch.setattr(chunker, "get_encoding", lambda: ByteEncoding())
+    monkeypatch.setattr(chunker.settings, "rag_chunk_tokens", 10)
+    monkeypatch.setattr(chunker.settings, "rag_chunk_overlap_tokens", 0)
+    monkeypatch.setattr(embedder.settings, "rag_snapshot_mode", "off")
+    monkeypatch.setattr(embedder, "get_vector_store", lambda: store)
+    return store
+
+
+def _fake_embeddings(monkeypatch, fail_on_call=None):
+    calls = []
+
+    async def get_embeddings(texts):
+        calls.append(list(texts))
+        if len(calls) == fail_on_call:
+            raise RuntimeError("openai down")
+        return [np.full(4, float(len(text)), dtype=np.float32).tolist() for text in texts]
+
+    monkeypatch.setattr(embedder, "get_embeddings", get_embeddings)
+    return calls
+
+
+def _contents(store, parent_id):
+    metadatas = store.get_metadatas({"parent_id": parent_id})
+    return {doc_id: meta["content_hash"] for doc_id, meta in metadatas.items()}
+
+
+def test_failure_in_second_batch_keeps_previous_version(store, monkeypatch):
+    old = {"id": "doc", "content": "a" * 30, "title": "v1"}
+    _fake_embeddings(monkeypatch)
+    asyncio.run(embedder.ingest_documents([old], batch_size=2))
+    before = _contents(store, "doc")
+    assert len(before) == 3
+
+    # 새 버전은 청크 4개 → 임베딩 배치 2개, 두 번째 배치에서 실패
+    new = {"id": "doc", "content": "b" * 40, "title": "v2"}
+    _fake_embeddings(monkeypatch, fail_on_call=2)
+    with pytest.raises(RuntimeError):
+        asyncio.run(embedder.ingest_documents([new], batch_size=2))
+    assert _contents(store, "doc") == before
+
+    calls = _fake_embeddings(monkeypatch)
+    report = asyncio.run(embedder.ingest_documents([new], batch_size=2))
+    assert report["updated"] == 1
+    assert sum(len(batch) for batch in calls) == 4
+    assert set(_contents(store, "doc").values()) == {embedder.content_hash(new)}
+
+
+def test_failure_while_writing_leaves_document_to_be_reembedded(store, monkeypatch):
+    doc = {"id": "doc", "content": "c" * 40}
+    _fake_embeddings(monkeypatch)
+    writes = []
+    add = store.aadd
+
+    async def failing_aadd(ids, embeddings, documents, metadatas):
+        writes.append(list(ids))
+        if len(writes) == 2:
+            raise RuntimeError("disk full")
+        await add(ids, embeddings, documents, metadatas)
+
+    monkeypatch.setattr(store, "aadd", failing_aadd)
+    with pytest.raises(RuntimeError):
+        asyncio.run(embedder.ingest_documents([doc], batch_size=2))
+    # content_hash를 가진 첫 청크는 아직 없음
+    assert "doc#c0" not in _contents(store, "doc")
+
+    monkeypatch.setattr(store, "aadd", add)
+    report = asyncio.run(embedder.ingest_documents([doc], batch_size=2))
+    assert report["added"] == 1
+    assert set(_contents(store, "doc")) == {"doc#c0", "doc#c1", "doc#c2", "doc#c3"}
+
+
+def test_shrinking_document_removes_leftover_chunks(store, monkeypatch):
+    _fake_embeddings(monkeypatch)
+    asyncio.run(embedder.ingest_documents([{"id": "doc", "content": "d" * 40}], batch_size=2))
+    asyncio.run(embedder.ingest_documents([{"id": "doc", "content": "e" * 15}], batch_size=2))
+    assert set(_contents(store, "doc")) == {"doc#c0", "doc#c1"}
@@ -0,0 +1,41 @@
+"""작업 등록 시 payload 검사"""
+
+import pytest
+
+from app.services.jobs import handlers
+from app.services.jobs.handlers import JOB_KINDS, validate_payload
+
+
+def test_accepts_known_keys():
+    assert validate_payload("pre_warm", {"days": 3, "limit": 5}) == {"days": 3, "limit": 5}
+    assert validate_payload("learning_cycle", None) == {}
+
+
+def test_rejects_unknown_keys():
+    with pytest.raises(ValueError, match="db"):
+        validate_payload("cleanup", {"max_age_days": 30, "db": "x"})
+    with pytest.raises(ValueError):
+        validate_payload("learning_cycle", {"days": 1})
+
+
+def test_rejects_unknown_kind_and_missing_required_keys(monkeypatch):
+    monkeypatch.setattr(handlers.settings, "rag_backend", "pgvector")
+    with pytest.raises(ValueError, match="Unknown job kind"):
+        validate_payload("drop_tables", {})
+    with pytest.raises(ValueError, match="Missing payload keys"):
+        validate_payload("ingest_documents", {"prune": True})
+
+
+def test_ingest_job_requires_shared_rag_backend(monkeypatch):
+    payload = {"documents": [{"content": "x"}]}
+    for backend in ("chroma", "numpy"):
+        monkeypatch.setattr(handlers.settings, "rag_backend", backend)
+        with pytest.raises(ValueError, match="pgvector"):
+            validate_payload("ingest_documents", payload)
+    monkeypatch.setattr(handlers.settings, "rag_backend", "pgvector")
+    assert validate_payload("ingest_documents", payload) == payload
+
+
+def test_learning_kinds_share_lock_group():
+    for kind in ("learning_cycle", "pre_warm", "improve_responses", "cleanup", "extend_ttl"):
+        assert JOB_KINDS[kind].lock_group == "learning"
@@ -0,0 +1,101 @@
+"""NumpyVectorStore: 스냅샷 적재 스레드와 이벤트 루프 쓰기의 동시 실행"""
+
+import asyncio
+import threading
+
+import numpy as np
+
+from app.services.rag.snapshot import RagIndexLoader
+from app.services.rag.vector_store import NumpyVectorStore
+
+DIM = 8
+
+
+def _vectors(n: int, seed: int) -> np.ndarray:
+    return np.random.default_rng(seed).random((n, DIM), dtype=np.float32)
+
+
+def test_threaded_restore_and_loop_writes_do_not_lose_rows():
+    async def scenario():
+        store = NumpyVectorStore(initial_capacity=1)
+
+        def restore():
+            # RagIndexLoader의 _add_batch처럼 스레드에서 bulk add (용량 증가로 행렬 교체 유발)
+            for batch in range(50):
+                ids = [f"snap-{batch}-{i}" for i in range(20)]
+                store.add(ids, _vectors(20, batch), ["s"] * 20, [{"type": "snapshot"}] * 20)
+
+        async def ingest():
+            for i in range(200):
+                await store.aadd([f"live-{i}"], _vectors(1, 1000 + i), ["l"], [{"type": "live"}])
+                if i % 10 == 0:
+                    await store.adelete([f"live-{i}"])
+                await asyncio.sleep(0)
+
+        await asyncio.gather(asyncio.to_thread(restore), ingest())
+        return store
+
+    store = asyncio.run(scenario())
+    assert store.count() == 50 * 20 + 200 - 20
+    assert len(store.get_metadatas({"type": "snapshot"})) == 1000
+    # id → 행 번호 색인이 행렬과 일치
+    for doc_id, row in store._index.items():
+        assert store._ids[row] == doc_id
+
+
+def test_query_does_not_block_event_loop_while_restore_holds_lock():
+    async def scenario():
+        store = NumpyVectorStore()
+        store.add(["a"], _vectors(1, 0), ["a"], [{}])
+        acquired = threading.Event()
+        release = threading.Event()
+
+        def restore():
+            # 큰 배치 적재처럼 lock을 오래 잡음
+            with store._lock:
+                acquired.set()
+                release.wait(5)
+
+        restoring = asyncio.create_task(asyncio.to_thread(restore))
+        await asyncio.to_thread(acquired.wait)
+        query = asyncio.create_task(store.aquery(_vectors(1, 0)[0], 1))
+
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert ticks == 5 and not query.done()
+
+        release.set()
+        await restoring
+        assert [doc["id"] for doc in await query] == ["a"]
+
+    asyncio.run(scenario())
+
+
+def test_wait_ready_blocks_until_load_finishes(monkeypatch):
+    async def scenario():
+        loader = RagIndexLoader(mode="off", path="", batch_size=10)
+        release = asyncio.Event()
+
+        async def load():
+            loader.status = "loading"
+            await release.wait()
+            loader.status = "ready"
+
+        monkeypatch.setattr(loader, "load", load)
+        loader.start()
+        waiter = asyncio.create_task(loader.wait_ready())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        release.set()
+        await waiter
+        assert loader.ready
+
+    asyncio.run(scenario())
+
+
+def test_wait_ready_without_start_returns_immediately():
+    loader = RagIndexLoader(mode="off", path="", batch_size=10)
+    asyncio.run(loader.wait_ready())
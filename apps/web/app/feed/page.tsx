@@ -28,7 +28,7 @@ export default function FeedPage() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [hasMore, setHasMore] = useState(false);
-  const [offset, setOffset] = useState(0);
+  const [cursor, setCursor] = useState<string | null>(null);
 
   useEffect(() => {
     async function loadFeed() {
@@ -48,7 +48,7 @@ export default function FeedPage() {
         const response = await getFeed({ userId, limit: 20, offset: 0 });
         setPosts(response.posts);
         setHasMore(response.has_more);
-        setOffset(response.posts.length);
+        setCursor(response.next_cursor ?? null);
       } catch (err) {
         setError("피드를 불러오는데 실패했습니다.");
         console.error(err);
@@ -70,10 +70,10 @@ export default function FeedPage() {
         if (user) userId = user.id;
       }
 
-      const response = await getFeed({ userId, limit: 20, offset });
+      const response = await getFeed({ userId, limit: 20, cursor: cursor ?? undefined });
       setPosts((prev) => [...prev, ...response.posts]);
       setHasMore(response.has_more);
-      setOffset((prev) => prev + response.posts.length);
+      setCursor(response.next_cursor ?? null);
     } catch (err) {
       console.error(err);
     }
@@ -61,7 +61,7 @@ export default function LearningPage() {
       const result = await preWarmCache(7, 2, 20);
       setMessage({
         type: "success",
-        text: `Pre-warmed ${result.warmed} queries (skipped: ${result.skipped})`,
+        text: `${result.message} (job ${result.task_id})`,
       });
       loadData();
     } catch (err) {
@@ -78,7 +78,7 @@ export default function LearningPage() {
       const result = await cleanupCache(30, 0);
       setMessage({
         type: "success",
-        text: `Cleaned up ${result.deleted} stale cache entries`,
+        text: `${result.message} (job ${result.task_id})`,
       });
       loadData();
     } catch (err) {
@@ -53,6 +53,7 @@ export async function getFeed(params: {
   guruIds?: string[];
   limit?: number;
   offset?: number;
+  cursor?: string;
 }) {
   const searchParams = new URLSearchParams();
 
@@ -60,6 +61,7 @@ export async function getFeed(params: {
   if (params.guruIds?.length) searchParams.set("guru_ids", params.guruIds.join(","));
   if (params.limit) searchParams.set("limit", params.limit.toString());
   if (params.offset) searchParams.set("offset", params.offset.toString());
+  if (params.cursor) searchParams.set("cursor", params.cursor);
 
   const url = `${API_URL}/api/feed?${searchParams.toString()}`;
   const response = await fetchWithTimeout(url);
@@ -86,6 +88,7 @@ export interface ChatResponse {
   message: ChatMessage;
   cached: boolean;
   analytics_id?: string;
+  dropped_sources?: string[];
 }
 
 export async function sendChatMessage(
@@ -130,6 +133,7 @@ export interface AnalyticsSummary {
     total: number;
   };
   avg_latency_ms: number | null;
+  p95_latency_ms?: number | null;
 }
 
 export interface PopularQuery {
@@ -214,7 +218,11 @@ export async function triggerLearningCycle(): Promise<{ task_id: string; status:
   return response.json();
 }
 
-export async function preWarmCache(days: number = 7, minCount: number = 3, limit: number = 20): Promise<any> {
+export async function preWarmCache(
+  days: number = 7,
+  minCount: number = 3,
+  limit: number = 20
+): Promise<{ task_id: string; status: string; message: string }> {
   const response = await fetchWithTimeout(`${API_URL}/api/learning/pre-warm`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },
@@ -224,7 +232,10 @@ export async function preWarmCache(days: number = 7, minCount: number = 3, limit
   return response.json();
 }
 
-export async function cleanupCache(maxAgeDays: number = 30, minHitCount: number = 0): Promise<any> {
+export async function cleanupCache(
+  maxAgeDays: number = 30,
+  minHitCount: number = 0
+): Promise<{ task_id: string; status: string; message: string }> {
   const response = await fetchWithTimeout(`${API_URL}/api/learning/cleanup`, {
     method: "POST",
     headers: { "Content-Type": "application/json" },